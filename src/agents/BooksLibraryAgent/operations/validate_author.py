@@ -1,9 +1,15 @@
 # src/agents/BooksLibraryAgent/operations/validate_author.py
+from functools import partial
+
 from src.agents.operations_base import BaseOperation, OperationKind
 from sqlalchemy import text
 
 from src.model.agent_result import AgentResult
 
+# Фабрики результатов с заранее привязанными stage и entity_type
+_OK_AUTHOR = partial(AgentResult.ok, stage="entity_validation", entity_type="author")
+_ERROR_AUTHOR = partial(AgentResult.error, stage="entity_validation", entity_type="author")
+
 class Operation(BaseOperation):
     kind = OperationKind.VALIDATION
     description = "Валидация автора через семантический поиск."
@@ -18,17 +24,13 @@ class Operation(BaseOperation):
     def run(self, params: dict, context: dict, agent) -> AgentResult:
         candidates = params.get("candidates", [])
         if not hasattr(agent, 'engine') or agent.engine is None:
-            return AgentResult.error(
+            return _ERROR_AUTHOR(
                 message="База данных недоступна",
-                stage="entity_validation",
-                entity_type="author",
                 input_params=params,
                 summary="Ошибка: база данных недоступна"
             )
         if not candidates:
-            return AgentResult.ok(
-                stage="entity_validation",
-                entity_type="author",
+            return _OK_AUTHOR(
                 input_params=params,
                 output={"validated": []},
                 summary="Проведена валидация сущности 'автор' для пустого списка кандидатов"
@@ -44,18 +46,14 @@ class Operation(BaseOperation):
             with agent.engine.connect() as conn:
                 res = conn.execute(text(sql), values)
                 authors = [{"name": row[0]} for row in res.fetchall()]
-            return AgentResult.ok(
-                stage="entity_validation",
-                entity_type="author",
+            return _OK_AUTHOR(
                 input_params=params,
                 output={"validated": authors},
                 summary=f"Проведена валидация сущности 'автор' для кандидатов: {candidates}"
             )
         except Exception as e:
-            return AgentResult.error(
+            return _ERROR_AUTHOR(
                 message=f"Ошибка валидации автора: {e}",
-                stage="entity_validation",
-                entity_type="author",
                 input_params=params,
                 summary="Ошибка при выполнении SQL-запроса валидации автора"
             )
\ No newline at end of file
@@ -7,6 +7,36 @@
 from typing import Optional
 import textwrap
 
+# Шаблоны статичны — dedent выполняется один раз при импорте, на вызове только format
+_SQL_GENERATION_TPL = textwrap.dedent(
+    """
+    У тебя есть доступ к базе данных с описанием схемы (ниже).
+    Разрешённые таблицы: {allowed_tables}
+    Сводка схемы (только для ориентира):
+    {schema_text}
+    Задача: по следующему вопросу сформировать ТОЛЬКО ОДИН корректный SQL-запрос (SELECT),
+    который решает задачу и использует только разрешённые таблицы.
+    Возвращай ТОЛЬКО SQL (ничего лишнего), не добавляй текстовые пояснения.
+    Если нужен ORDER или LIMIT — включи их явно.
+    Вопрос:
+    {question}
+    ВАЖНО: возвращай только чистый SQL SELECT. Если нужно — используй JOIN.
+    """
+)
+
+_SQL_RETRY_TPL = textwrap.dedent(
+    """
+    Предыдущий SQL:
+    {previous_sql}
+    Проблемы, найденные при валидации:
+    {problems_text}
+    Используй только разрешённые таблицы: {allowed_tables}
+    Постарайся исправить SQL, учитывая обнаруженные ошибки. Верни ТОЛЬКО НОВЫЙ SQL (SELECT), без пояснений.
+    {hint_block}
+    """
+)
+
+
 def sql_generation_prompt(schema_text: str, question: str, allowed_tables: str) -> str:
     """
     Шаблон запроса NL -> SQL.
@@ -19,22 +49,7 @@ def sql_generation_prompt(schema_text: str, question: str, allowed_tables: str)
     Возвращает:
         Промпт для LLM, требующий ТОЛЬКО SQL SELECT.
     """
-    tpl = textwrap.dedent(
-        """
-        У тебя есть доступ к базе данных с описанием схемы (ниже).
-        Разрешённые таблицы: {allowed_tables}
-        Сводка схемы (только для ориентира):
-        {schema_text}
-        Задача: по следующему вопросу сформировать ТОЛЬКО ОДИН корректный SQL-запрос (SELECT),
-        который решает задачу и использует только разрешённые таблицы.
-        Возвращай ТОЛЬКО SQL (ничего лишнего), не добавляй текстовые пояснения.
-        Если нужен ORDER или LIMIT — включи их явно.
-        Вопрос:
-        {question}
-        ВАЖНО: возвращай только чистый SQL SELECT. Если нужно — используй JOIN.
-        """
-    )
-    return tpl.format(schema_text=schema_text, question=question, allowed_tables=allowed_tables)
+    return _SQL_GENERATION_TPL.format(schema_text=schema_text, question=question, allowed_tables=allowed_tables)
 
 def sql_retry_prompt(problems_text: str, previous_sql: str, allowed_tables: str, hint: Optional[str] = None) -> str:
     """
@@ -49,19 +64,8 @@ def sql_retry_prompt(problems_text: str, previous_sql: str, allowed_tables: str,
     Возвращает:
         Промпт для LLM, требующий ТОЛЬКО НОВЫЙ SQL SELECT.
     """
-    tpl = textwrap.dedent(
-        """
-        Предыдущий SQL:
-        {previous_sql}
-        Проблемы, найденные при валидации:
-        {problems_text}
-        Используй только разрешённые таблицы: {allowed_tables}
-        Постарайся исправить SQL, учитывая обнаруженные ошибки. Верни ТОЛЬКО НОВЫЙ SQL (SELECT), без пояснений.
-        {hint_block}
-        """
-    )
     hint_block = f"Подсказка: {hint}" if hint else ""
-    return tpl.format(
+    return _SQL_RETRY_TPL.format(
         previous_sql=previous_sql,
         problems_text=problems_text,
         allowed_tables=allowed_tables,
@@ -4,7 +4,8 @@ DataAnalysisAgent — универсальный агент для анализ
 
 Особенности:
 - Не привязан к предметной области (книги, акты и т.д.).
-- Имеет одну операцию `analyze`, которая сама определяет тип данных и стратегию обработки.
+- Операция `analyze` сама определяет тип данных и стратегию обработки.
+- Операция `analyze_and_validate` дополнительно проверяет результат (V1–V4) в том же вызове LLM.
 - Поддерживает LLM-синтез выводов.
 - Полностью совместим с BaseAgent и GraphContext.
 
@@ -28,12 +28,12 @@
 """
 
 from __future__ import annotations
-import json
 import logging
 from datetime import date, datetime
 from typing import Any, Dict, List, Optional
 from src.agents.operations_base import BaseOperation, OperationKind
 from src.model.agent_result import AgentResult
+from src.utils.utils import dumps_json
 
 LOG = logging.getLogger(__name__)
 
@@ -43,7 +43,7 @@ def _default_serializer(obj):
     Безопасный сериализатор для JSON, поддерживающий:
       - datetime.date → ISO-строка ("2023-01-01")
       - datetime.datetime → ISO-строка ("2023-01-01T12:00:00")
-    Используется в json.dumps(..., default=_default_serializer).
+    Используется в dumps_json(..., default=_default_serializer).
     """
     if isinstance(obj, (date, datetime)):
         return obj.isoformat()
@@ -138,6 +138,19 @@ class Operation(BaseOperation):
             "sample": data[:2]
         }
 
+    def _compute_metrics(self, raw_output: Any) -> Dict[str, Any]:
+        """Определяет тип данных и строит структурированные метрики."""
+        data_type = self._detect_data_type(raw_output)
+        if data_type == "empty":
+            return {"error": "Данные отсутствуют или пусты"}
+        if data_type == "table":
+            return self._analyze_table(raw_output)
+        if data_type == "text_list":
+            return self._analyze_text_list(raw_output)
+        if data_type == "scalar":
+            return {"value": raw_output}
+        return {"raw": str(raw_output)[:500]}
+
     def _synthesize_summary(self, subquestion: str, metrics: Dict[str, Any], agent) -> str:
         """
         Генерирует human-readable summary через LLM.
@@ -159,7 +172,7 @@ class Operation(BaseOperation):
             return f"Проанализированы данные для подвопроса: {subquestion}"
         prompt = (
             f"Подвопрос: {subquestion}\n"
-            f"Метрики: {json.dumps(metrics, ensure_ascii=False, default=_default_serializer)}\n"
+            f"Метрики: {dumps_json(metrics, default=_default_serializer)}\n"
             "Кратко опиши результат на русском языке (1-2 предложения)."
         )
         try:
@@ -186,20 +199,8 @@ class Operation(BaseOperation):
         subquestion = params["subquestion_text"]
         raw_output = params["raw_output"]
         try:
-            # Шаг 1: Определение типа данных
-            data_type = self._detect_data_type(raw_output)
-
-            # Шаг 2: Анализ в зависимости от типа
-            if data_type == "empty":
-                metrics = {"error": "Данные отсутствуют или пусты"}
-            elif data_type == "table":
-                metrics = self._analyze_table(raw_output)
-            elif data_type == "text_list":
-                metrics = self._analyze_text_list(raw_output)
-            elif data_type == "scalar":
-                metrics = {"value": raw_output}
-            else:
-                metrics = {"raw": str(raw_output)[:500]}
+            # Шаги 1–2: Определение типа данных и анализ
+            metrics = self._compute_metrics(raw_output)
 
             # Шаг 3: Генерация human-readable summary
             summary = self._synthesize_summary(subquestion, metrics, agent)
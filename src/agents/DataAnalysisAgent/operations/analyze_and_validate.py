@@ -0,0 +1,147 @@
+# src/agents/DataAnalysisAgent/operations/analyze_and_validate.py
+"""
+Операция `analyze_and_validate` — анализ данных и валидация результата за один вызов LLM.
+
+Используется на этапе processing, когда для шага ожидается и этап validation.
+Вместо двух последовательных вызовов (summary в `analyze`, затем
+ResultValidatorAgent.validate_result) модель одним ответом возвращает краткое
+резюме и вердикт V1–V4:
+{
+  "summary": "Краткое резюме (1–2 предложения)",
+  "reasoning": ["V1: ...", "V2: ...", "V3: ...", "V4: ..."],
+  "validation": {"is_valid": ..., "confidence": ..., "reason": ..., "explanation": ...}
+}
+
+Вердикт возвращается в metadata["validation"] в формате вывода validate_result —
+executor_node записывает его и сразу отмечает этап validation.
+
+Если вердикт получить не удалось (нет LLM, пустые данные, некорректный ответ),
+операция работает как обычный `analyze` без вердикта, и этап validation
+выполняется отдельно через validate_result.
+"""
+
+from __future__ import annotations
+import logging
+from typing import Any, Dict, Optional
+from src.agents.DataAnalysisAgent.operations.analyze import Operation as AnalyzeOperation
+from src.agents.ResultValidatorAgent.operations.validate_result import validate_answer_structure
+from src.agents.ResultValidatorAgent.prompt import build_validation_prompt
+from src.model.agent_result import AgentResult
+from src.services.llm_service.model.request import LLMMessage, LLMRequest
+
+LOG = logging.getLogger(__name__)
+
+_ANALYZE_AND_VALIDATE_INSTRUCTIONS = """Ты — аналитик и валидатор результатов в системе автоматического планирования.
+Твоя задача — кратко описать результат шага и строго определить, отвечает ли он на заданный подвопрос.
+
+### 📌 Обязательный анализ (ответь на V1–V4 и включи в "reasoning")
+V1. Результат полностью отвечает на подвопрос?
+V2. Данные соответствуют ожидаемому формату?
+V3. Есть ли противоречия в данных?
+V4. Достаточно ли данных для ответа?
+Каждый пункт "reasoning" — одна короткая фраза (до 15 слов), без пересказа данных.
+
+### 📏 СТРУКТУРА ОТВЕТА
+{
+  "summary": "Краткое описание результата на русском языке (1–2 предложения)",
+  "reasoning": ["V1: ...", "V2: ...", "V3: ...", "V4: ..."],
+  "validation": {
+    "is_valid": true|false,
+    "confidence": 0.0–1.0,
+    "reason": "Краткий ответ на V1–V4",
+    "explanation": "Человекочитаемое обоснование (1–2 предложения)"
+  }
+}
+
+### ⚠️ ВАЖНО
+- НИКАКОГО ТЕКСТА ВНЕ JSON.
+- Начни с '{', закончи '}'.
+- Не используй markdown, пояснения, комментарии.
+"""
+
+
+class Operation(AnalyzeOperation):
+    """
+    Анализ данных с валидацией результата в одном запросе к LLM.
+    """
+
+    description = "Анализирует входные данные и проверяет, отвечают ли они на подвопрос (один вызов LLM)."
+    outputs_schema = {
+        "type": "object",
+        "properties": {
+            "metrics": "object",      # Структурированные метрики
+            "summary": "string"       # Человекочитаемое резюме
+        }
+    }
+
+    def _parse_fused_answer(self, answer: Any) -> Optional[str]:
+        """Проверяет ответ LLM; возвращает текст ошибки или None."""
+        if not isinstance(answer, dict):
+            return "ответ не является JSON-объектом"
+        if not isinstance(answer.get("summary"), str) or not answer["summary"].strip():
+            return "отсутствует поле summary"
+        # Проверка структуры вердикта — та же, что и у validate_result
+        is_valid, error_msg = validate_answer_structure(answer)
+        return None if is_valid else error_msg
+
+    def run(self, params: Dict[str, Any], context: Dict[str, Any], agent) -> AgentResult:
+        """
+        Выполняет анализ и валидацию одним вызовом LLM.
+
+        Args:
+            params (dict):
+                - subquestion_text (str): текст подвопроса
+                - raw_output (any): данные для анализа
+            context (dict): контекст выполнения (не используется напрямую)
+            agent: экземпляр DataAnalysisAgent (для доступа к LLM)
+
+        Returns:
+            AgentResult: результат анализа; вердикт — в metadata["validation"]
+        """
+        subquestion = params["subquestion_text"]
+        raw_output = params["raw_output"]
+
+        # Без LLM и для пустых данных совмещать нечего: пустой результат
+        # validate_result отклонит детерминированно, без обращения к модели
+        if not agent.llm or self._detect_data_type(raw_output) == "empty":
+            return super().run(params, context, agent)
+
+        try:
+            metrics = self._compute_metrics(raw_output)
+            step_message = build_validation_prompt(subquestion_text=subquestion, raw_output=raw_output)[-1]
+            request = LLMRequest(
+                messages=[
+                    LLMMessage(role="system", content=_ANALYZE_AND_VALIDATE_INSTRUCTIONS),
+                    LLMMessage(role="user", content=step_message["content"]),
+                ],
+                temperature=0.0,
+                max_tokens=1024,
+                stop_after_json=True
+            )
+            _, llm_response = agent.llm.generate_with_request(request)
+            answer = llm_response.json_answer
+            error_msg = self._parse_fused_answer(answer)
+        except Exception as e:
+            LOG.warning("analyze_and_validate: ошибка вызова LLM (%s) — раздельные анализ и валидация", e)
+            return super().run(params, context, agent)
+
+        if error_msg:
+            LOG.warning("analyze_and_validate: некорректный ответ LLM (%s) — раздельные анализ и валидация", error_msg)
+            return super().run(params, context, agent)
+
+        val_data = answer["validation"]
+        validation = {
+            "is_valid": val_data["is_valid"],
+            "confidence": val_data["confidence"],
+            "reasoning": answer["reasoning"],
+            "explanation": val_data["explanation"]
+        }
+        return AgentResult.ok(
+            stage="data_analysis",
+            output={"metrics": metrics, "summary": answer["summary"].strip()},
+            summary=f"Успешный анализ и валидация данных для подвопроса: {subquestion}",
+            thinking=llm_response.thinking,
+            raw_response=llm_response.raw_text,
+            tokens_used=llm_response.tokens_used,
+            metadata={"validation": validation}
+        )
@@ -8,14 +8,16 @@
 - Обрабатывает ответы с тегами рассуждений в специфичных форматах
 Основной метод: run() - запускает полный цикл декомпозиции
 """
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from src.agents.PlannerAgent.prompt import (
+    format_tools_info,
     get_decomposition_system_prompt,
     get_decomposition_user_prompt
 )
 import logging
+from src.agents.PlannerAgent.rules import DECOMPOSITION_FIELDS, PLANNING_FIELDS, SUBQUESTION_FIELDS
+from src.agents.PlannerAgent.schemas import decomposition_schema
 from src.services.llm_service.model.request import LLMMessage, LLMRequest
-import json
 LOG = logging.getLogger(__name__)
 
 
@@ -32,6 +34,8 @@ class DecompositionPhase:
         question = params.get("question")
         tool_registry = params.get("tool_registry_snapshot", {})
         feedback = ""
+        # Реестр инструментов одинаков для всех попыток — форматируем один раз
+        tools_info = format_tools_info(tool_registry)
         last_diagnostics = {
             "prompt": None,
             "raw_response": None,
@@ -42,7 +46,7 @@ class DecompositionPhase:
 
         for attempt in range(1, self.max_retries + 1):
             # Формируем запрос
-            request = self._build_request(question, tool_registry, feedback)
+            request = self._build_request(question, tool_registry, feedback, tools_info)
             # Сохраняем строковое представление промпта для логирования
             try:
                 prompt_str = request.model_dump_json()
@@ -61,14 +65,9 @@ class DecompositionPhase:
                     "json_answer": response.json_answer
                 })
 
-                # Попытка извлечь JSON: сначала из json_answer, потом из answer
+                # json_answer пуст, только если в ответе нет корректного JSON-объекта:
+                # повторный разбор текста ответа ничего не даст
                 decomposition = response.json_answer
-                if not decomposition:
-                    try:
-                        decomposition = json.loads(response.answer)
-                    except (json.JSONDecodeError, TypeError):
-                        decomposition = None
-
                 if decomposition and self._validate_decomposition_structure(decomposition):
                     return True, decomposition, feedback, last_diagnostics
                 else:
@@ -82,9 +81,15 @@ class DecompositionPhase:
         return False, None, feedback, last_diagnostics
 
 
-    def _build_request(self, question: str, tool_registry: dict, feedback: str) -> LLMRequest:
+    def _build_request(
+        self,
+        question: str,
+        tool_registry: dict,
+        feedback: str,
+        tools_info: Optional[str] = None,
+    ) -> LLMRequest:
         system_content = get_decomposition_system_prompt()
-        user_content = get_decomposition_user_prompt(question, tool_registry, feedback)
+        user_content = get_decomposition_user_prompt(question, tool_registry, feedback, tools_info)
         llm_messages = [
             LLMMessage(role="system", content=system_content),
             LLMMessage(role="user", content=user_content)
@@ -95,17 +100,14 @@ class DecompositionPhase:
             messages=llm_messages,
             temperature=config.get("LLM_TEMPERATURE", 0.3),
             max_tokens=config.get("LLM_MAX_TOKENS", 2048),
-            top_p=config.get("LLM_TOP_P", 0.9)
+            top_p=config.get("LLM_TOP_P", 0.9),
+            response_schema=decomposition_schema() if config.get("LLM_STRUCTURED_OUTPUT", True) else None,
         )
 
     def _validate_decomposition_structure(self, decomposition: Dict[str, Any]) -> bool:
         """Валидирует структуру декомпозиции."""
-        required_top = ["reasoning", "planning", "subquestions", "final_decision"]
-        if not isinstance(decomposition, dict):
+        if not isinstance(decomposition, dict) or not DECOMPOSITION_FIELDS <= decomposition.keys():
             return False
-        for field in required_top:
-            if field not in decomposition:
-                return False
 
         # Проверка reasoning (5 вопросов P1–P5)
         reasoning = decomposition["reasoning"]
@@ -117,22 +119,16 @@ class DecompositionPhase:
 
         # Проверка planning
         planning = decomposition["planning"]
-        if not isinstance(planning, dict):
+        if not isinstance(planning, dict) or not PLANNING_FIELDS <= planning.keys():
             return False
-        for field in ["needed", "confidence", "reason", "explanation"]:
-            if field not in planning:
-                return False
 
         # Проверка subquestions
         subquestions = decomposition["subquestions"]
         if not isinstance(subquestions, list):
             return False
         for sq in subquestions:
-            if not isinstance(sq, dict):
+            if not isinstance(sq, dict) or not SUBQUESTION_FIELDS <= sq.keys():
                 return False
-            for field in ["id", "text", "depends_on", "confidence", "reason", "explanation"]:
-                if field not in sq:
-                    return False
             if not isinstance(sq["depends_on"], list):
                 return False
 
@@ -12,10 +12,15 @@
 4. Заполняет поля `stage`, `output`, `summary` для полной прозрачности.
 """
 
+from functools import partial
 from src.agents.operations_base import BaseOperation, OperationKind
 from src.model.agent_result import AgentResult
 from src.agents.PlannerAgent.rules import validate_decomposition
 
+# Фабрики результатов с заранее привязанным этапом
+_OK_VALIDATED = partial(AgentResult.ok, stage="plan_validation")
+_ERROR_VALIDATION = partial(AgentResult.error, stage="plan_validation")
+
 
 class Operation(BaseOperation):
     """Операция валидации плана."""
@@ -36,9 +41,8 @@ class Operation(BaseOperation):
         # --- Валидация входных параметров ---
         plan = params.get("plan")
         if not plan or not isinstance(plan, dict):
-            return AgentResult.error(
+            return _ERROR_VALIDATION(
                 message="Параметр 'plan' обязателен и должен быть словарём.",
-                stage="plan_validation",
                 input_params=params
             )
         tool_registry = params.get("tool_registry_snapshot") or {}
@@ -49,8 +53,7 @@ class Operation(BaseOperation):
         # Важно: операция сама по себе завершилась успешно (ok),
         # даже если валидация плана провалилась (is_valid=False).
         # Это позволяет Reasoner корректно обработать результат.
-        return AgentResult.ok(
-            stage="plan_validation",
+        return _OK_VALIDATED(
             output=validation_result,
             summary=f"Валидация плана завершена. Результат: {'успешно' if is_valid else 'ошибки найдены'}.",
             input_params=params
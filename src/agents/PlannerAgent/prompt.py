@@ -47,8 +47,57 @@
 - Промпт строго запрещает любой текст вне JSON.
 """
 
-import json
 import textwrap
+from typing import Optional
+
+from src.utils.utils import dumps_json
+
+
+# Системный промпт статичен — dedent выполняется один раз при импорте модуля
+_DECOMPOSITION_SYSTEM_PROMPT = textwrap.dedent("""\
+    ТЫ — PlannerAgent в ReAct-системе. ТВОЯ ЗАДАЧА — ВЕРНУТЬ ТОЛЬКО ВАЛИДНЫЙ JSON.
+
+    ### 🔍 Что такое подвопрос?
+    Подвопрос — это **атомарный, фактологический вопрос**, на который можно дать однозначный ответ
+    (список, скаляр, объект). Он не должен содержать глаголов в повелительном наклонении
+    ("найди", "получи", "проанализируй").
+
+    ### 📌 Обязательный анализ (ответь на P1–P5 и включи в "reasoning")
+    P1. Какова конечная цель пользователя? (Что именно нужно вернуть в final_answer?)
+    P2. Можно ли ответить за один шаг или требуется многошаговый план?
+    P3. Какие промежуточные данные нужны для достижения цели?
+    P4. В каком порядке должны выполняться шаги? (зависимости между подвопросами)
+    P5. Какой тип операции подходит для каждого шага: DIRECT или SEMANTIC?
+
+    ### 📏 СТРУКТУРА ОТВЕТА
+    {
+      "reasoning": ["P1: ...", "P2: ...", ..., "P5: ..."],
+      "planning": {
+        "needed": true|false,
+        "confidence": 0.0–1.0,
+        "reason": "...",
+        "explanation": "Почему требуется/не требуется декомпозиция?"
+      },
+      "subquestions": [
+        {
+          "id": "q1",
+          "text": "...",
+          "depends_on": [],
+          "confidence": 0.0–1.0,
+          "reason": "Краткий ответ на P1–P5",
+          "explanation": "Человекочитаемое обоснование (1–2 предложения)"
+        }
+      ],
+      "final_decision": {
+        "explanation": "Итоговое резюме в 1–2 предложения"
+      }
+    }
+
+    ### ⚠️ ВАЖНО
+    - НИКАКОГО ТЕКСТА ВНЕ JSON.
+    - Начни с '{', закончи '}'.
+    - Не используй markdown, пояснения, комментарии.
+""")
 
 
 def get_decomposition_system_prompt() -> str:
@@ -64,55 +113,25 @@ def get_decomposition_system_prompt() -> str:
     Returns:
         str: Системный промпт в виде многострочной строки
     """
-    # === ФОРМИРОВАНИЕ СИСТЕМНОГО ПРОМПТА ===
-    # Используем textwrap.dedent для корректного форматирования отступов
-    return textwrap.dedent("""\
-        ТЫ — PlannerAgent в ReAct-системе. ТВОЯ ЗАДАЧА — ВЕРНУТЬ ТОЛЬКО ВАЛИДНЫЙ JSON.
-
-        ### 🔍 Что такое подвопрос?
-        Подвопрос — это **атомарный, фактологический вопрос**, на который можно дать однозначный ответ
-        (список, скаляр, объект). Он не должен содержать глаголов в повелительном наклонении
-        ("найди", "получи", "проанализируй").
-
-        ### 📌 Обязательный анализ (ответь на P1–P5 и включи в "reasoning")
-        P1. Какова конечная цель пользователя? (Что именно нужно вернуть в final_answer?)
-        P2. Можно ли ответить за один шаг или требуется многошаговый план?
-        P3. Какие промежуточные данные нужны для достижения цели?
-        P4. В каком порядке должны выполняться шаги? (зависимости между подвопросами)
-        P5. Какой тип операции подходит для каждого шага: DIRECT или SEMANTIC?
-
-        ### 📏 СТРУКТУРА ОТВЕТА
-        {
-          "reasoning": ["P1: ...", "P2: ...", ..., "P5: ..."],
-          "planning": {
-            "needed": true|false,
-            "confidence": 0.0–1.0,
-            "reason": "...",
-            "explanation": "Почему требуется/не требуется декомпозиция?"
-          },
-          "subquestions": [
-            {
-              "id": "q1",
-              "text": "...",
-              "depends_on": [],
-              "confidence": 0.0–1.0,
-              "reason": "Краткий ответ на P1–P5",
-              "explanation": "Человекочитаемое обоснование (1–2 предложения)"
-            }
-          ],
-          "final_decision": {
-            "explanation": "Итоговое резюме в 1–2 предложения"
-          }
-        }
+    return _DECOMPOSITION_SYSTEM_PROMPT
 
-        ### ⚠️ ВАЖНО
-        - НИКАКОГО ТЕКСТА ВНЕ JSON.
-        - Начни с '{', закончи '}'.
-        - Не используй markdown, пояснения, комментарии.
-    """)
 
+def format_tools_info(tool_registry: dict) -> str:
+    """
+    Форматирует снимок реестра инструментов для пользовательского промпта.
+    Реестр не меняется между попытками декомпозиции, поэтому вызывающий код
+    форматирует его один раз и передаёт в get_decomposition_user_prompt(tools_info=...).
+    """
+    # Если реестр инструментов пуст — указываем это явно
+    return dumps_json(tool_registry, indent=True) if tool_registry else "Нет доступных инструментов"
 
-def get_decomposition_user_prompt(question: str, tool_registry: dict, feedback: str) -> str:
+
+def get_decomposition_user_prompt(
+    question: str,
+    tool_registry: dict,
+    feedback: str,
+    tools_info: Optional[str] = None,
+) -> str:
     """
     Формирует пользовательский промпт с контекстом для LLM.
 
@@ -125,17 +144,15 @@ def get_decomposition_user_prompt(question: str, tool_registry: dict, feedback:
         question (str): Исходный вопрос пользователя
         tool_registry (dict): Снимок реестра инструментов
         feedback (str): Обратная связь от предыдущих попыток генерации
+        tools_info (Optional[str]): Уже отформатированный реестр (format_tools_info);
+            если передан, tool_registry повторно не сериализуется
 
     Returns:
         str: Пользовательский промпт в виде многострочной строки
     """
     # === ФОРМИРОВАНИЕ ИНФОРМАЦИИ ОБ ИНСТРУМЕНТАХ ===
-    # Если реестр инструментов пуст — указываем это явно
-    tools_info = (
-        json.dumps(tool_registry, ensure_ascii=False, indent=2)
-        if tool_registry
-        else "Нет доступных инструментов"
-    )
+    if tools_info is None:
+        tools_info = format_tools_info(tool_registry)
 
     # === СБОРКА ПОЛЬЗОВАТЕЛЬСКОГО ПРОМПТА ===
     # Используем f-строки для вставки динамических частей
@@ -1,22 +1,48 @@
 # src/agents/PlannerAgent/rules.py
 
-from typing import Any, Dict, List
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 import logging
 
 LOG = logging.getLogger(__name__)
 
-def _has_cycles(subquestions: List[Dict]) -> bool:
+# Уровень серьёзности, делающий декомпозицию невалидной
+_ERR = "error"
+
+# Обязательные поля (проверка подмножества ключей — одна операция над set)
+DECOMPOSITION_FIELDS = frozenset({"reasoning", "planning", "subquestions", "final_decision"})
+PLANNING_FIELDS = frozenset({"needed", "confidence", "reason", "explanation"})
+SUBQUESTION_FIELDS = frozenset({"id", "text", "depends_on", "confidence", "reason", "explanation"})
+
+# Сигнатура графа зависимостей: {(id подвопроса, frozenset(depends_on)), ...}
+GraphSignature = FrozenSet[Tuple[str, FrozenSet[str]]]
+
+
+def _build_signature(subquestions: List[Dict]) -> Optional[GraphSignature]:
+    """
+    Строит неизменяемую сигнатуру графа зависимостей подвопросов.
+    Возвращает None, если структура некорректна (граф не строится).
+    """
     if not isinstance(subquestions, list):
-        return False
+        return None
     graph = {}
     for sq in subquestions:
         if not isinstance(sq, dict) or "id" not in sq:
             continue
         deps = sq.get("depends_on", [])
         if not isinstance(deps, list):
-            return False
-        graph[sq["id"]] = deps
+            return None
+        graph[sq["id"]] = frozenset(deps)
+    return frozenset(graph.items())
+
 
+@lru_cache(maxsize=256)
+def _has_cycles_sig(sig: GraphSignature) -> bool:
+    """
+    Поиск циклов (DFS) по сигнатуре графа.
+    Кэшируется: при повторных попытках Planner обычно возвращает тот же граф.
+    """
+    graph = dict(sig)
     visited = set()
     rec_stack = set()
 
@@ -27,7 +53,7 @@ def _has_cycles(subquestions: List[Dict]) -> bool:
             return False
         visited.add(node)
         rec_stack.add(node)
-        for neighbor in graph.get(node, []):
+        for neighbor in graph.get(node, ()):
             if dfs(neighbor):
                 return True
         rec_stack.remove(node)
@@ -37,41 +63,88 @@ def _has_cycles(subquestions: List[Dict]) -> bool:
         return False
     return any(dfs(node) for node in graph)
 
+
+def _has_cycles(subquestions: List[Dict]) -> bool:
+    sig = _build_signature(subquestions)
+    if sig is None:
+        return False
+    return _has_cycles_sig(sig)
+
+# Условия правил: (объект, tool_registry) -> bool
+def _cond_has_reasoning(d: Any, tools: dict) -> bool:
+    return isinstance(d, dict) and "reasoning" in d and len(d["reasoning"]) == 5
+
+def _cond_has_planning(d: Any, tools: dict) -> bool:
+    return isinstance(d.get("planning"), dict)
+
+def _cond_subq_structure(sq: Dict, tools: dict) -> bool:
+    return SUBQUESTION_FIELDS <= sq.keys()
+
+def _cond_no_cycles(d: Any, tools: dict) -> bool:
+    return not _has_cycles(d.get("subquestions", []))
+
 # Обновлённые правила валидации
 DECOMPOSITION_RULES = [
     {
         "id": "has_reasoning",
         "target": "decomposition",
-        "condition": lambda d, tools: isinstance(d, dict) and "reasoning" in d and len(d["reasoning"]) == 5,
+        "condition": _cond_has_reasoning,
         "message": "Декомпозиция должна содержать массив reasoning из 5 элементов (P1–P5)",
-        "severity": "error"
+        "severity": _ERR
     },
     {
         "id": "has_planning",
         "target": "decomposition",
-        "condition": lambda d, tools: isinstance(d.get("planning"), dict),
+        "condition": _cond_has_planning,
         "message": "Поле planning должно быть объектом",
-        "severity": "error"
+        "severity": _ERR
     },
     {
         "id": "subq_structure",
         "target": "subquestion",
-        "condition": lambda sq, tools: all(k in sq for k in ["id", "text", "depends_on", "confidence", "reason", "explanation"]),
+        "condition": _cond_subq_structure,
         "message": "Подвопрос должен содержать id, text, depends_on, confidence, reason, explanation",
-        "severity": "error"
+        "severity": _ERR
     },
     {
         "id": "no_cycles",
         "target": "decomposition",
-        "condition": lambda d, tools: not _has_cycles(d.get("subquestions", [])),
+        "condition": _cond_no_cycles,
         "message": "Обнаружены циклические зависимости между подвопросами",
-        "severity": "error"
+        "severity": _ERR,
+        "needs_subquestions": True
     }
 ]
 
+def format_issue(issue: Dict[str, Any]) -> str:
+    """
+    Формирует человекочитаемый текст проблемы (для логов и UI).
+    Текст подвопроса хранится в issue["context"] и подставляется только здесь.
+    """
+    message = issue.get("message", "")
+    context = issue.get("context")
+    if context and "subq_text" in context:
+        return f"{message} (подвопрос: {context['subq_text'] or 'N/A'})"
+    return message
+
 def validate_decomposition(decomposition: Any, tool_registry: dict) -> tuple[bool, List[dict]]:
     issues = []
+    # Предварительная проверка subquestions: при пустом/отсутствующем списке
+    # правила по подвопросам и поиск циклов не запускаются
+    subqs = decomposition.get("subquestions") if isinstance(decomposition, dict) else None
+    if subqs is None:
+        subqs = ()
+    elif not isinstance(subqs, list):
+        issues.append({
+            "rule_id": "bad_subquestions",
+            "message": "Поле subquestions должно быть списком",
+            "severity": _ERR
+        })
+        subqs = ()
+
     for rule in DECOMPOSITION_RULES:
+        if not subqs and (rule["target"] == "subquestion" or rule.get("needs_subquestions")):
+            continue
         try:
             if rule["target"] == "decomposition":
                 is_ok = rule["condition"](decomposition, tool_registry)
@@ -82,7 +155,6 @@ def validate_decomposition(decomposition: Any, tool_registry: dict) -> tuple[boo
                         "severity": rule["severity"]
                     })
             elif rule["target"] == "subquestion":
-                subqs = decomposition.get("subquestions", [])
                 for sq in subqs:
                     if not isinstance(sq, dict):
                         continue
@@ -90,14 +162,15 @@ def validate_decomposition(decomposition: Any, tool_registry: dict) -> tuple[boo
                     if not is_ok:
                         issues.append({
                             "rule_id": rule["id"],
-                            "message": f"{rule['message']} (подвопрос: {sq.get('text', 'N/A')})",
+                            "message": rule["message"],
+                            "context": {"subq_text": sq.get("text")},
                             "severity": rule["severity"]
                         })
         except Exception as e:
             issues.append({
                 "rule_id": rule["id"],
                 "message": f"Ошибка выполнения правила: {e}",
-                "severity": "error"
+                "severity": _ERR
             })
-    is_valid = len([i for i in issues if i["severity"] == "error"]) == 0
+    is_valid = not any(i["severity"] == _ERR for i in issues)
     return is_valid, issues
\ No newline at end of file
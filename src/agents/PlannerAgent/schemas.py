@@ -0,0 +1,55 @@
+# src/agents/PlannerAgent/schemas.py
+"""
+Pydantic-схема декомпозиции PlannerAgent (ответ фазы DecompositionPhase).
+
+Схема повторяет формат, описанный в промпте (prompt.py), и передаётся адаптеру
+в LLMRequest.response_schema для constrained decoding (llama_cpp — GBNF-грамматика):
+модель не может выйти за рамки формата, и попытки декомпозиции не тратятся на
+повторы из-за невалидного JSON.
+
+Семантические проверки (префиксы P1–P5, правила rules.py) остаются
+в DecompositionPhase._validate_decomposition_structure и validate_decomposition.
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+from typing import Any, Dict, List
+
+from pydantic import BaseModel, Field
+
+
+class Planning(BaseModel):
+    """Решение о необходимости декомпозиции."""
+    needed: bool
+    confidence: float = Field(ge=0.0, le=1.0)
+    reason: str
+    explanation: str
+
+
+class PlannedSubquestion(BaseModel):
+    """Атомарный подвопрос плана."""
+    id: str
+    text: str
+    depends_on: List[str] = Field(default_factory=list)
+    confidence: float = Field(ge=0.0, le=1.0)
+    reason: str
+    explanation: str
+
+
+class PlanSummary(BaseModel):
+    """Итоговое резюме плана."""
+    explanation: str
+
+
+class Decomposition(BaseModel):
+    """Полная декомпозиция вопроса."""
+    reasoning: List[str] = Field(min_length=5, max_length=5)
+    planning: Planning
+    subquestions: List[PlannedSubquestion] = Field(default_factory=list)
+    final_decision: PlanSummary
+
+
+@lru_cache(maxsize=1)
+def decomposition_schema() -> Dict[str, Any]:
+    """JSON Schema декомпозиции (строится один раз на процесс)."""
+    return Decomposition.model_json_schema()
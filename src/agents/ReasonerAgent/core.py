@@ -9,8 +9,9 @@ LOG = logging.getLogger(__name__)
 class ReasonerAgent(BaseAgent):
     """
     Агент рассуждений (ReasonerAgent).
-    Управляет 5-этапным пайплайном для одного подвопроса.
-    Вся логика сосредоточена в операции `reason_step`.
+    Принимает решение о следующем этапе выполнения подвопроса.
+    Вся логика сосредоточена в операции `decide_next_stage` (operations/decide_next_stage.py);
+    класс агента — единственный и не содержит собственной диспетчеризации.
     """
     def __init__(self, descriptor: Dict[str, Any], config: Optional[Dict[str, Any]] = None):
         super().__init__(descriptor, config)
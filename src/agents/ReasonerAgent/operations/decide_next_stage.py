@@ -19,16 +19,77 @@
 """
 
 from __future__ import annotations
-import json
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import asdict
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import fastjsonschema
+
 from src.agents.operations_base import BaseOperation, OperationKind
 from src.model.agent_result import AgentResult
 from src.agents.ReasonerAgent.prompts import build_universal_reasoner_prompt
+from src.agents.ReasonerAgent.schemas import reasoner_decision_schema
 from src.services.llm_service.model.request import LLMMessage, LLMRequest
+from src.services.llm_service.model.response import LLMResponse
+from src.services.llm_service.response_cache import RESPONSE_CACHE
+from src.utils.utils import dumps_json, schema_error_message
 
 LOG = logging.getLogger(__name__)
 
+# Схема решения для валидации: компилируется fastjsonschema один раз при импорте
+_REASONING_PREFIXES = tuple(f"R{i}:" for i in range(1, 8))
+_HYP_FIELDS = ("agent", "operation", "params", "confidence", "reason", "explanation")
+_STAGE_NEED_FIELDS = ("needed", "confidence", "reason", "explanation")
+_CONFIDENCE = {"type": "number", "minimum": 0, "maximum": 1}
+_STAGE_NEED = {"type": "object", "required": list(_STAGE_NEED_FIELDS)}
+
+_DECISION_SCHEMA = {
+    "type": "object",
+    "required": ["reasoning", "postprocessing", "validation", "final_decision"],
+    "properties": {
+        # Ровно 7 строк, i-я начинается с "R{i}:"
+        "reasoning": {
+            "type": "array",
+            "minItems": len(_REASONING_PREFIXES),
+            "maxItems": len(_REASONING_PREFIXES),
+            "items": [{"type": "string", "pattern": f"^{prefix}"} for prefix in _REASONING_PREFIXES],
+        },
+        "hypotheses": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": list(_HYP_FIELDS),
+                "properties": {"confidence": _CONFIDENCE},
+            },
+        },
+        "postprocessing": _STAGE_NEED,
+        "validation": _STAGE_NEED,
+        "final_decision": {
+            "type": "object",
+            "required": ["selected_hypothesis", "explanation"],
+            "properties": {
+                # Человекочитаемое резюме: не короче 10 символов без учёта краевых пробелов
+                "explanation": {"type": "string", "pattern": r"\S[\s\S]{8,}\S"},
+            },
+        },
+    },
+}
+_VALIDATE_DECISION = fastjsonschema.compile(_DECISION_SCHEMA)
+
+# Минимальная уверенность, при которой гипотеза может быть выбрана
+_MIN_HYPOTHESIS_CONFIDENCE = 0.5
+
+@lru_cache(maxsize=16)
+def _system_message(content: str) -> LLMMessage:
+    """Один экземпляр LLMMessage на каждый вариант статической части промпта (не изменять!)."""
+    return LLMMessage(role="system", content=content)
+
+
+# Фабрики результатов с заранее привязанным этапом
+_OK_REASONING = partial(AgentResult.ok, stage="reasoning")
+_ERROR_REASONING = partial(AgentResult.error, stage="reasoning")
+
 
 class Operation(BaseOperation):
     """
@@ -53,34 +114,90 @@ class Operation(BaseOperation):
         6. Валидирует структуру и возвращает AgentResult
         """
         if not agent.llm:
-            return AgentResult.error(
-                message="LLM не инициализирована в ReasonerAgent",
-                stage="reasoning"
-            )
+            return _ERROR_REASONING(message="LLM не инициализирована в ReasonerAgent")
 
         # === 1. Формируем запрос в стандартизированном формате LLMRequest ===
+        request, cache_key = self._prepare_request(params, context, agent)
+        return self._complete(params, request, cache_key, agent)
+
+    def run_batch(
+        self,
+        params_list: List[Dict[str, Any]],
+        context: Dict[str, Any],
+        agent
+    ) -> List[AgentResult]:
+        """
+        Принимает решения сразу для нескольких подвопросов.
+        Запросы, отсутствующие в кэше, отправляются в LLM одним пакетом
+        (generate_with_request_batch), чтобы бэкенд мог обработать их вместе.
+        """
+        if not agent.llm:
+            return [_ERROR_REASONING(message="LLM не инициализирована в ReasonerAgent") for _ in params_list]
+
+        prepared = [self._prepare_request(params, context, agent) for params in params_list]
+        responses = [RESPONSE_CACHE.get(cache_key) if cache_key else None for _, cache_key in prepared]
+        pending = [i for i, response in enumerate(responses) if response is None]
+
+        generate_batch = getattr(agent.llm, "generate_with_request_batch", None)
+        if pending and generate_batch is not None:
+            try:
+                generated = generate_batch([prepared[i][0] for i in pending])
+                for i, (_, llm_response) in zip(pending, generated):
+                    responses[i] = llm_response
+            except Exception:
+                # Не вышло пакетом — _complete вызовет LLM для каждого запроса отдельно
+                LOG.exception("decide_next_stage: ошибка пакетной генерации")
+
+        return [
+            self._complete(params, request, cache_key, agent, llm_response)
+            for params, (request, cache_key), llm_response in zip(params_list, prepared, responses)
+        ]
+
+    def _prepare_request(
+        self,
+        params: Dict[str, Any],
+        context: Dict[str, Any],
+        agent
+    ) -> Tuple[LLMRequest, Optional[str]]:
+        """Строит LLMRequest и ключ кэша ответов (None, если кэш отключён)."""
         request = self._build_request(params, context)
-        try:
-            prompt_str = request.model_dump_json()
-        except Exception:
-            prompt_str = str(request)
+        # Кэш точного совпадения: одинаковый запрос не отправляется в LLM повторно
+        cache_key = None
+        if agent.config.get("LLM_CACHE_ENABLED", True):
+            cache_key = RESPONSE_CACHE.make_key(request, namespace=agent.config.get("llm_profile"))
+        return request, cache_key
+
+    def _complete(
+        self,
+        params: Dict[str, Any],
+        request: LLMRequest,
+        cache_key: Optional[str],
+        agent,
+        llm_response: Optional[LLMResponse] = None
+    ) -> AgentResult:
+        """
+        Получает ответ LLM (если он ещё не получен), извлекает и валидирует решение.
+        """
+        # Сериализация запроса нужна только для диагностики — строим её лениво
+        get_prompt = partial(self._dump_prompt, request)
 
         try:
-            # === 2. Вызываем LLM через единый интерфейс ===
-            _, llm_response = agent.llm.generate_with_request(request)
+            # === 2. Вызываем LLM через единый интерфейс (или берём ответ из кэша) ===
+            if llm_response is None:
+                llm_response = RESPONSE_CACHE.get(cache_key) if cache_key else None
+                if llm_response is None:
+                    _, llm_response = agent.llm.generate_with_request(request)
+                else:
+                    LOG.debug("decide_next_stage: ответ LLM взят из кэша")
 
             # === 3. Извлекаем решение из структурированного ответа ===
+            # json_answer пуст, только если в ответе нет корректного JSON-объекта:
+            # повторный разбор текста ответа ничего не даст
             decision = llm_response.json_answer
-            if not decision:
-                try:
-                    decision = json.loads(llm_response.answer)
-                except (json.JSONDecodeError, TypeError):
-                    decision = None
-
             if not decision:
                 return self._create_error_result(
                     "Не удалось извлечь валидный JSON из ответа LLM",
-                    prompt_str,
+                    get_prompt,
                     llm_response.raw_text,
                     params,
                     llm_response
@@ -94,36 +211,40 @@ class Operation(BaseOperation):
             if not is_valid:
                 return self._create_error_result(
                     f"Некорректная структура решения от LLM: {error_msg}",
-                    prompt_str,
+                    get_prompt,
                     llm_response.raw_text,
                     params,
                     llm_response,
                     decision
                 )
 
+            # В кэш попадают только ответы, прошедшие валидацию
+            if cache_key:
+                RESPONSE_CACHE.put(cache_key, llm_response)
+
             # === 6. Формируем итоговое резюме ===
             hypotheses_count = len(decision.get("hypotheses", []))
             selected_idx = decision["final_decision"]["selected_hypothesis"]
+            log_full_prompt = agent.config.get("LOG_FULL_PROMPT", False)
             summary = f"Принято решение для шага: {hypotheses_count} гипотез, выбрана {selected_idx}"
 
-            return AgentResult.ok(
-                stage="reasoning",
+            return _OK_REASONING(
                 output=decision,
                 summary=summary,
                 input_params=params,
                 thinking=llm_response.thinking,
-                prompt=prompt_str,
-                raw_response=llm_response.raw_text,
+                # Полные промпт и сырой ответ на успешном пути — только по запросу
+                prompt=get_prompt() if log_full_prompt else None,
+                raw_response=llm_response.raw_text if log_full_prompt else None,
                 tokens_used=llm_response.tokens_used
             )
 
         except Exception as e:
             LOG.exception("Ошибка в decide_next_stage")
-            return AgentResult.error(
+            return _ERROR_REASONING(
                 message=f"Ошибка в decide_next_stage: {str(e)}",
-                stage="reasoning",
                 input_params=params,
-                prompt=prompt_str
+                prompt=get_prompt()
             )
 
     def _build_request(self, params: Dict[str, Any], context: Dict[str, Any]) -> LLMRequest:
@@ -135,10 +256,13 @@ class Operation(BaseOperation):
             question=params["subquestion"]["text"],
             step_outputs=context.get("step_outputs", {}),
             tool_registry_snapshot=params.get("tool_registry_snapshot", {}),
-            step_state=params["step_state"]
+            step_state=params["step_state"],
+            tool_registry_json=params.get("tool_registry_json"),
         )
+        # System-сообщение (статическая часть промпта) переиспользуется между вызовами
         llm_messages = [
-            LLMMessage(role=msg["role"], content=msg["content"])
+            _system_message(msg["content"]) if msg["role"] == "system"
+            else LLMMessage(role=msg["role"], content=msg["content"])
             for msg in messages
         ]
         # === Читаем параметры из конфигурации агента ===
@@ -147,7 +271,9 @@ class Operation(BaseOperation):
             messages=llm_messages,
             temperature=config.get("LLM_TEMPERATURE", 0.3),
             max_tokens=config.get("LLM_MAX_TOKENS", 2048),
-            top_p=config.get("LLM_TOP_P", 0.9)
+            top_p=config.get("LLM_TOP_P", 0.9),
+            response_schema=reasoner_decision_schema() if config.get("LLM_STRUCTURED_OUTPUT", True) else None,
+            stop_after_json=True
         )
 
     def _apply_deterministic_selection(self, decision: Dict[str, Any]) -> Dict[str, Any]:
@@ -156,79 +282,39 @@ class Operation(BaseOperation):
         Это гарантирует, что даже если LLM ошиблась в final_decision,
         система сама исправит выбор на основе уверенности.
         """
-        hypotheses = decision.get("hypotheses", [])
-        if not hypotheses:
-            decision["final_decision"]["selected_hypothesis"] = -1
-            return decision
-
-        # Фильтруем гипотезы с уверенностью < 0.5
-        viable = [i for i, h in enumerate(hypotheses) if h.get("confidence", 0) >= 0.5]
-        if not viable:
-            decision["final_decision"]["selected_hypothesis"] = -1
-            return decision
-
-        # Выбираем гипотезу с максимальной уверенностью
-        best_idx = max(viable, key=lambda i: hypotheses[i].get("confidence", 0))
+        # Один проход: гипотезы с уверенностью < 0.5 отбрасываются, среди остальных
+        # выбирается максимальная (при равенстве — первая); -1, если подходящих нет
+        best_idx, best_conf = -1, _MIN_HYPOTHESIS_CONFIDENCE
+        for i, h in enumerate(decision.get("hypotheses", [])):
+            c = h.get("confidence", 0)
+            if c > best_conf or (c == best_conf and best_idx == -1):
+                best_idx, best_conf = i, c
         decision["final_decision"]["selected_hypothesis"] = best_idx
         return decision
 
     def _validate_decision(self, decision: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
         """
-        Валидирует полную структуру решения.
+        Валидирует полную структуру решения скомпилированной JSON Schema (_DECISION_SCHEMA).
         Проверяет наличие и корректность всех обязательных полей.
         """
-        # === 1. Проверка reasoning ===
-        if "reasoning" not in decision:
-            return False, "Отсутствует поле reasoning"
-        reasoning = decision["reasoning"]
-        if not isinstance(reasoning, list) or len(reasoning) != 7:
-            return False, "reasoning должен содержать ровно 7 элементов (R1–R7)"
-        for i in range(7):
-            if not isinstance(reasoning[i], str) or not reasoning[i].startswith(f"R{i+1}:"):
-                return False, f"Элемент reasoning[{i}] должен начинаться с 'R{i+1}:'"
-
-        # === 2. Проверка гипотез ===
-        hypotheses = decision.get("hypotheses", [])
-        if not isinstance(hypotheses, list):
-            return False, "hypotheses должен быть списком"
-        for i, h in enumerate(hypotheses):
-            for field in ["agent", "operation", "params", "confidence", "reason", "explanation"]:
-                if field not in h:
-                    return False, f"Гипотеза #{i} не содержит поля '{field}'"
-            if not (0 <= h.get("confidence", -1) <= 1):
-                return False, f"Некорректная уверенность в гипотезе #{i}"
-
-        # === 3. Проверка postprocessing ===
-        postproc = decision.get("postprocessing")
-        if not postproc:
-            return False, "Отсутствует поле postprocessing"
-        for field in ["needed", "confidence", "reason", "explanation"]:
-            if field not in postproc:
-                return False, f"postprocessing не содержит поля '{field}'"
-
-        # === 4. Проверка validation ===
-        validation = decision.get("validation")
-        if not validation:
-            return False, "Отсутствует поле validation"
-        for field in ["needed", "confidence", "reason", "explanation"]:
-            if field not in validation:
-                return False, f"validation не содержит поля '{field}'"
-
-        # === 5. Проверка final_decision ===
-        final = decision.get("final_decision")
-        if not final:
-            return False, "Отсутствует поле final_decision"
-        if "selected_hypothesis" not in final:
-            return False, "final_decision не содержит selected_hypothesis"
-        if "explanation" not in final or not isinstance(final["explanation"], str) or len(final["explanation"].strip()) < 10:
-            return False, "final_decision.explanation должно содержать человекочитаемое резюме (1–2 предложения)"
-
+        try:
+            _VALIDATE_DECISION(decision)
+        except fastjsonschema.JsonSchemaValueException as e:
+            return False, schema_error_message(e)
         return True, None
 
+    @staticmethod
+    def _dump_prompt(request: LLMRequest) -> str:
+        """Сериализует запрос к LLM для диагностики."""
+        try:
+            return dumps_json(asdict(request), default=str)
+        except TypeError:
+            return str(request)
+
     def _create_error_result(
         self,
         message: str,
-        prompt: str,
+        get_prompt: Callable[[], str],
         raw_response: str,
         params: Dict,
         llm_response,
@@ -236,15 +322,17 @@ class Operation(BaseOperation):
     ) -> AgentResult:
         """
         Создаёт объект AgentResult с ошибкой и полной диагностикой.
+        Промпт сериализуется только здесь (get_prompt), а не на каждом вызове run.
         """
+        prompt = get_prompt()
         LOG.error("ReasonerAgent ошибка: %s", message)
         LOG.debug("Промпт: %s", prompt)
         LOG.debug("Сырой ответ LLM: %s", raw_response)
-        LOG.debug("Извлеченное решение: %s", json.dumps(decision, indent=2) if decision else "Нет")
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("Извлеченное решение: %s", dumps_json(decision, indent=True, default=str) if decision else "Нет")
 
-        return AgentResult.error(
+        return _ERROR_REASONING(
             message=message,
-            stage="reasoning",
             input_params=params,
             thinking=getattr(llm_response, "thinking", ""),
             prompt=prompt,
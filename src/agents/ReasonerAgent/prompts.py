@@ -1,19 +1,22 @@
 # src/agents/ReasonerAgent/prompts.py
 from __future__ import annotations
 from typing import Dict, Any, Optional, List
-import json
 import textwrap
+from functools import lru_cache
 
-def build_universal_reasoner_prompt(
-    question: str,
-    step_outputs: Optional[Dict[str, Any]] = None,
-    tool_registry_snapshot: Optional[Dict[str, Any]] = None,
-    step_state: Optional[Dict[str, Any]] = None,
-) -> List[Dict[str, str]]:
-    """
-    Формирует промпт для ReasonerAgent с чёткими инструкциями и без избыточных примеров.
-    """
-    system_content = textwrap.dedent("""\
+from src.utils.utils import dumps_json, dumps_json_or_str
+
+# Ограничения на размер результатов шагов в промпте (в символах)
+_STEP_OUTPUT_MAX_CHARS = 800
+_STEP_OUTPUT_HEAD_CHARS = 400
+_STEP_OUTPUT_TAIL_CHARS = 200
+_STEP_OUTPUTS_MAX_CHARS = 4000
+
+# Проекция реестра инструментов для промпта (см. project_tool_registry)
+_AGENT_DESCRIPTION_MAX_CHARS = 120
+_PROMPT_OPERATION_KEYS = ("kind", "description", "params")
+
+_REASONER_INSTRUCTIONS = textwrap.dedent("""\
         ТЫ — ReasonerAgent в ReAct-системе. ТВОЯ ЗАДАЧА — ВЕРНУТЬ ТОЛЬКО ВАЛИДНЫЙ JSON.
 
         ### 🔍 Что такое гипотеза?
@@ -69,32 +72,136 @@ def build_universal_reasoner_prompt(
         - НИКАКОГО ТЕКСТА ВНЕ JSON.
         - Начни с '{', закончи '}'.
         - Не используй markdown, пояснения, комментарии.
-    """)
+""").strip()
+
+
+def build_universal_reasoner_prompt(
+    question: str,
+    step_outputs: Optional[Dict[str, Any]] = None,
+    tool_registry_snapshot: Optional[Dict[str, Any]] = None,
+    step_state: Optional[Dict[str, Any]] = None,
+    tool_registry_json: Optional[str] = None,
+    max_context_chars: int = _STEP_OUTPUTS_MAX_CHARS,
+) -> List[Dict[str, str]]:
+    """
+    Формирует промпт для ReasonerAgent с чёткими инструкциями и без избыточных примеров.
+
+    Порядок блоков рассчитан на prefix-кэширование: system-сообщение содержит только
+    стабильные данные (инструкции и реестр инструментов), а всё, что меняется от вызова
+    к вызову (подвопрос, step_outputs, состояние шага), находится в user-сообщении.
+    Статическая часть собирается один раз на каждый вариант реестра инструментов.
+
+    tool_registry_json — уже сериализованный реестр (serialize_tool_registry): если передан,
+    tool_registry_snapshot повторно не сериализуется.
+
+    max_context_chars — бюджет на блок результатов шагов: длинные результаты обрезаются,
+    а не поместившиеся в бюджет опускаются (см. _format_step_outputs).
+    """
+    tools_json = tool_registry_json
+    if tools_json is None:
+        tools_json = serialize_tool_registry(tool_registry_snapshot)
+    return [
+        {"role": "system", "content": _build_static_preamble(tools_json)},
+        {"role": "user", "content": _build_dynamic_tail(question, step_outputs, step_state, max_context_chars)}
+    ]
+
+
+def project_tool_registry(tool_registry_snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Компактная проекция реестра инструментов для промпта.
+
+    Для выбора гипотезы модели нужны имена операций, их тип (DIRECT/SEMANTIC, см. R6),
+    описание и схема параметров. Заголовок агента и схемы выходных данных в промпт
+    не попадают, описание агента обрезается до _AGENT_DESCRIPTION_MAX_CHARS.
+    Полный реестр по-прежнему используется при исполнении гипотез.
+    """
+    projection = {}
+    for name, meta in tool_registry_snapshot.items():
+        agent_view: Dict[str, Any] = {}
+        description = meta.get("description")
+        if description:
+            agent_view["description"] = description[:_AGENT_DESCRIPTION_MAX_CHARS]
+        agent_view["operations"] = {
+            op_name: {key: op_meta[key] for key in _PROMPT_OPERATION_KEYS if key in op_meta}
+            for op_name, op_meta in (meta.get("operations") or {}).items()
+        }
+        projection[name] = agent_view
+    return projection
+
+
+def serialize_tool_registry(tool_registry_snapshot: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Детерминированная сериализация проекции реестра инструментов для промпта
+    (None — реестр пуст). Реестр общий для всех шагов, поэтому вызывающий код
+    сериализует его один раз и передаёт строку в
+    build_universal_reasoner_prompt(tool_registry_json=...).
+    """
+    if not tool_registry_snapshot:
+        return None
+    return dumps_json(project_tool_registry(tool_registry_snapshot), sort_keys=True)
+
+
+@lru_cache(maxsize=16)
+def _build_static_preamble(tools_json: Optional[str]) -> str:
+    """
+    Статическая часть: инструкции + реестр инструментов.
+    Реестр меняется редко, поэтому идёт в system-сообщение сразу после инструкций
+    с детерминированной сериализацией (sort_keys): префикс промпта побайтно совпадает
+    между вызовами и переиспользуется prefix/KV-кэшем провайдера.
+    """
+    tools_block = "### 📚 Доступные инструменты\n" + (tools_json or "Нет")
+    return _REASONER_INSTRUCTIONS + "\n\n" + tools_block
 
-    # --- Формируем пользовательскую часть ---
+
+def _build_dynamic_tail(
+    question: str,
+    step_outputs: Optional[Dict[str, Any]],
+    step_state: Optional[Dict[str, Any]],
+    max_context_chars: int = _STEP_OUTPUTS_MAX_CHARS,
+) -> str:
+    """Изменяемая часть: подвопрос, результаты шагов, состояние — в конце промпта."""
     user_parts = [f"### ❓ Подвопрос\n{question}"]
 
     if step_outputs:
         user_parts.append("### 📤 Результаты других шагов")
-        user_parts.append(json.dumps(step_outputs, ensure_ascii=False, indent=2))
+        user_parts.append(_format_step_outputs(step_outputs, max_context_chars))
     else:
         user_parts.append("### 📤 Результаты других шагов\nНет")
 
-    if tool_registry_snapshot:
-        user_parts.append("### 📚 Доступные инструменты")
-        user_parts.append(json.dumps(tool_registry_snapshot, ensure_ascii=False, indent=2))
-    else:
-        user_parts.append("### 📚 Доступные инструменты\nНет")
-
     if step_state:
         safe_state = {k: v for k, v in step_state.items() if k in ("retry_count", "validation_feedback")}
         if safe_state:
             user_parts.append("### 🧠 Состояние шага")
-            user_parts.append(json.dumps(safe_state, ensure_ascii=False, indent=2))
+            user_parts.append(dumps_json_or_str(safe_state, indent=True))
 
-    user_content = "\n\n".join(user_parts)
+    return "\n\n".join(user_parts).strip()
 
-    return [
-        {"role": "system", "content": system_content.strip()},
-        {"role": "user", "content": user_content.strip()}
-    ]
\ No newline at end of file
+
+def _truncate_middle(text: str) -> str:
+    """Обрезает длинный текст, сохраняя начало и конец."""
+    if len(text) <= _STEP_OUTPUT_MAX_CHARS:
+        return text
+    return text[:_STEP_OUTPUT_HEAD_CHARS] + "\n…[обрезано]…\n" + text[-_STEP_OUTPUT_TAIL_CHARS:]
+
+
+def _format_step_outputs(step_outputs: Dict[str, Any], max_context_chars: int) -> str:
+    """
+    Сериализует результаты шагов с ограничением размера.
+    Каждый результат обрезается до _STEP_OUTPUT_MAX_CHARS; бюджет max_context_chars
+    заполняется начиная с последних шагов (самых свежих), остальные опускаются.
+    Иначе размер промпта растёт с каждым шагом плана.
+    """
+    blocks = []
+    total = 0
+    for step_id, output in reversed(step_outputs.items()):
+        block = f"{step_id}: {_truncate_middle(dumps_json_or_str(output, indent=True))}"
+        if blocks and total + len(block) > max_context_chars:
+            break
+        blocks.append(block)
+        total += len(block)
+
+    blocks.reverse()
+    elided = len(step_outputs) - len(blocks)
+    if elided:
+        blocks.insert(0, f"… ещё {elided} результат(ов) шагов опущено")
+    return "\n".join(blocks)
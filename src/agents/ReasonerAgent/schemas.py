@@ -0,0 +1,57 @@
+# src/agents/ReasonerAgent/schemas.py
+"""
+Pydantic-схема решения ReasonerAgent (ответ операции decide_next_stage).
+
+Схема повторяет формат, описанный в промпте (prompts.py), и используется как
+JSON Schema для constrained decoding: адаптеры, умеющие ограничивать генерацию
+схемой (например, llama_cpp через GBNF-грамматику), получают её в
+LLMRequest.response_schema и не дают модели выйти за рамки формата.
+
+Семантические проверки (префиксы R1–R7, длина explanation и т.п.) остаются
+в DecideNextStageOperation._validate_decision — схема их не заменяет.
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+from typing import Any, Dict, List
+
+from pydantic import BaseModel, Field
+
+
+class Hypothesis(BaseModel):
+    """Гипотеза: вызов операции агента с параметрами."""
+    agent: str
+    operation: str
+    params: Dict[str, Any] = Field(default_factory=dict)
+    confidence: float = Field(ge=0.0, le=1.0)
+    reason: str
+    explanation: str
+
+
+class StageNeed(BaseModel):
+    """Решение о необходимости этапа (postprocessing / validation)."""
+    needed: bool
+    confidence: float = Field(ge=0.0, le=1.0)
+    reason: str
+    explanation: str
+
+
+class FinalDecision(BaseModel):
+    """Итоговый выбор гипотезы (-1 — ни одна не подходит)."""
+    selected_hypothesis: int
+    explanation: str
+
+
+class ReasonerDecision(BaseModel):
+    """Полное решение ReasonerAgent для одного шага."""
+    reasoning: List[str] = Field(min_length=7, max_length=7)
+    hypotheses: List[Hypothesis] = Field(default_factory=list)
+    postprocessing: StageNeed
+    validation: StageNeed
+    final_decision: FinalDecision
+
+
+@lru_cache(maxsize=1)
+def reasoner_decision_schema() -> Dict[str, Any]:
+    """JSON Schema решения (строится один раз на процесс)."""
+    return ReasonerDecision.model_json_schema()
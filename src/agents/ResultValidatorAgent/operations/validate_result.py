@@ -5,16 +5,84 @@
 """
 
 from __future__ import annotations
-import json
 import logging
+from functools import partial
 from typing import Any, Dict, List, Optional, Tuple
+
+import fastjsonschema
+
 from src.agents.ResultValidatorAgent.prompt import build_validation_prompt
+from src.agents.ResultValidatorAgent.schemas import validation_schema
 from src.agents.operations_base import BaseOperation, OperationKind
 from src.model.agent_result import AgentResult
 from src.services.llm_service.model.request import LLMMessage, LLMRequest
+from src.services.llm_service.model.response import LLMResponse
+from src.services.llm_service.response_cache import RESPONSE_CACHE
+from src.utils.utils import dumps_json, schema_error_message
 
 LOG = logging.getLogger(__name__)
 
+_EMPTY_OUTPUT_REASONING = (
+    "V1: Нет — результат пуст.",
+    "V2: Нет — данных нет.",
+    "V3: Противоречий нет — данных нет.",
+    "V4: Нет — данных недостаточно.",
+)
+
+# Схема ответа для валидации: компилируется fastjsonschema один раз при импорте
+_REASONING_PREFIXES = ("V1:", "V2:", "V3:", "V4:")
+_VERDICT_FIELDS = ("is_valid", "confidence", "reason", "explanation")
+
+_VALIDATION_SCHEMA = {
+    "type": "object",
+    "required": ["reasoning", "validation"],
+    "properties": {
+        # Ровно 4 строки, i-я начинается с "V{i}:"
+        "reasoning": {
+            "type": "array",
+            "minItems": len(_REASONING_PREFIXES),
+            "maxItems": len(_REASONING_PREFIXES),
+            "items": [{"type": "string", "pattern": f"^{prefix}"} for prefix in _REASONING_PREFIXES],
+        },
+        "validation": {
+            "type": "object",
+            "required": list(_VERDICT_FIELDS),
+            "properties": {"confidence": {"type": "number", "minimum": 0, "maximum": 1}},
+        },
+    },
+}
+_VALIDATE_ANSWER = fastjsonschema.compile(_VALIDATION_SCHEMA)
+
+def validate_answer_structure(answer: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+    """
+    Проверяет ответ с вердиктом (reasoning V1–V4 и validation) скомпилированной
+    JSON Schema (_VALIDATION_SCHEMA). Используется также DataAnalysisAgent.analyze_and_validate.
+
+    Returns:
+        (True, None) или (False, текст ошибки на русском).
+    """
+    try:
+        _VALIDATE_ANSWER(answer)
+    except fastjsonschema.JsonSchemaValueException as e:
+        return False, schema_error_message(e)
+    return True, None
+
+
+_NO_LLM_ERROR = partial(
+    AgentResult.error,
+    message="LLM не инициализирована в ResultValidatorAgent",
+    stage="result_validation",
+)
+
+
+def _is_empty_output(raw_output: Any) -> bool:
+    """None, пустая коллекция или строка из пробелов."""
+    if raw_output is None:
+        return True
+    if isinstance(raw_output, str):
+        return not raw_output.strip()
+    return isinstance(raw_output, (list, dict, tuple, set)) and not raw_output
+
 
 class Operation(BaseOperation):
     kind = OperationKind.VALIDATION
@@ -36,37 +104,106 @@ class Operation(BaseOperation):
     }
 
     def run(self, params: Dict[str, Any], context: Dict[str, Any], agent) -> AgentResult:
-        subquestion = params["subquestion_text"]
-        raw_output = params["raw_output"]
-        agent_calls = params.get("agent_calls", [])
-        step_state = params.get("step_state", {})
+        # Пустой результат заведомо не отвечает на подвопрос — вызов LLM не нужен
+        if _is_empty_output(params["raw_output"]):
+            return self._empty_output_result(params["subquestion_text"], params)
 
         if agent.llm is None:
-            return AgentResult.error(
-                message="LLM не инициализирована в ResultValidatorAgent",
-                stage="result_validation"
-            )
+            return _NO_LLM_ERROR()
+
+        return self._complete(params, *self._prepare_request(params, agent), agent)
+
+    def run_batch(
+        self,
+        params_list: List[Dict[str, Any]],
+        context: Dict[str, Any],
+        agent
+    ) -> List[AgentResult]:
+        """
+        Проверяет результаты нескольких шагов.
+        Запросы, отсутствующие в кэше, отправляются в LLM одним пакетом
+        (generate_with_request_batch), чтобы бэкенд мог обработать их вместе.
+        Пустые результаты отклоняются без LLM, как и в run.
+        """
+        if agent.llm is None:
+            return [
+                self._empty_output_result(params["subquestion_text"], params)
+                if _is_empty_output(params["raw_output"]) else _NO_LLM_ERROR()
+                for params in params_list
+            ]
 
+        prepared = [
+            None if _is_empty_output(params["raw_output"]) else self._prepare_request(params, agent)
+            for params in params_list
+        ]
+        responses = [
+            RESPONSE_CACHE.get(item[1]) if item and item[1] else None
+            for item in prepared
+        ]
+        pending = [i for i, item in enumerate(prepared) if item and responses[i] is None]
+
+        generate_batch = getattr(agent.llm, "generate_with_request_batch", None)
+        if len(pending) > 1 and generate_batch is not None:
+            try:
+                generated = generate_batch([prepared[i][0] for i in pending])
+                for i, (_, llm_response) in zip(pending, generated):
+                    responses[i] = llm_response
+            except Exception:
+                # Не вышло пакетом — _complete вызовет LLM для каждого запроса отдельно
+                LOG.exception("validate_result: ошибка пакетной генерации")
+
+        return [
+            self._complete(params, *item, agent, llm_response) if item
+            else self._empty_output_result(params["subquestion_text"], params)
+            for params, item, llm_response in zip(params_list, prepared, responses)
+        ]
+
+    def _prepare_request(self, params: Dict[str, Any], agent) -> Tuple[LLMRequest, Optional[str], str]:
+        """Строит LLMRequest, ключ кэша ответов (None, если кэш отключён) и текст промпта."""
         # === Формируем промпт ===
-        prompt_text = build_validation_prompt(
-            subquestion_text=subquestion,
-            raw_output=raw_output,
-            agent_calls=agent_calls,
-            step_state=step_state,
+        messages = build_validation_prompt(
+            subquestion_text=params["subquestion_text"],
+            raw_output=params["raw_output"],
+            agent_calls=params.get("agent_calls", []),
+            step_state=params.get("step_state", {}),
         )
+        # Текстовое представление промпта — для диагностики в AgentResult
+        prompt_text = "\n\n".join(msg["content"] for msg in messages)
 
         # === Формируем запрос в формате LLMRequest ===
         request = LLMRequest(
-            messages=[
-                LLMMessage(role="user", content=prompt_text)
-            ],
+            messages=[LLMMessage(role=msg["role"], content=msg["content"]) for msg in messages],
             temperature=0.0,  # Для валидации — детерминированность
-            max_tokens=1024
+            max_tokens=1024,
+            response_schema=validation_schema() if agent.config.get("LLM_STRUCTURED_OUTPUT", True) else None,
+            stop_after_json=True
         )
 
+        # Кэш точного совпадения: одинаковый запрос не отправляется в LLM повторно
+        cache_key = None
+        if agent.config.get("LLM_CACHE_ENABLED", True):
+            cache_key = RESPONSE_CACHE.make_key(request, namespace=agent.config.get("llm_profile"))
+        return request, cache_key, prompt_text
+
+    def _complete(
+        self,
+        params: Dict[str, Any],
+        request: LLMRequest,
+        cache_key: Optional[str],
+        prompt_text: str,
+        agent,
+        llm_response: Optional[LLMResponse] = None
+    ) -> AgentResult:
+        """Получает ответ LLM (если он ещё не получен), извлекает и проверяет вердикт."""
+        subquestion = params["subquestion_text"]
         try:
-            # === Вызываем LLM через единый интерфейс ===
-            _, llm_response = agent.llm.generate_with_request(request)
+            # === Вызываем LLM через единый интерфейс (или берём ответ из кэша) ===
+            if llm_response is None:
+                llm_response = RESPONSE_CACHE.get(cache_key) if cache_key else None
+                if llm_response is None:
+                    _, llm_response = agent.llm.generate_with_request(request)
+                else:
+                    LOG.debug("validate_result: ответ LLM взят из кэша")
 
             # === Извлекаем решение ===
             validation = llm_response.json_answer
@@ -80,7 +217,7 @@ class Operation(BaseOperation):
                 )
 
             # === Валидация структуры ===
-            is_valid, error_msg = self._validate_structure(validation)
+            is_valid, error_msg = validate_answer_structure(validation)
             if not is_valid:
                 return self._create_error_result(
                     f"Некорректная структура валидации: {error_msg}",
@@ -91,6 +228,10 @@ class Operation(BaseOperation):
                     validation
                 )
 
+            # В кэш попадают только ответы, прошедшие валидацию структуры
+            if cache_key:
+                RESPONSE_CACHE.put(cache_key, llm_response)
+
             # === Формируем результат ===
             val_data = validation["validation"]
             output = {
@@ -100,29 +241,22 @@ class Operation(BaseOperation):
                 "explanation": val_data["explanation"]
             }
 
+            # Проверка выполнена успешно (status ok) и при is_valid=False:
+            # reasoner_node по validation_result запускает повторную попытку шага
             if val_data["is_valid"]:
-                return AgentResult.ok(
-                    stage="result_validation",
-                    output=output,
-                    summary=f"Результат для подвопроса '{subquestion}' признан валидным.",
-                    input_params=params,
-                    thinking=llm_response.thinking,
-                    prompt=prompt_text,
-                    raw_response=llm_response.raw_text,
-                    tokens_used=llm_response.tokens_used
-                )
+                summary = f"Результат для подвопроса '{subquestion}' признан валидным."
             else:
-                return AgentResult.error(
-                    message=val_data["explanation"],
-                    stage="result_validation",
-                    output=output,
-                    summary=f"Валидация провалена для подвопроса '{subquestion}'.",
-                    input_params=params,
-                    thinking=llm_response.thinking,
-                    prompt=prompt_text,
-                    raw_response=llm_response.raw_text,
-                    tokens_used=llm_response.tokens_used
-                )
+                summary = f"Валидация провалена для подвопроса '{subquestion}'."
+            return AgentResult.ok(
+                stage="result_validation",
+                output=output,
+                summary=summary,
+                input_params=params,
+                thinking=llm_response.thinking,
+                prompt=prompt_text,
+                raw_response=llm_response.raw_text,
+                tokens_used=llm_response.tokens_used
+            )
 
         except Exception as e:
             LOG.exception("Ошибка при валидации результата через LLM")
@@ -132,30 +266,24 @@ class Operation(BaseOperation):
                 input_params=params
             )
 
-    def _validate_structure(self, validation: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
-        """Валидирует структуру ответа."""
-        if "reasoning" not in validation:
-            return False, "Отсутствует поле reasoning"
-        if not isinstance(validation["reasoning"], list) or len(validation["reasoning"]) != 4:
-            return False, "reasoning должен содержать 4 элемента (V1–V4)"
-
-        for i in range(4):
-            if not isinstance(validation["reasoning"][i], str) or not validation["reasoning"][i].startswith(f"V{i+1}:"):
-                return False, f"Элемент reasoning[{i}] должен начинаться с 'V{i+1}:'"
-
-        if "validation" not in validation:
-            return False, "Отсутствует поле validation"
-
-        val = validation["validation"]
-        required = ["is_valid", "confidence", "reason", "explanation"]
-        for field in required:
-            if field not in val:
-                return False, f"Отсутствует поле validation.{field}"
-
-        if not (0 <= val.get("confidence", -1) <= 1):
-            return False, "Некорректная уверенность в validation.confidence"
-
-        return True, None
+    def _empty_output_result(self, subquestion: str, params: Dict[str, Any]) -> AgentResult:
+        """
+        Детерминированный вердикт для пустого raw_output (в формате ответа LLM-валидатора).
+        Сама проверка выполнена успешно (status ok), но результат невалиден:
+        reasoner_node по is_valid=False запускает повторную попытку шага.
+        """
+        explanation = "Шаг вернул пустой результат, ответа на подвопрос нет."
+        return AgentResult.ok(
+            stage="result_validation",
+            output={
+                "is_valid": False,
+                "confidence": 1.0,
+                "reasoning": list(_EMPTY_OUTPUT_REASONING),
+                "explanation": explanation,
+            },
+            summary=f"Валидация провалена для подвопроса '{subquestion}': пустой результат.",
+            input_params=params,
+        )
 
     def _create_error_result(
         self,
@@ -170,7 +298,8 @@ class Operation(BaseOperation):
         LOG.error("ResultValidatorAgent ошибка: %s", message)
         LOG.debug("Промпт: %s", prompt)
         LOG.debug("Сырой ответ LLM: %s", raw_response)
-        LOG.debug("Извлечённая валидация: %s", json.dumps(validation, indent=2) if validation else "Нет")
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("Извлечённая валидация: %s", dumps_json(validation, indent=True, default=str) if validation else "Нет")
 
         return AgentResult.error(
             message=message,
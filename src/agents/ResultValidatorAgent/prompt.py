@@ -19,22 +19,55 @@
 """
 
 from typing import Any, Dict, List, Optional
-import json
+
+from src.utils.utils import dumps_json_or_str
+
+# Статическая часть промпта (роль, вопросы V1–V4, формат ответа) одинакова для всех
+# шагов и идёт первой в system-сообщении: префикс переиспользуется KV-кэшем модели
+_VALIDATOR_INSTRUCTIONS = """Ты — валидатор результатов в системе автоматического планирования.
+Твоя задача — строго определить, отвечает ли предоставленный результат на заданный подвопрос,
+**с учётом истории выполнения и текущего состояния шага**.
+
+### 📌 Обязательный анализ (ответь на V1–V4 и включи в "reasoning")
+V1. Результат полностью отвечает на подвопрос?
+V2. Данные соответствуют ожидаемому формату?
+V3. Есть ли противоречия в данных?
+V4. Достаточно ли данных для ответа?
+Каждый пункт "reasoning" — одна короткая фраза (до 15 слов), без пересказа данных.
+
+### 📏 СТРУКТУРА ОТВЕТА
+{
+  "reasoning": ["V1: ...", "V2: ...", "V3: ...", "V4: ..."],
+  "validation": {
+    "is_valid": true|false,
+    "confidence": 0.0–1.0,
+    "reason": "Краткий ответ на V1–V4",
+    "explanation": "Человекочитаемое обоснование (1–2 предложения)"
+  }
+}
+
+### ⚠️ ВАЖНО
+- НИКАКОГО ТЕКСТА ВНЕ JSON.
+- Начни с '{', закончи '}'.
+- Не используй markdown, пояснения, комментарии.
+"""
+
 
 def build_validation_prompt(
     subquestion_text: str,
     raw_output: Any,
     agent_calls: List[Dict] = None,
     step_state: Dict = None,
-) -> str:
+) -> List[Dict[str, str]]:
     """
     Формирует промпт для валидатора с чёткой структурой ответа.
+
+    Возвращает список сообщений: system — неизменные инструкции, user — данные шага
+    (подвопрос, результат, история вызовов, состояние). Изменяемая часть идёт последней,
+    чтобы префикс промпта совпадал между вызовами.
     """
     # --- Форматируем результат ---
-    try:
-        output_str = json.dumps(raw_output, ensure_ascii=False, indent=2)
-    except Exception:
-        output_str = str(raw_output)
+    output_str = dumps_json_or_str(raw_output, indent=True)
 
     # --- Форматируем историю вызовов ---
     calls_str = "Нет вызовов."
@@ -54,16 +87,10 @@ def build_validation_prompt(
     # --- Форматируем состояние шага ---
     state_str = "Нет данных."
     if step_state:
-        try:
-            state_str = json.dumps(step_state, ensure_ascii=False, indent=2)
-        except Exception:
-            state_str = str(step_state)
-
-    return f"""Ты — валидатор результатов в системе автоматического планирования.
-Твоя задача — строго определить, отвечает ли предоставленный результат на заданный подвопрос,
-**с учётом истории выполнения и текущего состояния шага**.
+        state_str = dumps_json_or_str(step_state, indent=True)
 
-### Подвопрос
+    # --- Изменяемая часть: данные шага ---
+    user_content = f"""### Подвопрос
 {subquestion_text}
 
 ### Результат выполнения шага (raw_output)
@@ -73,27 +100,9 @@ def build_validation_prompt(
 {calls_str}
 
 ### Состояние шага
-{state_str}
+{state_str}"""
 
-### 📌 Обязательный анализ (ответь на V1–V4 и включи в "reasoning")
-V1. Результат полностью отвечает на подвопрос?
-V2. Данные соответствуют ожидаемому формату?
-V3. Есть ли противоречия в данных?
-V4. Достаточно ли данных для ответа?
-
-### 📏 СТРУКТУРА ОТВЕТА
-{{
-  "reasoning": ["V1: ...", "V2: ...", "V3: ...", "V4: ..."],
-  "validation": {{
-    "is_valid": true|false,
-    "confidence": 0.0–1.0,
-    "reason": "Краткий ответ на V1–V4",
-    "explanation": "Человекочитаемое обоснование (1–2 предложения)"
-  }}
-}}
-
-### ⚠️ ВАЖНО
-- НИКАКОГО ТЕКСТА ВНЕ JSON.
-- Начни с '{{', закончи '}}'.
-- Не используй markdown, пояснения, комментарии.
-"""
\ No newline at end of file
+    return [
+        {"role": "system", "content": _VALIDATOR_INSTRUCTIONS},
+        {"role": "user", "content": user_content},
+    ]
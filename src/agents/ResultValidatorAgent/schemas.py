@@ -0,0 +1,37 @@
+# src/agents/ResultValidatorAgent/schemas.py
+"""
+Pydantic-схема вердикта ResultValidatorAgent (ответ операции validate_result).
+
+Схема повторяет формат, описанный в промпте (prompt.py), и передаётся адаптеру
+в LLMRequest.response_schema для constrained decoding (llama_cpp — GBNF-грамматика):
+модель генерирует только ответ нужной структуры, без повторов из-за невалидного JSON.
+
+Проверка префиксов V1–V4 остаётся в validate_answer_structure (validate_result.py) — она же
+работает для бэкендов без поддержки response_schema.
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+from typing import Any, Dict, List
+
+from pydantic import BaseModel, Field
+
+
+class Verdict(BaseModel):
+    """Итог проверки результата шага."""
+    is_valid: bool
+    confidence: float = Field(ge=0.0, le=1.0)
+    reason: str
+    explanation: str
+
+
+class ValidationAnswer(BaseModel):
+    """Полный ответ валидатора: ответы на V1–V4 и вердикт."""
+    reasoning: List[str] = Field(min_length=4, max_length=4)
+    validation: Verdict
+
+
+@lru_cache(maxsize=1)
+def validation_schema() -> Dict[str, Any]:
+    """JSON Schema ответа валидатора (строится один раз на процесс)."""
+    return ValidationAnswer.model_json_schema()
@@ -1,7 +1,26 @@
 # src/agents/StepResultRelayAgent/operations/relay_step_result.py
+from functools import partial
+
 from src.agents.operations_base import BaseOperation, OperationKind
 from src.model.agent_result import AgentResult
 
+_OK_RELAY = partial(AgentResult.ok, stage="data_fetch")
+_ERROR_RELAY = partial(AgentResult.error, stage="data_fetch")
+
+
+def _find_step_output(context, step_id):
+    """
+    Ищет raw_output шага в контексте: в step_outputs или в состоянии графа
+    (execution.steps, как его передаёт executor_node). Значение возвращается
+    по ссылке, без копирования.
+    """
+    step_outputs = context.get("step_outputs") or {}
+    if step_id in step_outputs:
+        return step_outputs[step_id]
+    step = ((context.get("execution") or {}).get("steps") or {}).get(step_id)
+    return step.get("raw_output") if step else None
+
+
 class Operation(BaseOperation):
     kind = OperationKind.DIRECT
     description = "Возвращает результат выполнения указанного шага из контекста."
@@ -13,17 +32,15 @@ class Operation(BaseOperation):
     def run(self, params, context, agent):
         source_step_id = params.get("source_step_id")
         if not source_step_id:
-            return AgentResult.error("Требуется параметр source_step_id")
+            return _ERROR_RELAY(message="Требуется параметр source_step_id")
 
-        # Получаем raw_output из контекста
-        step_outputs = context.get("step_outputs", {})
-        result = step_outputs.get(source_step_id)
+        # Получаем raw_output из контекста; AgentResult хранит output как есть — данные не копируются
+        result = _find_step_output(context or {}, source_step_id)
 
         if result is None:
-            return AgentResult.error(f"Результат для шага {source_step_id} не найден")
+            return _ERROR_RELAY(message=f"Результат для шага {source_step_id} не найден")
 
-        return AgentResult.ok(
-            stage="data_fetch",
+        return _OK_RELAY(
             output=result,
             summary=f"Результат шага {source_step_id} успешно передан"
-        )
\ No newline at end of file
+        )
@@ -5,16 +5,61 @@
 """
 
 from __future__ import annotations
-import json
 import logging
-from typing import Any, Dict, Optional, Tuple
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+import fastjsonschema
+
 from src.agents.SynthesizerAgent.prompt import build_synthesis_prompt
 from src.agents.operations_base import BaseOperation, OperationKind
 from src.model.agent_result import AgentResult
 from src.services.llm_service.model.request import LLMMessage, LLMRequest
+from src.services.llm_service.model.response import LLMResponse
+from src.services.llm_service.response_cache import RESPONSE_CACHE
+from src.utils.utils import dumps_json, schema_error_message
 
 LOG = logging.getLogger(__name__)
 
+# Схема ответа синтеза: компилируется fastjsonschema один раз при импорте
+_REASONING_PREFIXES = ("S1:", "S2:", "S3:", "S4:")
+_SYNTHESIS_FIELDS = ("final_answer", "confidence", "reason", "explanation")
+
+_SYNTHESIS_SCHEMA = {
+    "type": "object",
+    "required": ["reasoning", "synthesis"],
+    "properties": {
+        # Ровно 4 строки, i-я начинается с "S{i}:"
+        "reasoning": {
+            "type": "array",
+            "minItems": len(_REASONING_PREFIXES),
+            "maxItems": len(_REASONING_PREFIXES),
+            "items": [{"type": "string", "pattern": f"^{prefix}"} for prefix in _REASONING_PREFIXES],
+        },
+        "synthesis": {
+            "type": "object",
+            "required": list(_SYNTHESIS_FIELDS),
+            "properties": {"confidence": {"type": "number", "minimum": 0, "maximum": 1}},
+        },
+    },
+}
+_VALIDATE_ANSWER = fastjsonschema.compile(_SYNTHESIS_SCHEMA)
+
+# Ответ без обращения к LLM: план из одного подвопроса, совпадающего с вопросом,
+# и текстовый результат этого шага (см. _direct_answer)
+_DIRECT_REASONING = [
+    "S1: Да — единственный подвопрос совпадает с вопросом.",
+    "S2: Да — результат шага уже является ответом.",
+    "S3: Нет — результат один.",
+    "S4: Нет.",
+]
+
+_NO_LLM_ERROR = partial(
+    AgentResult.error,
+    message="LLM не инициализирована в SynthesizerAgent",
+    stage="synthesis",
+)
+
 
 class Operation(BaseOperation):
     """
@@ -41,35 +86,138 @@ class Operation(BaseOperation):
     }
 
     def run(self, params: Dict[str, Any], context: Dict[str, Any], agent) -> AgentResult:
-        question = params["question"]
-        plan = params["plan"]
-        step_outputs = params["step_outputs"]
+        direct = self._direct_answer(params)
+        if direct is not None:
+            return direct
 
         if not agent.llm:
-            return AgentResult.error(
-                message="LLM не инициализирована в SynthesizerAgent",
-                stage="synthesis"
-            )
+            return _NO_LLM_ERROR()
+
+        return self._complete(params, *self._prepare_request(params, agent), agent)
+
+    def run_batch(
+        self,
+        params_list: List[Dict[str, Any]],
+        context: Dict[str, Any],
+        agent
+    ) -> List[AgentResult]:
+        """
+        Синтезирует ответы на несколько вопросов.
+        Запросы, отсутствующие в кэше, отправляются в LLM одним пакетом
+        (generate_with_request_batch), чтобы бэкенд мог обработать их вместе.
+        """
+        # Вопросы с ответом без LLM (см. _direct_answer) в пакет не попадают
+        results = [self._direct_answer(params) for params in params_list]
+        llm_indices = [i for i, result in enumerate(results) if result is None]
+        if not llm_indices:
+            return results
+
+        if not agent.llm:
+            return [result or _NO_LLM_ERROR() for result in results]
+
+        prepared = {i: self._prepare_request(params_list[i], agent) for i in llm_indices}
+        responses = {
+            i: RESPONSE_CACHE.get(cache_key) if cache_key else None
+            for i, (_, cache_key, _) in prepared.items()
+        }
+        pending = [i for i, response in responses.items() if response is None]
+
+        generate_batch = getattr(agent.llm, "generate_with_request_batch", None)
+        if len(pending) > 1 and generate_batch is not None:
+            try:
+                generated = generate_batch([prepared[i][0] for i in pending])
+                for i, (_, llm_response) in zip(pending, generated):
+                    responses[i] = llm_response
+            except Exception:
+                # Не вышло пакетом — _complete вызовет LLM для каждого запроса отдельно
+                LOG.exception("synthesize: ошибка пакетной генерации")
 
+        for i in llm_indices:
+            results[i] = self._complete(params_list[i], *prepared[i], agent, responses[i])
+        return results
+
+    def _direct_answer(self, params: Dict[str, Any]) -> Optional[AgentResult]:
+        """
+        Возвращает ответ без обращения к LLM, если синтезировать нечего: план состоит
+        из одного подвопроса с текстом исходного вопроса, а результат шага — непустая строка.
+        Иначе None.
+        """
+        question = params.get("question")
+        plan = params.get("plan")
+        step_outputs = params.get("step_outputs")
+        # Некорректные данные не должны ронять синтез (и весь пакет в run_batch):
+        # такие вопросы просто идут через LLM
+        if not isinstance(question, str) or not isinstance(plan, dict) or not isinstance(step_outputs, dict):
+            return None
+        subquestions = plan.get("subquestions")
+        if not isinstance(subquestions, list) or len(subquestions) != 1 or len(step_outputs) != 1:
+            return None
+        if not isinstance(subquestions[0], dict):
+            return None
+        if str(subquestions[0].get("text", "")).strip().casefold() != question.strip().casefold():
+            return None
+        answer = next(iter(step_outputs.values()))
+        if not isinstance(answer, str) or not answer.strip():
+            return None
+
+        LOG.debug("synthesize: ответ взят из результата единственного шага без LLM")
+        return AgentResult.ok(
+            stage="synthesis",
+            output={
+                "final_answer": answer.strip(),
+                "confidence": 1.0,
+                "reasoning": list(_DIRECT_REASONING),
+                "explanation": "Ответ — результат единственного шага плана."
+            },
+            summary=f"Ответ на вопрос без синтеза: {question[:50]}...",
+            input_params=params
+        )
+
+    def _prepare_request(self, params: Dict[str, Any], agent) -> Tuple[LLMRequest, Optional[str], str]:
+        """Строит LLMRequest, ключ кэша ответов (None, если кэш отключён) и текст промпта."""
         # === Формируем промпт ===
-        prompt_text = build_synthesis_prompt(
-            original_question=question,
-            plan=plan,
-            step_outputs=step_outputs,
+        messages = build_synthesis_prompt(
+            original_question=params["question"],
+            plan=params["plan"],
+            step_outputs=params["step_outputs"],
         )
+        # Текстовое представление промпта — для диагностики в AgentResult
+        prompt_text = "\n\n".join(msg["content"] for msg in messages)
 
         # === Формируем запрос в формате LLMRequest ===
         request = LLMRequest(
-            messages=[
-                LLMMessage(role="user", content=prompt_text)
-            ],
+            messages=[LLMMessage(role=msg["role"], content=msg["content"]) for msg in messages],
             temperature=0.0,  # Для синтеза — детерминированность
-            max_tokens=2048
+            max_tokens=2048,
+            # Ответ — один JSON-объект: генерация останавливается на его закрывающей "}"
+            stop_after_json=True
         )
 
+        # Кэш точного совпадения: повторный синтез по тем же данным не отправляется в LLM
+        cache_key = None
+        if agent.config.get("LLM_CACHE_ENABLED", True):
+            cache_key = RESPONSE_CACHE.make_key(request, namespace=agent.config.get("llm_profile"))
+        return request, cache_key, prompt_text
+
+    def _complete(
+        self,
+        params: Dict[str, Any],
+        request: LLMRequest,
+        cache_key: Optional[str],
+        prompt_text: str,
+        agent,
+        llm_response: Optional[LLMResponse] = None
+    ) -> AgentResult:
+        """Получает ответ LLM (если он ещё не получен), извлекает и проверяет синтез."""
+        question = params["question"]
         try:
-            # === Вызываем LLM через единый интерфейс ===
-            _, llm_response = agent.llm.generate_with_request(request)
+            # === Вызываем LLM через единый интерфейс (или берём ответ из кэша) ===
+            if llm_response is None:
+                llm_response = RESPONSE_CACHE.get(cache_key) if cache_key else None
+                if llm_response is None:
+                    _, llm_response = agent.llm.generate_with_request(request)
+                else:
+                    LOG.debug("synthesize: ответ LLM взят из кэша")
 
             # === Извлекаем решение ===
             synthesis = llm_response.json_answer
@@ -94,6 +242,10 @@ class Operation(BaseOperation):
                     synthesis
                 )
 
+            # В кэш попадают только ответы, прошедшие валидацию структуры
+            if cache_key:
+                RESPONSE_CACHE.put(cache_key, llm_response)
+
             # === Формируем результат ===
             synth_data = synthesis["synthesis"]
             output = {
@@ -123,28 +275,11 @@ class Operation(BaseOperation):
             )
 
     def _validate_structure(self, synthesis: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
-        """Валидирует структуру ответа."""
-        if "reasoning" not in synthesis:
-            return False, "Отсутствует поле reasoning"
-        if not isinstance(synthesis["reasoning"], list) or len(synthesis["reasoning"]) != 4:
-            return False, "reasoning должен содержать 4 элемента (S1–S4)"
-
-        for i in range(4):
-            if not isinstance(synthesis["reasoning"][i], str) or not synthesis["reasoning"][i].startswith(f"S{i+1}:"):
-                return False, f"Элемент reasoning[{i}] должен начинаться с 'S{i+1}:'"
-
-        if "synthesis" not in synthesis:
-            return False, "Отсутствует поле synthesis"
-
-        synth = synthesis["synthesis"]
-        required = ["final_answer", "confidence", "reason", "explanation"]
-        for field in required:
-            if field not in synth:
-                return False, f"Отсутствует поле synthesis.{field}"
-
-        if not (0 <= synth.get("confidence", -1) <= 1):
-            return False, "Некорректная уверенность в synthesis.confidence"
-
+        """Валидирует структуру ответа скомпилированной JSON Schema (_SYNTHESIS_SCHEMA)."""
+        try:
+            _VALIDATE_ANSWER(synthesis)
+        except fastjsonschema.JsonSchemaValueException as e:
+            return False, schema_error_message(e)
         return True, None
 
     def _create_error_result(
@@ -160,7 +295,8 @@ class Operation(BaseOperation):
         LOG.error("SynthesizerAgent ошибка: %s", message)
         LOG.debug("Промпт: %s", prompt)
         LOG.debug("Сырой ответ LLM: %s", raw_response)
-        LOG.debug("Извлечённый синтез: %s", json.dumps(synthesis, indent=2) if synthesis else "Нет")
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("Извлечённый синтез: %s", dumps_json(synthesis, indent=True, default=str) if synthesis else "Нет")
 
         return AgentResult.error(
             message=message,
@@ -18,40 +18,23 @@
 }
 """
 
-from typing import Any, Dict
-import json
+from typing import Any, Dict, List
 
-def build_synthesis_prompt(
-    original_question: str,
-    plan: Any,
-    step_outputs: Dict[str, Any],
-) -> str:
-    """
-    Формирует промпт для синтезатора с чёткой структурой ответа.
-    """
-    # --- Форматируем план ---
-    try:
-        plan_str = json.dumps(plan, ensure_ascii=False, indent=2)
-    except Exception:
-        plan_str = str(plan)
-
-    # --- Форматируем результаты шагов ---
-    try:
-        outputs_str = json.dumps(step_outputs, ensure_ascii=False, indent=2)
-    except Exception:
-        outputs_str = str(step_outputs)
-
-    return f"""Ты — синтезатор финального ответа в системе автоматического планирования.
-Твоя задача — на основе плана и результатов шагов сформировать **финальный ответ** на исходный вопрос.
+from src.utils.utils import dumps_json, dumps_json_or_str
 
-### Исходный вопрос
-{original_question}
+# Повторы короче этого порога не заменяются ссылкой: ссылка была бы не короче значения
+_MIN_DEDUP_CHARS = 64
 
-### План выполнения
-{plan_str}
+# Ограничения на размер одного результата шага в промпте (см. _shorten_step_output)
+_STEP_OUTPUT_MAX_ITEMS = 50
+_STEP_OUTPUT_MAX_CHARS = 4000
+_STEP_OUTPUT_HEAD_CHARS = 3000
+_STEP_OUTPUT_TAIL_CHARS = 500
 
-### Результаты шагов
-{outputs_str}
+# Статическая часть промпта (роль, вопросы S1–S4, формат ответа) одинакова для всех
+# вопросов и идёт первой в system-сообщении: префикс переиспользуется KV-кэшем модели
+_SYNTHESIZER_INSTRUCTIONS = """Ты — синтезатор финального ответа в системе автоматического планирования.
+Твоя задача — на основе плана и результатов шагов сформировать **финальный ответ** на исходный вопрос.
 
 ### 📌 Обязательный анализ (ответь на S1–S4 и включи в "reasoning")
 S1. Все ли подвопросы получили ответ?
@@ -60,18 +43,98 @@ S3. Есть ли противоречия в результатах?
 S4. Нужно ли уточнение у пользователя?
 
 ### 📏 СТРУКТУРА ОТВЕТА
-{{
+{
   "reasoning": ["S1: ...", "S2: ...", "S3: ...", "S4: ..."],
-  "synthesis": {{
+  "synthesis": {
     "final_answer": "строка — итоговый ответ",
     "confidence": 0.0–1.0,
     "reason": "Краткий ответ на S1–S4",
     "explanation": "Человекочитаемое обоснование (1–2 предложения)"
-  }}
-}}
+  }
+}
 
 ### ⚠️ ВАЖНО
 - НИКАКОГО ТЕКСТА ВНЕ JSON.
-- Начни с '{{', закончи '}}'.
+- Начни с '{', закончи '}'.
 - Не используй markdown, пояснения, комментарии.
-"""
\ No newline at end of file
+- Результат шага вида {"$ref": "<id>"} совпадает с результатом шага <id>.
+"""
+
+
+def _shorten_step_output(output: Any) -> Any:
+    """
+    Сокращает большой результат шага, сохраняя валидный JSON: в длинном списке
+    (например, строках из БД) остаются первые _STEP_OUTPUT_MAX_ITEMS элементов и
+    пометка с числом опущенных, длинная строка обрезается с сохранением начала и конца.
+    """
+    if isinstance(output, list) and len(output) > _STEP_OUTPUT_MAX_ITEMS:
+        elided = len(output) - _STEP_OUTPUT_MAX_ITEMS
+        return output[:_STEP_OUTPUT_MAX_ITEMS] + [f"… ещё {elided} элемент(ов) опущено, всего {len(output)}"]
+    if isinstance(output, str) and len(output) > _STEP_OUTPUT_MAX_CHARS:
+        return output[:_STEP_OUTPUT_HEAD_CHARS] + "\n…[обрезано]…\n" + output[-_STEP_OUTPUT_TAIL_CHARS:]
+    return output
+
+
+def _ordered_step_ids(plan: Any, step_outputs: Dict[str, Any]) -> List[str]:
+    """
+    Возвращает id шагов в порядке подвопросов плана; шаги, которых нет в плане,
+    идут следом в отсортированном порядке.
+    """
+    subquestions = (plan.get("subquestions") or []) if isinstance(plan, dict) else []
+    plan_ids = [sq["id"] for sq in subquestions if isinstance(sq, dict) and sq.get("id") in step_outputs]
+    known = set(plan_ids)
+    return plan_ids + sorted(step_id for step_id in step_outputs if step_id not in known)
+
+
+def _format_step_outputs(plan: Any, step_outputs: Dict[str, Any]) -> str:
+    """
+    Сериализует результаты шагов в компактный JSON-объект за один проход:
+    шаги идут в порядке плана, большие результаты сокращаются (_shorten_step_output),
+    ключи внутри результатов сортируются, а повтор уже выведенного результата
+    (например, переданного relay_step_result) заменяется ссылкой {"$ref": "<id>"}.
+    """
+    first_step_by_output: Dict[str, str] = {}
+    parts = []
+    for step_id in _ordered_step_ids(plan, step_outputs):
+        # Сериализованный результат служит и ключом поиска повторов
+        output_json = dumps_json(_shorten_step_output(step_outputs[step_id]), sort_keys=True, default=str)
+        if len(output_json) >= _MIN_DEDUP_CHARS:
+            first_step_id = first_step_by_output.setdefault(output_json, step_id)
+            if first_step_id != step_id:
+                output_json = dumps_json({"$ref": first_step_id})
+        parts.append(f"{dumps_json(step_id)}:{output_json}")
+    return "{" + ",".join(parts) + "}"
+
+
+def build_synthesis_prompt(
+    original_question: str,
+    plan: Any,
+    step_outputs: Dict[str, Any],
+) -> List[Dict[str, str]]:
+    """
+    Формирует промпт для синтезатора с чёткой структурой ответа.
+
+    Возвращает список сообщений: system — неизменные инструкции, user — данные
+    (исходный вопрос, план, результаты шагов).
+    """
+    # --- Форматируем план и результаты шагов ---
+    # Компактный JSON: отступы почти удваивают число токенов на больших step_outputs.
+    # Ключи сортируются, а шаги идут в порядке плана: одинаковые данные дают одинаковый
+    # промпт независимо от порядка завершения шагов (кэш ответов, KV-кэш модели)
+    plan_str = dumps_json_or_str(plan, sort_keys=True)
+    outputs_str = _format_step_outputs(plan, step_outputs)
+
+    # --- Изменяемая часть: данные вопроса ---
+    user_content = f"""### Исходный вопрос
+{original_question}
+
+### План выполнения
+{plan_str}
+
+### Результаты шагов
+{outputs_str}"""
+
+    return [
+        {"role": "system", "content": _SYNTHESIZER_INSTRUCTIONS},
+        {"role": "user", "content": user_content},
+    ]
@@ -33,13 +33,15 @@ result = agent.execute_operation("op1", {"param": "value"})  # LLM и опера
 """
 
 from __future__ import annotations
+import importlib
 import importlib.util
 import inspect
 import logging
 import os
 import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from src.agents.operations_base import BaseOperation
 from src.model.agent_result import AgentResult
@@ -49,12 +51,93 @@ LOG = logging.getLogger(__name__)
 LOG.addHandler(logging.NullHandler())
 
 
+@lru_cache(maxsize=256)
+def _operations_dir(module_path: str) -> Path:
+    """
+    Возвращает путь к папке operations/ рядом с модулем агента.
+    Кэшируется по имени модуля: find_spec не обходит sys.path для каждого экземпляра агента.
+
+    Raises:
+        ValueError: если origin модуля не найден.
+    """
+    spec = importlib.util.find_spec(module_path)
+    if spec is None or spec.origin is None:
+        raise ValueError(f"Не удалось найти origin для модуля {module_path}")
+    return Path(spec.origin).resolve().parent / "operations"
+
+
+def _import_operation_module(module_path: str, op_file: Path) -> Optional[Any]:
+    """
+    Импортирует модуль операции op_file агента из модуля module_path.
+
+    Модуль импортируется как <пакет агента>.operations.<имя> через importlib.import_module:
+    он попадает в sys.modules, и повторная загрузка операций (новый экземпляр агента,
+    валидация реестра) не исполняет файл заново. Если папка operations/ не импортируется
+    как пакет, файл загружается напрямую через spec_from_file_location.
+
+    Returns:
+        Модуль или None, если spec для файла создать не удалось.
+    """
+    package = module_path.rpartition(".")[0]
+    if package:
+        op_module = f"{package}.operations.{op_file.stem}"
+        try:
+            return importlib.import_module(op_module)
+        except ModuleNotFoundError as e:
+            # Отсутствующая зависимость внутри операции — это ошибка самой операции
+            if e.name is None or not (op_module == e.name or op_module.startswith(e.name + ".")):
+                raise
+
+    spec_op = importlib.util.spec_from_file_location(
+        f"{module_path}.operations.{op_file.stem}", op_file
+    )
+    if spec_op is None:
+        return None
+    mod = importlib.util.module_from_spec(spec_op)
+    spec_op.loader.exec_module(mod)
+    return mod
+
+
+@lru_cache(maxsize=256)
+def _load_operation_manifests(module_path: str, operations_dir: Path, mtime_ns: int) -> Dict[str, Any]:
+    """
+    Загружает файлы operations/ и возвращает манифесты их операций.
+
+    Кэшируется по (module_path, operations_dir, mtime_ns): повторная валидация реестра
+    не перезагружает модули операций. mtime папки меняется при добавлении, удалении
+    и переименовании файлов — тогда манифесты загружаются заново.
+    """
+    ops = {}
+    for op_file in operations_dir.glob("*.py"):
+        if op_file.name.startswith("_"):
+            continue
+        op_name = op_file.stem
+        try:
+            mod = _import_operation_module(module_path, op_file)
+            if mod is None:
+                continue
+            if not hasattr(mod, "Operation"):
+                continue
+            op_cls = getattr(mod, "Operation")
+            if not (inspect.isclass(op_cls) and issubclass(op_cls, BaseOperation)):
+                continue
+            ops[op_name] = op_cls.get_manifest()
+        except Exception as e:
+            LOG.debug("Не удалось получить манифест для %s: %s", op_name, e)
+            ops[op_name] = {
+                "kind": "direct",
+                "description": f"Операция {op_name} (манифест недоступен)"
+            }
+    return ops
+
+
 class BaseAgent:
     """
     Базовый класс для всех агентов.
 
     Атрибуты:
         descriptor (Dict[str, Any]): Метаданные агента из реестра (name, title, implementation и т.д.).
+        name, title, description (str): Поля descriptor, вычисленные при создании агента.
         config (Dict[str, Any]): Конфигурация агента (из поля "config" в реестре).
         llm (Optional[Any]): Экземпляр LLM, если в config указан "llm_profile".
         _operations (Dict[str, type[BaseOperation]]): Кэш загруженных классов операций из папки operations/.
@@ -82,6 +165,10 @@ class BaseAgent:
             raise ValueError(f"descriptor missing required keys: {sorted(missing)}")
 
         self.descriptor: Dict[str, Any] = descriptor
+        # Дескриптор не меняется после создания агента — поля вычисляются один раз
+        self.name: str = str(descriptor["name"])
+        self.title: str = str(descriptor.get("title", self.name))
+        self.description: str = str(descriptor.get("description", ""))
         self.config: Dict[str, Any] = dict(config or {})
         self.llm: Optional[Any] = None
         # Храним классы операций (не экземпляры!)
@@ -89,25 +176,6 @@ class BaseAgent:
         self._initialized: bool = False
         LOG.debug("BaseAgent инициализирован: %s", self.name)
 
-    # -------------------------
-    # Свойства дескриптора
-    # -------------------------
-
-    @property
-    def name(self) -> str:
-        """Возвращает имя агента из descriptor['name']."""  
-        return str(self.descriptor["name"])
-
-    @property
-    def title(self) -> str:
-        """Возвращает человекочитаемое название из descriptor['title']."""  
-        return str(self.descriptor.get("title", self.name))
-
-    @property
-    def description(self) -> str:
-        """Возвращает описание из descriptor['description']."""  
-        return str(self.descriptor.get("description", ""))
-
     # -------------------------
     # Ленивая инициализация (выполняется автоматически)
     # -------------------------
@@ -143,12 +211,7 @@ class BaseAgent:
         """
         try:
             agent_module = self.__class__.__module__
-            spec = importlib.util.find_spec(agent_module)
-            if spec is None or spec.origin is None:
-                raise ValueError(f"Не удалось найти origin для модуля {agent_module}")
-
-            agent_file = Path(spec.origin).resolve()
-            operations_dir = agent_file.parent / "operations"
+            operations_dir = _operations_dir(agent_module)
 
             if not operations_dir.exists():
                 LOG.debug("Папка operations не найдена для агента %s", self.name)
@@ -160,14 +223,10 @@ class BaseAgent:
                     continue
                 op_name = op_file.stem
                 try:
-                    spec_op = importlib.util.spec_from_file_location(
-                        f"{agent_module}.operations.{op_name}", op_file
-                    )
-                    if spec_op is None:
+                    mod = _import_operation_module(agent_module, op_file)
+                    if mod is None:
                         LOG.warning("Не удалось создать spec для %s", op_file)
                         continue
-                    mod = importlib.util.module_from_spec(spec_op)
-                    spec_op.loader.exec_module(mod)
 
                     # Требуем наличие класса Operation
                     if not hasattr(mod, "Operation"):
@@ -194,46 +253,24 @@ class BaseAgent:
         """
         Анализирует папку operations/ и возвращает манифесты операций.
         Используется AgentRegistry для валидации без создания экземпляра агента.
+        Результат кэшируется (см. _load_operation_manifests).
         """
         try:
-            spec = importlib.util.find_spec(module_path)
-            if spec is None or spec.origin is None:
-                return {}
-            agent_file = Path(spec.origin).resolve()
-            operations_dir = agent_file.parent / "operations"
+            operations_dir = _operations_dir(module_path)
             if not operations_dir.exists():
                 return {}
-
-            ops = {}
-            for op_file in operations_dir.glob("*.py"):
-                if op_file.name.startswith("_"):
-                    continue
-                op_name = op_file.stem
-                try:
-                    spec_op = importlib.util.spec_from_file_location(
-                        f"{module_path}.operations.{op_name}", op_file
-                    )
-                    if spec_op is None:
-                        continue
-                    mod = importlib.util.module_from_spec(spec_op)
-                    spec_op.loader.exec_module(mod)
-                    if not hasattr(mod, "Operation"):
-                        continue
-                    op_cls = getattr(mod, "Operation")
-                    if not (inspect.isclass(op_cls) and issubclass(op_cls, BaseOperation)):
-                        continue
-                    ops[op_name] = op_cls.get_manifest()
-                except Exception as e:
-                    LOG.debug("Не удалось получить манифест для %s: %s", op_name, e)
-                    ops[op_name] = {
-                        "kind": "direct",
-                        "description": f"Операция {op_name} (манифест недоступен)"
-                    }
-            return ops
+            # Копия: вызывающий код может изменять словарь, кэш — нет
+            return dict(_load_operation_manifests(module_path, operations_dir, operations_dir.stat().st_mtime_ns))
         except Exception as e:
             LOG.debug("Не удалось загрузить операции для модуля %s: %s", module_path, e)
             return {}
 
+    @classmethod
+    def invalidate_operations_cache(cls) -> None:
+        """Сбрасывает кэши путей и манифестов операций (_operations_dir, _load_operation_manifests)."""
+        _operations_dir.cache_clear()
+        _load_operation_manifests.cache_clear()
+
     @classmethod
     def discover_operations(cls, descriptor: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -276,41 +313,106 @@ class BaseAgent:
         Raises:
             KeyError: Если операция не найдена.
         """
-        # === Автоматическая инициализация ===
-        self._lazy_initialize()
+        op_cls = self._get_operation_class(operation)
+        params = params or {}
+        context = context or {}
 
-        if operation not in self._operations:
-            available = list(self._operations.keys())
-            raise KeyError(f"Операция '{operation}' не найдена у агента '{self.name}'. Доступны: {available}")
+        start = time.time()
+        try:
+            # Создаём экземпляр операции и вызываем метод run
+            result = op_cls().run(params, context, self)
+            return self._finalize_result(result, operation, start)
+        except Exception as exc:
+            LOG.exception("Агент %s: ошибка при выполнении операции %s", self.name, operation)
+            return AgentResult.error(
+                message=f"Операция '{operation}' завершилась с ошибкой: {exc}",
+                stage="operation_execution"
+            )
+
+    async def execute_operation_async(
+        self,
+        operation: str,
+        params: Optional[Dict[str, Any]] = None,
+        context: Optional[Dict[str, Any]] = None
+    ) -> AgentResult:
+        """
+        Асинхронный вариант execute_operation (вызывает Operation.run_async).
+
+        Позволяет выполнять независимые операции конкурентно, например:
+            await asyncio.gather(*(agent.execute_operation_async(op, p) for p in batch))
+        Время ожидания LLM при этом перекрывается; сами вызовы одной локальной модели
+        адаптер выполняет по очереди.
 
+        Raises:
+            KeyError: Если операция не найдена.
+        """
+        op_cls = self._get_operation_class(operation)
         params = params or {}
         context = context or {}
 
-        op_cls = self._operations[operation]  # Это класс, унаследованный от BaseOperation
         start = time.time()
         try:
-            # Создаём экземпляр операции
-            op_instance = op_cls()
-            # Вызываем метод run
-            result = op_instance.run(params, context, self)
-            if not isinstance(result, AgentResult):
-                raise TypeError(f"Операция должна вернуть AgentResult, получено: {type(result)}")
-
-            # Явно устанавливаем поля agent и operation
-            if result.agent is None:
-                result.agent = self.name
-            if result.operation is None:
-                result.operation = operation
-
-            # Добавляем elapsed_s в metadata
-            meta = getattr(result, "metadata", {}) or {}
-            meta.setdefault("elapsed_s", time.time() - start)
-            result.metadata = meta
-
-            return result
+            result = await op_cls().run_async(params, context, self)
+            return self._finalize_result(result, operation, start)
         except Exception as exc:
             LOG.exception("Агент %s: ошибка при выполнении операции %s", self.name, operation)
-            return AgentResult.error("operation_execution", f"Операция '{operation}' завершилась с ошибкой: {exc}")
+            return AgentResult.error(
+                message=f"Операция '{operation}' завершилась с ошибкой: {exc}",
+                stage="operation_execution"
+            )
+
+    def execute_operation_batch(
+        self,
+        operation: str,
+        params_list: List[Dict[str, Any]],
+        context: Optional[Dict[str, Any]] = None
+    ) -> List[AgentResult]:
+        """
+        Выполняет операцию для нескольких наборов параметров (Operation.run_batch).
+        Результаты возвращаются в порядке params_list.
+
+        Raises:
+            KeyError: Если операция не найдена.
+        """
+        op_cls = self._get_operation_class(operation)
+        context = context or {}
+
+        start = time.time()
+        try:
+            results = op_cls().run_batch([params or {} for params in params_list], context, self)
+            return [self._finalize_result(result, operation, start) for result in results]
+        except Exception as exc:
+            LOG.exception("Агент %s: ошибка при пакетном выполнении операции %s", self.name, operation)
+            error = f"Операция '{operation}' завершилась с ошибкой: {exc}"
+            return [AgentResult.error(message=error, stage="operation_execution") for _ in params_list]
+
+    def _get_operation_class(self, operation: str) -> type[BaseOperation]:
+        """Инициализирует агента (при необходимости) и возвращает класс операции."""
+        # === Автоматическая инициализация ===
+        self._lazy_initialize()
+
+        if operation not in self._operations:
+            available = list(self._operations.keys())
+            raise KeyError(f"Операция '{operation}' не найдена у агента '{self.name}'. Доступны: {available}")
+        return self._operations[operation]  # Это класс, унаследованный от BaseOperation
+
+    def _finalize_result(self, result: AgentResult, operation: str, start: float) -> AgentResult:
+        """Проверяет тип результата и дополняет его agent, operation и elapsed_s."""
+        if not isinstance(result, AgentResult):
+            raise TypeError(f"Операция должна вернуть AgentResult, получено: {type(result)}")
+
+        # Явно устанавливаем поля agent и operation
+        if result.agent is None:
+            result.agent = self.name
+        if result.operation is None:
+            result.operation = operation
+
+        # Добавляем elapsed_s в metadata
+        meta = getattr(result, "metadata", {}) or {}
+        meta.setdefault("elapsed_s", time.time() - start)
+        result.metadata = meta
+
+        return result
 
     # -------------------------
     # Утилиты
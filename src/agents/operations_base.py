@@ -1,8 +1,9 @@
 from __future__ import annotations
+import asyncio
 import enum
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 from src.model.agent_result import AgentResult
 
@@ -57,6 +58,22 @@ class BaseOperation(ABC):
     def run(self, params: Dict[str, Any], context: Dict[str, Any], agent) -> AgentResult:
         pass
 
+    def run_batch(self, params_list: List[Dict[str, Any]], context: Dict[str, Any], agent) -> List[AgentResult]:
+        """
+        Выполняет операцию для нескольких наборов параметров.
+        По умолчанию — последовательно; операции, умеющие пакетную обработку
+        (например, один пакетный вызов LLM), переопределяют метод.
+        """
+        return [self.run(params, context, agent) for params in params_list]
+
+    async def run_async(self, params: Dict[str, Any], context: Dict[str, Any], agent) -> AgentResult:
+        """
+        Асинхронный вариант run.
+        По умолчанию выполняет синхронный run в пуле потоков, чтобы блокирующий вызов LLM
+        не останавливал event loop; операции с нативным async-клиентом могут переопределить метод.
+        """
+        return await asyncio.to_thread(self.run, params, context, agent)
+
     @classmethod
     def get_manifest(cls) -> Dict[str, Any]:
         return {
@@ -83,6 +83,8 @@ class AgentRegistry:
         self.control_registry = control_registry or _load_registry_module("src.common.control_registry") or {}
         # Кеш импортированных реализаций (module:attr -> object)
         self._impl_cache: Dict[str, Any] = {}
+        # Индекс операций (op_name -> [agent_name]) для каждого реестра; строится лениво
+        self._operation_index: Dict[bool, Dict[str, List[str]]] = {}
         if validate_on_init:
             self.validate_all()
 
@@ -141,12 +143,24 @@ class AgentRegistry:
         Возвращает список (agent_name, entry).
         """
         reg = self.control_registry if control else self.tool_registry
-        found = []
-        for name, entry in reg.items():
-            ops = self._resolve_operations(name, entry)
-            if op_name in ops:
-                found.append((name, entry))
-        return found
+        return [(name, reg[name]) for name in self._get_operation_index(control).get(op_name, ())]
+
+    def _get_operation_index(self, control: bool) -> Dict[str, List[str]]:
+        """
+        Индекс op_name -> имена агентов (в порядке реестра).
+        Строится один раз при первом поиске: разрешение операций всех агентов
+        (импорт модулей operations/) не повторяется на каждый вызов.
+        Реестры считаются неизменными после создания AgentRegistry.
+        """
+        index = self._operation_index.get(control)
+        if index is None:
+            reg = self.control_registry if control else self.tool_registry
+            index = {}
+            for name, entry in reg.items():
+                for op in self._resolve_operations(name, entry):
+                    index.setdefault(op, []).append(name)
+            self._operation_index[control] = index
+        return index
 
     # -----------------------------
     # Импорт и инстанцирование реализаций
@@ -33,6 +33,8 @@ LLM_PROFILES: Dict[str, Dict[str, Any]] = {
         "temperature": float(os.environ.get("LLM_TEMPERATURE", "0.3")),
         "top_p": float(os.environ.get("LLM_TOP_P", "0.9")),
         "max_tokens": int(os.environ.get("LLM_MAX_TOKENS", "8192")),
+        # Кэш KV-состояний префиксов llama_cpp в байтах (0 — выключен), например 1073741824 = 1 ГиБ
+        "prompt_cache_bytes": int(os.environ.get("LLM_PROMPT_CACHE_BYTES", "0")),
         "backend_kwargs": {
             "n_threads": int(os.environ.get("LLM_THREADS", "8")),
             "use_gpu": os.environ.get("LLM_USE_GPU", "false").lower() in ("1", "true", "yes"),
@@ -46,6 +48,8 @@ LLM_PROFILES: Dict[str, Dict[str, Any]] = {
         "temperature": float(os.environ.get("LLM_TEMPERATURE", "0.3")),
         "top_p": float(os.environ.get("LLM_TOP_P", "0.9")),
         "max_tokens": int(os.environ.get("LLM_MAX_TOKENS", "8192")),
+        # Кэш KV-состояний префиксов llama_cpp в байтах (0 — выключен), например 1073741824 = 1 ГиБ
+        "prompt_cache_bytes": int(os.environ.get("LLM_PROMPT_CACHE_BYTES", "0")),
         "backend_kwargs": {
             "n_threads": int(os.environ.get("LLM_THREADS", "8")),
             "use_gpu": os.environ.get("LLM_USE_GPU", "false").lower() in ("1", "true", "yes"),
@@ -98,6 +102,13 @@ POSTGRES_DSN = os.environ.get(
 # Значение по умолчанию для ограничения итераций LangGraph (если нужно — можно увеличить)
 LANGGRAPH_RECURSION_LIMIT = int(os.environ.get("LANGGRAPH_RECURSION_LIMIT", "25"))
 
+# --------------------------
+# ReasonerAgent
+# --------------------------
+# Сколько готовых к выполнению подвопросов (включая текущий) решаются одним пакетом
+# decide_next_stage; 1 — отключить пакетирование
+REASONER_BATCH_SIZE = int(os.environ.get("REASONER_BATCH_SIZE", "8"))
+
 # --------------------------
 # Руководство для разработчиков (на русском)
 # --------------------------
@@ -2,6 +2,8 @@
 """
 Узел выполнения операций.
 Цель: выполнить вызов инструмента для текущего этапа.
+Загрузка данных (data_fetch) готовых соседних шагов с уже выбранной гипотезой
+выполняется одновременно с текущим шагом, а их валидация — одним пакетом.
 Логирование:
   - вход в шаг и этап
   - вызов агента и операции
@@ -10,12 +12,102 @@
 """
 from __future__ import annotations
 import logging
-from typing import Any, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
 from src.model.agent_result import AgentResult
 from src.model.context.context import GraphContext
 
 LOG = logging.getLogger(__name__)
 
+def _ready_sibling_calls(ctx: GraphContext, step_id: str, stage: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Вызовы этапа stage для готовых соседних шагов, которые находятся на том же этапе.
+    """
+    calls = []
+    for ready_id in ctx.iter_ready_steps():
+        if ready_id == step_id or ctx.get_current_stage(ready_id) != stage:
+            continue
+        tool_call = ctx.get_current_tool_call(ready_id)
+        if tool_call:
+            calls.append((ready_id, tool_call))
+    return calls
+
+
+def _ready_sibling_fetches(ctx: GraphContext, step_id: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Вызовы data_fetch для готовых соседних шагов, у которых гипотеза уже выбрана
+    (решения соседей Reasoner принимает пакетом вместе с текущим шагом).
+    """
+    return _ready_sibling_calls(ctx, step_id, "data_fetch")
+
+
+def _ready_sibling_validations(
+    ctx: GraphContext,
+    step_id: str,
+    tool_call: Dict[str, Any],
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Вызовы validation соседних шагов, чьи данные уже загружены (например, одновременно
+    с текущим шагом): их проверка отправляется одним пакетом вместе с текущей.
+    """
+    return [
+        (sid, call) for sid, call in _ready_sibling_calls(ctx, step_id, "validation")
+        if (call["agent"], call["operation"]) == (tool_call["agent"], tool_call["operation"])
+    ]
+
+
+def _execute_calls_concurrently(
+    agent_registry,
+    calls: List[Tuple[str, Dict[str, Any]]],
+    context: Dict[str, Any],
+) -> List[AgentResult]:
+    """
+    Выполняет вызовы инструментов одновременно в пуле потоков.
+
+    Используется синхронный execute_operation, а не asyncio.run: узел может
+    выполняться в потоке с уже запущенным event loop (например, graph.invoke
+    из async-эндпоинта API). Исключение отдельного вызова превращается в
+    AgentResult с ошибкой и не прерывает остальные.
+    """
+    def execute(tool_call: Dict[str, Any]) -> AgentResult:
+        try:
+            agent = agent_registry.instantiate_agent(tool_call["agent"])
+            return agent.execute_operation(tool_call["operation"], tool_call["params"], context=context)
+        except Exception as e:
+            LOG.exception("💥 Ошибка вызова %s.%s: %s", tool_call["agent"], tool_call["operation"], e)
+            return AgentResult.error(
+                message=f"Ошибка выполнения {tool_call['agent']}.{tool_call['operation']}: {e}",
+                stage="data_fetch"
+            )
+
+    with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+        return list(pool.map(execute, (tool_call for _, tool_call in calls)))
+
+
+def _record_result(ctx: GraphContext, step_id: str, stage: str, result: Any) -> None:
+    """Записывает результат вызова в состояние шага и отмечает этап."""
+    if not isinstance(result, AgentResult):
+        LOG.error("❌ Агент вернул не AgentResult: %s", type(result))
+        return
+    ctx.record_agent_call(step_id, result)
+    if result.status == "ok":
+        if stage == "validation":
+            ctx.record_validation_result(step_id, result.output)
+        else:
+            ctx.record_step_result(step_id, result.output)
+        ctx.mark_stage_completed(step_id, stage)
+        LOG.info("✅ Этап '%s' успешно завершён для шага %s", stage, step_id)
+        # analyze_and_validate возвращает вердикт вместе с анализом — этап validation уже выполнен
+        validation = result.metadata.get("validation") if stage == "processing" else None
+        if validation:
+            ctx.record_validation_result(step_id, validation)
+            ctx.mark_stage_completed(step_id, "validation")
+            LOG.info("✅ Этап 'validation' выполнен вместе с processing для шага %s", step_id)
+        LOG.debug("📤 Результат: %s", result.output)
+    else:
+        LOG.error("❌ Операция завершилась с ошибкой: %s", result.error)
+
+
 def executor_node(state: Dict[str, Any], agent_registry=None) -> Dict[str, Any]:
     if agent_registry is None:
         raise ValueError("executor_node: agent_registry is required")
@@ -35,6 +127,34 @@ def executor_node(state: Dict[str, Any], agent_registry=None) -> Dict[str, Any]:
     LOG.info("🚀 Запуск %s.%s", tool_call["agent"], tool_call["operation"])
     LOG.debug("📦 Параметры: %s", tool_call["params"])
 
+    # Загрузка данных независимых соседних шагов выполняется одновременно с текущей
+    sibling_calls = _ready_sibling_fetches(ctx, step_id) if current_stage == "data_fetch" else []
+    if sibling_calls:
+        calls = [(step_id, tool_call), *sibling_calls]
+        LOG.info("🚀 Параллельная загрузка данных для шагов: %s", [sid for sid, _ in calls])
+        results = _execute_calls_concurrently(agent_registry, calls, ctx.to_dict())
+        for (sid, _), result in zip(calls, results):
+            _record_result(ctx, sid, "data_fetch", result)
+        return ctx.to_dict()
+
+    # Проверка результатов соседних шагов — одним пакетным вызовом валидатора
+    sibling_calls = _ready_sibling_validations(ctx, step_id, tool_call) if current_stage == "validation" else []
+    if sibling_calls:
+        calls = [(step_id, tool_call), *sibling_calls]
+        LOG.info("🚀 Пакетная валидация для шагов: %s", [sid for sid, _ in calls])
+        try:
+            agent = agent_registry.instantiate_agent(tool_call["agent"])
+            results = agent.execute_operation_batch(
+                tool_call["operation"],
+                [call["params"] for _, call in calls],
+                context=ctx.to_dict()
+            )
+            for (sid, _), result in zip(calls, results):
+                _record_result(ctx, sid, "validation", result)
+        except Exception as e:
+            LOG.exception("💥 Ошибка пакетной валидации в executor_node: %s", e)
+        return ctx.to_dict()
+
     try:
         agent = agent_registry.instantiate_agent(tool_call["agent"])
         result = agent.execute_operation(
@@ -42,21 +162,8 @@ def executor_node(state: Dict[str, Any], agent_registry=None) -> Dict[str, Any]:
             tool_call["params"],
             context=ctx.to_dict()
         )
-        if isinstance(result, AgentResult):
-            ctx.record_agent_call(step_id, result)
-            if result.status == "ok":
-                if current_stage == "validation":
-                    ctx.record_validation_result(step_id, result.output)
-                else:
-                    ctx.record_step_result(step_id, result.output)
-                ctx.mark_stage_completed(step_id, current_stage)
-                LOG.info("✅ Этап '%s' успешно завершён для шага %s", current_stage, step_id)
-                LOG.debug("📤 Результат: %s", result.output)
-            else:
-                LOG.error("❌ Операция завершилась с ошибкой: %s", result.error)
-        else:
-            LOG.error("❌ Агент вернул не AgentResult: %s", type(result))
+        _record_result(ctx, step_id, current_stage, result)
     except Exception as e:
         LOG.exception("💥 Ошибка выполнения в executor_node: %s", e)
 
-    return ctx.to_dict()
\ No newline at end of file
+    return ctx.to_dict()
@@ -43,7 +43,7 @@ def planner_node(state: Dict[str, Any], agent_registry=None) -> Dict[str, Any]:
         append_history_event(ctx, {"type": "planner_no_question"})
         return ctx.to_dict()
 
-    LOG.info(f"📝 planner_node: исходный вопрос: {question}")
+    LOG.info("📝 planner_node: исходный вопрос: %s", question)
 
     # 🧠 Пытаемся использовать PlannerAgent
     if agent_registry is not None:
@@ -52,7 +52,7 @@ def planner_node(state: Dict[str, Any], agent_registry=None) -> Dict[str, Any]:
             planner_agent = agent_registry.instantiate_agent("PlannerAgent", control=True)
             LOG.debug("✅ planner_node: PlannerAgent успешно создан")
         except Exception as e:
-            LOG.error(f"❌ planner_node: ошибка создания PlannerAgent: {e}")
+            LOG.error("❌ planner_node: ошибка создания PlannerAgent: %s", e)
             append_history_event(ctx, {"type": "planner_instantiate_failed", "error": str(e)})
 
         if planner_agent is not None:
@@ -60,7 +60,7 @@ def planner_node(state: Dict[str, Any], agent_registry=None) -> Dict[str, Any]:
                 # 📦 Собираем snapshot инструментов через AgentRegistry
                 tool_registry_snapshot = build_tool_registry_snapshot(agent_registry)
                 LOG.debug(
-                    f"🛠️ planner_node: собран snapshot инструментов для {len(tool_registry_snapshot)} агентов"
+                    "🛠️ planner_node: собран snapshot инструментов для %d агентов", len(tool_registry_snapshot)
                 )
 
                 # 🚀 Вызываем операцию plan
@@ -75,7 +75,7 @@ def planner_node(state: Dict[str, Any], agent_registry=None) -> Dict[str, Any]:
                 if isinstance(res, AgentResult) and res.status == "ok":
                     # Используем поле output → plan
                     plan_struct = res.output.get("plan") if isinstance(res.output, dict) else {}
-                    LOG.info(f"✅ planner_node: план успешно сгенерирован. Структура: {plan_struct}")
+                    LOG.info("✅ planner_node: план успешно сгенерирован. Структура: %s", plan_struct)
 
                     # 💾 Сохраняем план как Pydantic-модель Plan
                     subquestions = []
@@ -109,7 +109,7 @@ def planner_node(state: Dict[str, Any], agent_registry=None) -> Dict[str, Any]:
                 else:
                     # ❌ Ошибка от агента
                     error_msg = res.error or str(res)
-                    LOG.error(f"❌ planner_node: PlannerAgent вернул ошибку: {error_msg}")
+                    LOG.error("❌ planner_node: PlannerAgent вернул ошибку: %s", error_msg)
                     append_history_event(
                         ctx,
                         {
@@ -119,7 +119,7 @@ def planner_node(state: Dict[str, Any], agent_registry=None) -> Dict[str, Any]:
                     )
 
             except Exception as e:
-                LOG.exception(f"💥 planner_node: исключение при вызове PlannerAgent: {e}")
+                LOG.exception("💥 planner_node: исключение при вызове PlannerAgent: %s", e)
                 append_history_event(
                     ctx,
                     {
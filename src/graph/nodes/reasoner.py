@@ -11,7 +11,9 @@
 """
 from __future__ import annotations
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
+from src.agents.ReasonerAgent.prompts import serialize_tool_registry
+from src.common.settings import REASONER_BATCH_SIZE
 from src.model.agent_result import AgentResult
 from src.model.context.context import GraphContext
 from src.utils.utils import build_tool_registry_snapshot
@@ -19,6 +21,40 @@ from src.utils.utils import build_tool_registry_snapshot
 LOG = logging.getLogger(__name__)
 
 
+def _sibling_steps_without_decision(ctx: GraphContext, step_id: str, limit: int) -> List[str]:
+    """
+    Готовые к выполнению шаги (кроме текущего), для которых ещё нет решения Reasoner.
+    Их решения можно получить одним пакетом с текущим шагом: входные данные
+    (результаты зависимостей) для них уже известны.
+    """
+    siblings = []
+    for ready_id in ctx.iter_ready_steps():
+        if len(siblings) >= limit:
+            break
+        if ready_id == step_id:
+            continue
+        ready_step = ctx.get_execution_step(ready_id)
+        if ready_step is None or ready_step.decision is None:
+            siblings.append(ready_id)
+    return siblings
+
+
+def _build_reasoner_params(
+    ctx: GraphContext,
+    step_id: str,
+    tool_registry_snapshot: Dict[str, Any],
+    tool_registry_json: Optional[str],
+) -> Dict[str, Any]:
+    """Входные данные decide_next_stage для шага."""
+    return {
+        "subquestion": {"id": step_id, "text": ctx.get_subquestion_text(step_id)},
+        "step_state": {"stage": ctx.get_current_stage(step_id)},
+        "step_outputs": ctx.get_relevant_step_outputs_for_reasoner(step_id),
+        "tool_registry_snapshot": tool_registry_snapshot,
+        "tool_registry_json": tool_registry_json,
+    }
+
+
 def reasoner_node(state: Dict[str, Any], agent_registry=None) -> Dict[str, Any]:
     if agent_registry is None:
         raise ValueError("reasoner_node: agent_registry is required")
@@ -28,16 +64,18 @@ def reasoner_node(state: Dict[str, Any], agent_registry=None) -> Dict[str, Any]:
         LOG.warning("⚠️ reasoner_node: нет текущего шага")
         return ctx.to_dict()
 
+    # Состояние шага читается один раз на итерацию
+    step = ctx.get_execution_step(step_id)
+
     # === Проверка: завершена ли валидация и провалена ли она? ===
-    if ctx.is_stage_completed(step_id, "validation"):
-        step = ctx.get_execution_step(step_id)
-        validation_result = step.validation_result if step else None
+    if step and step.completed_stages.get("validation", False):
+        validation_result = step.validation_result
         is_valid = (
             validation_result.get("is_valid", False)
             if isinstance(validation_result, dict)
             else False
         )
-        retry_count = getattr(step, "retry_count", 0)
+        retry_count = step.retry_count
 
         if not is_valid and retry_count < 2:
             LOG.info("🔁 Валидация провалена, запускаем повторную попытку для шага %s (попытка %d)", step_id, retry_count + 1)
@@ -64,18 +102,7 @@ def reasoner_node(state: Dict[str, Any], agent_registry=None) -> Dict[str, Any]:
     subquestion_text = ctx.get_subquestion_text(step_id)
     LOG.info("🔍 Обработка шага %s: '%s'", step_id, subquestion_text)
 
-    step_outputs = ctx.get_relevant_step_outputs_for_reasoner(step_id)
-    tool_registry_snapshot = build_tool_registry_snapshot(agent_registry)
-
-    params = {
-        "subquestion": {"id": step_id, "text": subquestion_text},
-        "step_state": {"stage": ctx.get_current_stage(step_id)},
-        "step_outputs": step_outputs,
-        "tool_registry_snapshot": tool_registry_snapshot,
-    }
-
     # Проверка: есть ли уже решение и нет ошибки → используем его
-    step = ctx.get_execution_step(step_id)
     existing_decision = step.decision if step else None
     has_error = step.error is not None if step else False
 
@@ -83,9 +110,28 @@ def reasoner_node(state: Dict[str, Any], agent_registry=None) -> Dict[str, Any]:
         LOG.info("🔄 reasoner_node: использование существующего решения для шага %s", step_id)
         decision = existing_decision
     else:
+        # Входные данные промпта (результаты шагов, снимок реестра) собираются
+        # только когда ReasonerAgent действительно вызывается. Готовые соседние
+        # шаги без решения решаются тем же пакетом: один вызов вместо N.
+        # Реестр сериализуется один раз на весь пакет, а не для каждого шага
+        tool_registry_snapshot = build_tool_registry_snapshot(agent_registry)
+        tool_registry_json = serialize_tool_registry(tool_registry_snapshot)
+        sibling_ids = _sibling_steps_without_decision(ctx, step_id, REASONER_BATCH_SIZE - 1)
+        params_list = [
+            _build_reasoner_params(ctx, sid, tool_registry_snapshot, tool_registry_json)
+            for sid in [step_id, *sibling_ids]
+        ]
         try:
             reasoner_agent = agent_registry.instantiate_agent("ReasonerAgent", control=True)
-            result = reasoner_agent.execute_operation("decide_next_stage", params)
+            if sibling_ids:
+                LOG.info("📦 Пакетное решение для шагов: %s", [step_id, *sibling_ids])
+                result, *sibling_results = reasoner_agent.execute_operation_batch("decide_next_stage", params_list)
+                for sid, sibling_result in zip(sibling_ids, sibling_results):
+                    # Ошибочные решения соседей не сохраняются — шаг решится заново в свой черёд
+                    if isinstance(sibling_result, AgentResult) and sibling_result.status == "ok":
+                        ctx.record_reasoner_decision(sid, sibling_result.output)
+            else:
+                result = reasoner_agent.execute_operation("decide_next_stage", params_list[0])
             if isinstance(result, AgentResult) and result.status == "ok":
                 ctx.record_reasoner_decision(step_id, result.output)
                 decision = result.output
@@ -32,7 +32,7 @@ def synthesizer_node(state: Dict[str, Any], agent_registry=None) -> Dict[str, An
 
     if agent_registry is None:
         LOG.warning("⚠️ synthesizer_node: agent_registry не передан, используем fallback")
-        last_result = list(step_outputs.values())[-1]
+        last_result = next(reversed(step_outputs.values()))
         ctx.set_final_answer(str(last_result))
         return ctx.to_dict()
 
@@ -44,7 +44,10 @@ def synthesizer_node(state: Dict[str, Any], agent_registry=None) -> Dict[str, An
             "step_outputs": step_outputs
         })
         if isinstance(result, AgentResult) and result.status == "ok":
-            final_answer = result.output.get("final_answer", str(result.output))
+            final_answer = result.output.get("final_answer")
+            if final_answer is None:
+                # str(output) строится только когда нужен — не на каждом успешном синтезе
+                final_answer = str(result.output)
             ctx.set_final_answer(final_answer)
             LOG.info("✅ Финальный ответ синтезирован")
             LOG.debug("📄 Ответ: %.200s", final_answer)
@@ -52,7 +55,7 @@ def synthesizer_node(state: Dict[str, Any], agent_registry=None) -> Dict[str, An
             raise ValueError(result.error)
     except Exception as e:
         LOG.warning("⚠️ synthesizer fallback: %s", e)
-        last_result = list(step_outputs.values())[-1]
+        last_result = next(reversed(step_outputs.values()))
         ctx.set_final_answer(str(last_result))
         LOG.info("🛡️ Использован fallback на последний результат")
 
@@ -9,7 +9,7 @@ from __future__ import annotations
 import json
 import logging
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from pydantic import BaseModel, Field
 
 from src.model.agent_result import AgentResult
@@ -23,6 +23,17 @@ from src.model.context.models import (
 LOG = logging.getLogger(__name__)
 
 
+def _stage_needed(decision: Dict[str, Any], key: str, legacy_key: str, default: bool) -> bool:
+    """
+    Нужен ли этап по решению Reasoner: decision[key]["needed"],
+    иначе плоский ключ legacy_key, иначе default.
+    """
+    stage = decision.get(key)
+    if isinstance(stage, dict) and "needed" in stage:
+        return bool(stage["needed"])
+    return bool(decision.get(legacy_key, default))
+
+
 class GraphContext(BaseModel):
     """
     Главный класс для управления состоянием выполнения графа.
@@ -175,19 +186,23 @@ class GraphContext(BaseModel):
         if not self.is_plan_set():
             LOG.warning("⚠️ План не установлен, невозможно выбрать следующий шаг")
             return None
+        for step_id in self.iter_ready_steps():
+            LOG.debug("➡️ Найден следующий шаг: %s", step_id)
+            return step_id
+        LOG.debug("🔍 Нет незавершённых шагов с выполненными зависимостями")
+        return None
+
+    def iter_ready_steps(self) -> Iterator[str]:
+        """
+        Перебирает в порядке плана ID незавершённых шагов, у которых выполнены зависимости.
+        """
+        if not self.is_plan_set():
+            return
         for sq in self.plan.subquestions:
             if self.is_step_fully_completed(sq.id):
                 continue
-            deps_ok = True
-            for dep_id in sq.depends_on:
-                if not self.is_step_fully_completed(dep_id):
-                    deps_ok = False
-                    break
-            if deps_ok:
-                LOG.debug("➡️ Найден следующий шаг: %s", sq.id)
-                return sq.id
-        LOG.debug("🔍 Нет незавершённых шагов с выполненными зависимостями")
-        return None
+            if all(self.is_step_fully_completed(dep_id) for dep_id in sq.depends_on):
+                yield sq.id
 
     def start_step(self, step_id: str) -> None:
         """Инициализирует шаг как текущий и гарантирует его состояние."""
@@ -219,34 +234,44 @@ class GraphContext(BaseModel):
             return False
         return step.completed_stages.get(stage, False)
 
+    @staticmethod
+    def _is_state_fully_completed(step: StepExecutionState) -> bool:
+        """Проверяет по уже полученному состоянию, завершены ли все ожидаемые этапы."""
+        expected = step.expected_stages
+        # 🔑 Если expected_stages не установлен (все False), шаг НЕ завершён!
+        if not any(expected.values()):
+            return False
+        completed = step.completed_stages
+        for stage, required in expected.items():
+            if required and not completed.get(stage, False):
+                return False
+        return True
+
     def is_step_fully_completed(self, step_id: str) -> bool:
         """Проверяет, завершены ли все ожидаемые этапы шага."""
         step = self.get_execution_step(step_id)
         if not step:
             return False
-        # 🔑 Если expected_stages не установлен (все False), шаг НЕ завершён!
-        if not any(step.expected_stages.values()):
-            return False
-        for stage, required in step.expected_stages.items():
-            if required and not step.completed_stages.get(stage, False):
-                return False
-        return True
+        return self._is_state_fully_completed(step)
 
     def get_current_stage(self, step_id: str) -> str:
         """
         Определяет текущий этап выполнения шага.
         Возвращает: 'data_fetch', 'processing', 'validation' или 'completed'.
+        Состояние шага читается один раз — без повторных поисков в execution.steps.
         """
-        if self.is_step_fully_completed(step_id):
-            return "completed"
         step = self.get_execution_step(step_id)
         if not step:
             return "data_fetch"
-        if not self.is_stage_completed(step_id, "data_fetch"):
+        if self._is_state_fully_completed(step):
+            return "completed"
+        expected = step.expected_stages
+        completed = step.completed_stages
+        if not completed.get("data_fetch", False):
             return "data_fetch"
-        if step.expected_stages.get("processing", False) and not self.is_stage_completed(step_id, "processing"):
+        if expected.get("processing", False) and not completed.get("processing", False):
             return "processing"
-        if step.expected_stages.get("validation", False) and not self.is_stage_completed(step_id, "validation"):
+        if expected.get("validation", False) and not completed.get("validation", False):
             return "validation"
         return "completed"
 
@@ -259,8 +284,10 @@ class GraphContext(BaseModel):
         step = self.ensure_execution_step(step_id)
         step.decision = decision
 
-        needs_postprocessing = decision.get("needs_postprocessing", False)
-        needs_validation = decision.get("needs_validation", True)
+        # Формат ReasonerAgent: {"postprocessing": {"needed": ...}, "validation": {"needed": ...}};
+        # плоские needs_postprocessing / needs_validation — прежний формат
+        needs_postprocessing = _stage_needed(decision, "postprocessing", "needs_postprocessing", False)
+        needs_validation = _stage_needed(decision, "validation", "needs_validation", True)
 
         expected_stages = {
             "data_fetch": True,
@@ -301,15 +328,19 @@ class GraphContext(BaseModel):
                 LOG.debug("🛠️ Текущий вызов (data_fetch): %s.%s", call["agent"], call["operation"])
                 return call
         elif current_stage == "processing":
+            # Если после обработки ожидается валидация — анализ и проверка в одном вызове LLM
+            operation = "analyze"
+            if step.expected_stages.get("validation", False) and not step.completed_stages.get("validation", False):
+                operation = "analyze_and_validate"
             call = {
                 "agent": "DataAnalysisAgent",
-                "operation": "analyze",
+                "operation": operation,
                 "params": {
                     "subquestion_text": self.get_subquestion_text(step_id),
                     "raw_output": step.raw_output,
                 },
             }
-            LOG.debug("🛠️ Текущий вызов (processing): DataAnalysisAgent.analyze")
+            LOG.debug("🛠️ Текущий вызов (processing): DataAnalysisAgent.%s", operation)
             return call
         elif current_stage == "validation":
             call = {
@@ -352,29 +383,25 @@ class GraphContext(BaseModel):
 
     def get_all_completed_step_results(self) -> Dict[str, Any]:
         """Возвращает результаты всех завершённых шагов."""
-        results = {}
-        for step_id, step in self.execution.steps.items():
-            if self.is_step_fully_completed(step_id) and step.raw_output is not None:
-                results[step_id] = step.raw_output
-        return results
+        return {
+            step_id: step.raw_output
+            for step_id, step in self.execution.steps.items()
+            if step.raw_output is not None and self._is_state_fully_completed(step)
+        }
     
     def get_relevant_step_outputs_for_reasoner(self, step_id: str) -> Dict[str, Any]:
         """
         Возвращает raw_output только для шагов из depends_on текущего подвопроса.
         Используется в reasoner_node для формирования промпта.
         """
-        # Находим текущий подвопрос в плане
-        current_subq = None
-        for sq in self.plan.subquestions:
-            if sq.id == step_id:
-                current_subq = sq
-                break
+        current_subq = self._get_subquestion_by_id(step_id)
         if not current_subq:
             return {}
 
+        steps = self.execution.steps
         outputs = {}
         for dep_id in current_subq.depends_on:
-            step = self.get_execution_step(dep_id)
+            step = steps.get(dep_id)
             if step and step.raw_output is not None:
                 outputs[dep_id] = step.raw_output
 
@@ -1,5 +1,6 @@
 import logging
-from typing import Any, Dict, Tuple
+import threading
+from typing import Any, Dict, List, Tuple
 from src.services.llm_service.model.request import LLMRequest
 from src.services.llm_service.model.response import LLMResponse
 
@@ -30,6 +31,9 @@ class BaseLLMAdapter:
             "top_p": config.get("LLM_TOP_P", 0.9),
             "stop": config.get("stop", ["###"]),
         }
+        # Сериализует генерацию: экземпляр локальной модели не потокобезопасен,
+        # а операции могут вызываться конкурентно (BaseAgent.execute_operation_async)
+        self._generate_lock = threading.Lock()
     
     def generate(self, prompt: str, **kwargs) -> str:
         """
@@ -62,4 +66,16 @@ class BaseLLMAdapter:
         Raises:
             NotImplementedError: Если адаптер не реализует этот метод
         """
-        raise NotImplementedError("Метод generate_with_request не реализован в базовом адаптере")
\ No newline at end of file
+        raise NotImplementedError("Метод generate_with_request не реализован в базовом адаптере")
+
+    def generate_with_request_batch(self, requests: List[LLMRequest], **kwargs) -> List[Tuple[str, LLMResponse]]:
+        """
+        Генерирует ответы для нескольких запросов.
+
+        По умолчанию запросы выполняются по очереди; адаптеры, поддерживающие
+        пакетную генерацию, переопределяют метод.
+
+        Returns:
+            List[tuple[str, LLMResponse]]: Ответы в порядке запросов
+        """
+        return [self.generate_with_request(request, **kwargs) for request in requests]
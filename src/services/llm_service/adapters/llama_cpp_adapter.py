@@ -7,16 +7,22 @@
 - Поддерживает Qwen-специфичные теги рассуждений (thinking / thinking_end)
 - Использует chat-like формат промпта (System/User/Assistant)
 - Возвращает tokens_used через llama_cpp metadata
+- Ограничивает генерацию GBNF-грамматикой, если в запросе задан response_schema
+  (кроме Qwen-моделей: грамматика исключила бы блок рассуждений)
+- При stop_after_json генерирует потоком и останавливается на конце JSON-объекта
+- Может переиспользовать KV-состояние общего префикса промпта (LlamaRAMCache,
+  включается prompt_cache_bytes > 0): статичный системный блок, идущий первым,
+  не пересчитывается при чередовании агентов
 """
 
 from __future__ import annotations
 import logging
-import re
 from typing import Any, Dict, List, Tuple, Optional
 
 from .base import BaseLLMAdapter
 from src.services.llm_service.model.request import LLMRequest, LLMMessage
-from src.services.llm_service.model.response import LLMResponse
+from src.services.llm_service.model.response import THINKING_BLOCK_RE, LLMResponse
+from src.utils.utils import JsonObjectScanner, dumps_json
 
 LOG = logging.getLogger(__name__)
 
@@ -37,6 +43,8 @@ class LlamaCppAdapter(BaseLLMAdapter):
                 - n_gpu_layers: число слоёв на GPU (если используется)
                 - temperature, top_p, max_tokens: параметры генерации
                 - backend_kwargs: дополнительные параметры для Llama(...)
+                - prompt_cache_bytes: ёмкость кэша KV-состояний префиксов в байтах
+                  (по умолчанию 0 — кэш выключен; память кэша добавляется к весам модели)
         """
         super().__init__(config)
 
@@ -56,7 +64,7 @@ class LlamaCppAdapter(BaseLLMAdapter):
         n_gpu_layers = config.get("n_gpu_layers", 0)
         n_batch = config.get("n_batch", 512)
 
-        LOG.info(f"Загрузка GGUF-модели {model_path} (n_ctx={n_ctx}, n_gpu_layers={n_gpu_layers})")
+        LOG.info("Загрузка GGUF-модели %s (n_ctx=%s, n_gpu_layers=%s)", model_path, n_ctx, n_gpu_layers)
 
         # Создаём экземпляр модели
         self.model = Llama(
@@ -67,9 +75,34 @@ class LlamaCppAdapter(BaseLLMAdapter):
             **config.get("backend_kwargs", {})
         )
 
+        # Кэш KV-состояний (по желанию): промпты разных агентов чередуются, и без кэша
+        # llama_cpp переиспользует префикс только с непосредственно предыдущим вызовом
+        prompt_cache_bytes = int(config.get("prompt_cache_bytes", 0))
+        if prompt_cache_bytes > 0:
+            from llama_cpp import LlamaRAMCache
+            self.model.set_cache(LlamaRAMCache(capacity_bytes=prompt_cache_bytes))
+
         # Определяем, является ли модель Qwen (для обработки thinking-тегов)
         self.is_qwen_model = "qwen" in model_path.lower()
 
+        # Грамматики, построенные из JSON Schema (компиляция GBNF недешёвая)
+        self._grammars: Dict[str, Any] = {}
+
+    def _get_grammar(self, schema: Dict[str, Any]) -> Optional[Any]:
+        """
+        Возвращает GBNF-грамматику для JSON Schema (с кэшированием по тексту схемы).
+        Если грамматику построить не удалось — None (генерация без ограничений).
+        """
+        schema_text = dumps_json(schema, sort_keys=True)
+        if schema_text not in self._grammars:
+            try:
+                from llama_cpp import LlamaGrammar
+                self._grammars[schema_text] = LlamaGrammar.from_json_schema(schema_text, verbose=False)
+            except Exception as e:
+                LOG.warning("Не удалось построить грамматику из response_schema: %s", e)
+                self._grammars[schema_text] = None
+        return self._grammars[schema_text]
+
     def _convert_messages_to_chat_format(self, messages: List[LLMMessage]) -> str:
         """
         Конвертирует список LLMMessage в текстовый промпт в формате:
@@ -91,7 +124,7 @@ class LlamaCppAdapter(BaseLLMAdapter):
                 # llama_cpp не поддерживает tool, используем user
                 lines.append(f"User: {content}")
             else:
-                LOG.warning(f"Неизвестная роль '{msg.role}', преобразована в 'User'")
+                LOG.warning("Неизвестная роль '%s', преобразована в 'User'", msg.role)
                 lines.append(f"User: {content}")
         return "\n".join(lines)
 
@@ -112,8 +145,21 @@ class LlamaCppAdapter(BaseLLMAdapter):
                 "stop": ["</s>", "###", "thinking_end"] if self.is_qwen_model else ["</s>", "###"],
                 "echo": False,
             }
-
-            response = self.model(prompt, **gen_kwargs)
+            # Грамматика заставляет начинать ответ с JSON и не даёт Qwen сгенерировать
+            # блок рассуждений — для Qwen-моделей response_schema не применяется
+            if request.response_schema and not self.is_qwen_model:
+                grammar = self._get_grammar(request.response_schema)
+                if grammar is not None:
+                    gen_kwargs["grammar"] = grammar
+
+            # Один экземпляр Llama не допускает параллельной генерации
+            # Ранняя остановка не нужна с грамматикой (она сама завершает объект)
+            # и неприменима к Qwen-рассуждениям, где фигурные скобки встречаются до ответа
+            with self._generate_lock:
+                if request.stop_after_json and "grammar" not in gen_kwargs and not self.is_qwen_model:
+                    response = self._generate_until_json_end(prompt, gen_kwargs)
+                else:
+                    response = self.model(prompt, **gen_kwargs)
 
             # 3. Извлекаем сырой текст
             raw_text = response["choices"][0]["text"].strip()
@@ -123,16 +169,11 @@ class LlamaCppAdapter(BaseLLMAdapter):
 
             # 5. Дополнительно: если модель Qwen — извлекаем thinking вручную (на случай, если парсер пропустил)
             if self.is_qwen_model and not llm_response.thinking:
-                thinking_match = re.search(
-                    r"thinking(.*?)thinking_end", raw_text, re.DOTALL | re.IGNORECASE
-                )
+                thinking_match = THINKING_BLOCK_RE.search(raw_text)
                 if thinking_match:
                     llm_response.thinking = thinking_match.group(1).strip()
                     # Убираем теги из answer
-                    clean_answer = re.sub(
-                        r"thinking.*?thinking_end", "", raw_text, flags=re.DOTALL | re.IGNORECASE
-                    ).strip()
-                    llm_response.answer = clean_answer
+                    llm_response.answer = THINKING_BLOCK_RE.sub("", raw_text).strip()
 
             # 6. Оценка токенов (приблизительно)
             prompt_tokens = response.get("usage", {}).get("prompt_tokens", 0)
@@ -153,12 +194,34 @@ class LlamaCppAdapter(BaseLLMAdapter):
             )
             return "", error_response
 
+    def _generate_until_json_end(self, prompt: str, gen_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Потоковая генерация, прерываемая сразу после закрытия первого JSON-объекта:
+        модель не тратит токены на текст после ответа.
+        Возвращает ответ в том же формате, что и непотоковый вызов.
+        """
+        scanner = JsonObjectScanner()
+        parts: List[str] = []
+        completion_tokens = 0
+        for chunk in self.model(prompt, stream=True, **gen_kwargs):
+            piece = chunk["choices"][0]["text"]
+            completion_tokens += 1
+            end = scanner.feed(piece)
+            if end != -1:
+                parts.append(piece[:end])
+                break
+            parts.append(piece)
+        prompt_tokens = len(self.model.tokenize(prompt.encode("utf-8")))
+        return {
+            "choices": [{"text": "".join(parts)}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens},
+        }
+
     def generate(self, prompt: str, **kwargs) -> str:
         """
         Генерирует ответ на основе простого текстового промпта.
         Для совместимости оборачивает промпт в LLMRequest.
         """
-        from src.services.llm_service.model.request import LLMMessage, LLMRequest
         request = LLMRequest(
             messages=[
                 LLMMessage(role="system", content="Ты — полезный помощник."),
@@ -176,4 +239,4 @@ class LlamaCppAdapter(BaseLLMAdapter):
                 self.model.close()
             del self.model
         except Exception as e:
-            LOG.debug(f"Ошибка при закрытии LlamaCppAdapter: {e}")
\ No newline at end of file
+            LOG.debug("Ошибка при закрытии LlamaCppAdapter: %s", e)
\ No newline at end of file
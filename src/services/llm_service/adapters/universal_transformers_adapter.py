@@ -60,7 +60,7 @@ class UniversalTransformersAdapter(BaseLLMAdapter):
         self.device = config.get("device") or ("cuda" if torch.cuda.is_available() else "cpu")
         backend_kwargs = config.get("backend_kwargs", {})
 
-        LOG.info(f"Загрузка модели {model_path} на устройстве {self.device}")
+        LOG.info("Загрузка модели %s на устройстве %s", model_path, self.device)
 
         # Загрузка токенизатора
         self.tokenizer: PreTrainedTokenizerBase = AutoTokenizer.from_pretrained(
@@ -74,7 +74,7 @@ class UniversalTransformersAdapter(BaseLLMAdapter):
             )
             self.model_type = "causal"
         except Exception as e1:
-            LOG.debug(f"Не удалось загрузить как causal LM: {e1}")
+            LOG.debug("Не удалось загрузить как causal LM: %s", e1)
             try:
                 self.model = AutoModelForSeq2SeqLM.from_pretrained(
                     model_path, trust_remote_code=True, **backend_kwargs
@@ -107,16 +107,39 @@ class UniversalTransformersAdapter(BaseLLMAdapter):
             if role == "tool":
                 role = "user"  # Большинство chat_template не поддерживают 'tool'
             elif role not in ("system", "user", "assistant"):
-                LOG.warning(f"Неизвестная роль '{msg.role}', преобразована в 'user'")
+                LOG.warning("Неизвестная роль '%s', преобразована в 'user'", msg.role)
                 role = "user"
             chat_messages.append({"role": role, "content": msg.content})
         return chat_messages
 
+    def _build_prompt(self, request: LLMRequest) -> str:
+        """
+        Преобразует сообщения запроса в текст промпта через chat_template.
+        """
+        chat_messages = self._convert_messages_to_chat_format(request.messages)
+        if self.tokenizer.chat_template:
+            return self.tokenizer.apply_chat_template(
+                chat_messages, tokenize=False, add_generation_prompt=True
+            )
+        # Fallback: простая конкатенация
+        prompt = "\n".join(f"{msg['role'].capitalize()}: {msg['content']}" for msg in chat_messages)
+        if not prompt.endswith("Assistant:"):
+            prompt += "\nAssistant:"
+        return prompt
+
     def _generate_raw(self, input_ids: torch.Tensor, attention_mask: torch.Tensor, request: LLMRequest) -> str:
         """
         Выполняет генерацию на основе токенизированного ввода.
         """
-        with torch.no_grad():
+        return self._generate_raw_batch(input_ids, attention_mask, request)[0]
+
+    def _generate_raw_batch(
+        self, input_ids: torch.Tensor, attention_mask: torch.Tensor, request: LLMRequest
+    ) -> List[str]:
+        """
+        Выполняет генерацию для пакета токенизированных промптов (по строке на промпт).
+        """
+        with self._generate_lock, torch.no_grad():
             output_ids = self.model.generate(
                 input_ids=input_ids,
                 attention_mask=attention_mask,
@@ -132,8 +155,8 @@ class UniversalTransformersAdapter(BaseLLMAdapter):
         if self.model_type == "causal":
             output_ids = output_ids[:, input_ids.shape[1]:]
 
-        generated_text = self.tokenizer.decode(output_ids[0], skip_special_tokens=True)
-        return generated_text.strip()
+        generated = self.tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+        return [text.strip() for text in generated]
 
     def generate_with_request(self, request: LLMRequest, **kwargs) -> Tuple[str, LLMResponse]:
         """
@@ -142,19 +165,8 @@ class UniversalTransformersAdapter(BaseLLMAdapter):
         Возвращает (основной ответ, структурированный LLMResponse).
         """
         try:
-            # 1. Преобразуем сообщения в чат-формат
-            chat_messages = self._convert_messages_to_chat_format(request.messages)
-
-            # 2. Применяем chat_template
-            if self.tokenizer.chat_template:
-                prompt = self.tokenizer.apply_chat_template(
-                    chat_messages, tokenize=False, add_generation_prompt=True
-                )
-            else:
-                # Fallback: простая конкатенация
-                prompt = "\n".join(f"{msg['role'].capitalize()}: {msg['content']}" for msg in chat_messages)
-                if not prompt.endswith("Assistant:"):
-                    prompt += "\nAssistant:"
+            # 1–2. Чат-формат + chat_template
+            prompt = self._build_prompt(request)
 
             # 3. Токенизация
             inputs = self.tokenizer(
@@ -189,13 +201,53 @@ class UniversalTransformersAdapter(BaseLLMAdapter):
             )
             return "", error_response
 
+    def generate_with_request_batch(self, requests: List[LLMRequest], **kwargs) -> List[Tuple[str, LLMResponse]]:
+        """
+        Пакетная генерация: один вызов model.generate для всех запросов.
+
+        Применяется для causal-моделей, если у запросов одинаковые параметры генерации;
+        иначе (и при ошибке пакетной генерации) запросы выполняются по очереди.
+        """
+        gen_params = {(r.temperature, r.top_p, r.max_tokens) for r in requests}
+        if len(requests) < 2 or self.model_type != "causal" or len(gen_params) != 1:
+            return super().generate_with_request_batch(requests, **kwargs)
+
+        request = requests[0]
+        try:
+            prompts = [self._build_prompt(r) for r in requests]
+            # Левый паддинг: генерация продолжает каждую строку справа
+            padding_side = self.tokenizer.padding_side
+            self.tokenizer.padding_side = "left"
+            try:
+                inputs = self.tokenizer(
+                    prompts,
+                    return_tensors="pt",
+                    padding=True,
+                    truncation=True,
+                    max_length=self.config.get("n_ctx", 4096) - request.max_tokens,
+                )
+            finally:
+                self.tokenizer.padding_side = padding_side
+            raw_texts = self._generate_raw_batch(
+                inputs.input_ids.to(self.device), inputs.attention_mask.to(self.device), request
+            )
+        except Exception:
+            LOG.exception("Ошибка пакетной генерации, выполняем запросы по очереди")
+            return super().generate_with_request_batch(requests, **kwargs)
+
+        results = []
+        for raw_text in raw_texts:
+            llm_response = LLMResponse.from_raw(raw_text)
+            llm_response.tokens_used = len(self.tokenizer.encode(raw_text))
+            results.append((llm_response.answer, llm_response))
+        return results
+
     def generate(self, prompt: str, **kwargs) -> str:
         """
         Генерирует ответ на основе простого текстового промпта.
 
         Для совместимости оборачивает промпт в LLMRequest.
         """
-        from src.services.llm_service.model.request import LLMMessage, LLMRequest
         request = LLMRequest(
             messages=[
                 LLMMessage(role="system", content="Ты — полезный помощник."),
@@ -214,4 +266,4 @@ class UniversalTransformersAdapter(BaseLLMAdapter):
             if self.device == "cuda":
                 torch.cuda.empty_cache()
         except Exception as e:
-            LOG.debug(f"Ошибка при закрытии UniversalTransformersAdapter: {e}")
\ No newline at end of file
+            LOG.debug("Ошибка при закрытии UniversalTransformersAdapter: %s", e)
\ No newline at end of file
@@ -46,5 +46,5 @@ def ensure_llm(profile: str):
             raise ValueError(f"Неизвестный backend '{backend}' в профиле '{profile}'")
 
         _LLM_CACHE[profile] = adapter
-        LOG.info(f"Загружена модель для профиля '{profile}' (backend={backend}): {config.get('model_path', 'N/A')}")
+        LOG.info("Загружена модель для профиля '%s' (backend=%s): %s", profile, backend, config.get('model_path', 'N/A'))
         return adapter
\ No newline at end of file
@@ -7,10 +7,10 @@ LLMRequest — основной контракт для передачи про
 """
 
 from dataclasses import dataclass
-from typing import List
+from typing import Any, Dict, List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMMessage:
     """
     Одно сообщение в диалоге с LLM.
@@ -23,7 +23,7 @@ class LLMMessage:
     content: str
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMRequest:
     """
     Структурированный запрос к LLM.
@@ -33,8 +33,14 @@ class LLMRequest:
         temperature (float): Температура генерации (0.0–1.0)
         max_tokens (int): Максимальное количество генерируемых токенов
         top_p (float): Параметр nucleus sampling
+        response_schema (Optional[Dict]): JSON Schema ожидаемого ответа. Адаптеры с
+            constrained decoding ограничивают генерацию этой схемой, остальные игнорируют.
+        stop_after_json (bool): Ответ — один JSON-объект; адаптеры с потоковой генерацией
+            останавливают её сразу после закрывающей скобки объекта.
     """
     messages: List[LLMMessage]
     temperature: float = 0.3
     max_tokens: int = 1024
-    top_p: float = 0.9
\ No newline at end of file
+    top_p: float = 0.9
+    response_schema: Optional[Dict[str, Any]] = None
+    stop_after_json: bool = False
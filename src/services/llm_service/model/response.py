@@ -12,11 +12,15 @@ LLMResponse инкапсулирует:
 Также содержит статический метод `from_raw`, который парсит любой сырой ответ.
 """
 
-import json
 import re
 from dataclasses import dataclass, field
 from typing import Any, Dict, Optional
 
+from src.utils.utils import parse_json_object
+
+# Qwen-специфичный блок рассуждений: thinking ... thinking_end
+THINKING_BLOCK_RE = re.compile(r"thinking(.*?)thinking_end", re.DOTALL | re.IGNORECASE)
+
 
 @dataclass
 class LLMResponse:
@@ -60,32 +64,18 @@ class LLMResponse:
         json_answer = None
 
         # 1. Обработка Qwen-специфичных тегов рассуждений
-        thinking_match = re.search(r"thinking(.*?)thinking_end", raw_text, re.DOTALL | re.IGNORECASE)
+        thinking_match = THINKING_BLOCK_RE.search(raw_text)
         if thinking_match:
             thinking = thinking_match.group(1).strip()
-            answer = re.sub(r"thinking.*?thinking_end", "", raw_text, flags=re.DOTALL | re.IGNORECASE).strip()
-
-        # 2. Извлечение JSON из fenced-блоков или фигурных скобок
-        json_text = None
-        # Fenced block
-        fenced = re.findall(r"```(?:json)?\s*([\s\S]+?)\s*```", raw_text, flags=re.MULTILINE)
-        if fenced:
-            json_text = fenced[0].strip()
-        else:
-            # Brace matching
-            start = raw_text.find("{")
-            end = raw_text.rfind("}")
-            if start != -1 and end != -1 and end > start:
-                json_text = raw_text[start : end + 1].strip()
-
-        if json_text:
-            try:
-                json_answer = json.loads(json_text)
-                # Если JSON содержит поле "answer", используем его как основной ответ
-                if isinstance(json_answer, dict) and "answer" in json_answer:
-                    answer = str(json_answer["answer"])
-            except json.JSONDecodeError:
-                pass  # Игнорируем ошибки парсинга
+            answer = THINKING_BLOCK_RE.sub("", raw_text).strip()
+
+        # 2. Извлечение JSON: первый сбалансированный объект (fenced-блок или текст)
+        # Некорректные кандидаты пропускаются, берётся первый разбираемый объект
+        json_answer = parse_json_object(answer)
+
+        # Если JSON содержит поле "answer", используем его как основной ответ
+        if isinstance(json_answer, dict) and "answer" in json_answer:
+            answer = str(json_answer["answer"])
 
         return LLMResponse(
             raw_text=raw_text,
@@ -0,0 +1,82 @@
+# src/services/llm_service/response_cache.py
+"""
+Кэш ответов LLM с точным совпадением запроса (exact-match).
+
+Назначение:
+- Повторный одинаковый LLMRequest (те же сообщения и параметры генерации)
+  не отправляется в модель повторно — ответ берётся из кэша.
+- Ключ — хэш канонического JSON запроса с пространством имён (обычно llm_profile),
+  чтобы ответы разных моделей не смешивались.
+- Кэш потокобезопасен и ограничен по размеру (LRU).
+
+Операции сами решают, какие ответы класть в кэш: кэшируются только ответы,
+прошедшие валидацию, чтобы повторная попытка после ошибки снова шла в LLM.
+
+Пример:
+    key = RESPONSE_CACHE.make_key(request, namespace="default")
+    llm_response = RESPONSE_CACHE.get(key)
+    if llm_response is None:
+        _, llm_response = llm.generate_with_request(request)
+        ...
+        RESPONSE_CACHE.put(key, llm_response)
+"""
+
+from __future__ import annotations
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Optional
+
+from src.services.llm_service.model.request import LLMRequest
+from src.services.llm_service.model.response import LLMResponse
+from src.utils.utils import dumps_json
+
+
+class LLMResponseCache:
+    """
+    LRU-кэш LLMResponse по ключу запроса.
+    Хранит и возвращает копии ответов: вызывающий код может менять json_answer.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, LLMResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(request: LLMRequest, namespace: Optional[str] = None) -> str:
+        """Строит ключ кэша из запроса и пространства имён (профиля LLM)."""
+        payload = dumps_json({"ns": namespace, "request": asdict(request)}, sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[LLMResponse]:
+        """Возвращает копию закэшированного ответа или None."""
+        with self._lock:
+            response = self._data.get(key)
+            if response is None:
+                return None
+            self._data.move_to_end(key)
+        return copy.deepcopy(response)
+
+    def put(self, key: str, response: LLMResponse) -> None:
+        """Сохраняет копию ответа, вытесняя самый старый при переполнении."""
+        stored = copy.deepcopy(response)
+        with self._lock:
+            self._data[key] = stored
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Очищает кэш."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Общий кэш ответов для всех агентов процесса
+RESPONSE_CACHE = LLMResponseCache()
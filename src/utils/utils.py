@@ -4,14 +4,84 @@
 """
 
 from __future__ import annotations
+import json
 import re
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 import logging
 
-
+try:
+    import orjson
+except ImportError:  # orjson — необязательное ускорение, без него работает stdlib json
+    orjson = None
 
 LOG = logging.getLogger(__name__)
 
+# Открывающий fenced-блок: ```json или ```
+_FENCE_RE = re.compile(r"```(?:json)?")
+
+
+def dumps_json(
+    obj: Any,
+    *,
+    indent: bool = False,
+    sort_keys: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+) -> str:
+    """
+    Сериализует объект в JSON-строку без экранирования кириллицы.
+
+    Если установлен orjson — используется он (C-энкодер), иначе stdlib json.
+    Вывод обоих вариантов совпадает: компактный (",", ":") либо с отступом 2.
+
+    Args:
+        obj: сериализуемый объект
+        indent: форматировать с отступом в 2 пробела
+        sort_keys: сортировать ключи словарей
+        default: сериализатор для неподдерживаемых типов (как в json.dumps)
+
+    Raises:
+        TypeError: если объект не сериализуем
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=default, option=option).decode("utf-8")
+        except orjson.JSONEncodeError:
+            pass  # например, int > 64 бит — пробуем stdlib
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+        sort_keys=sort_keys,
+        default=default,
+    )
+
+
+def dumps_json_or_str(obj: Any, *, indent: bool = False, sort_keys: bool = False) -> str:
+    """
+    Как dumps_json, но для несериализуемого объекта возвращает str(obj).
+    Используется при форматировании промптов: данные шагов попадают в промпт в любом случае.
+    """
+    try:
+        return dumps_json(obj, indent=indent, sort_keys=sort_keys)
+    except (TypeError, ValueError):
+        return str(obj)
+
+
+def loads_json(text: Any) -> Any:
+    """
+    Разбирает JSON из str/bytes (orjson, если установлен).
+    Ошибки разбора — json.JSONDecodeError (orjson.JSONDecodeError — его подкласс).
+    """
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
 
 # src/utils/utils.py
 
@@ -47,6 +117,39 @@ def build_tool_registry_snapshot(agent_registry) -> Dict[str, Any]:
         snapshot[name] = safe_meta
     return snapshot
 
+# Описания нарушенных правил JSON Schema для schema_error_message
+_SCHEMA_RULE_MESSAGES = {
+    "type": "неверный тип значения (ожидается {bound})",
+    "enum": "недопустимое значение (допустимы: {bound})",
+    "minimum": "значение меньше {bound}",
+    "maximum": "значение больше {bound}",
+    "minItems": "должно содержать не менее {bound} элементов",
+    "maxItems": "должно содержать не более {bound} элементов",
+    "minLength": "строка короче {bound} символов",
+    "pattern": "значение не соответствует шаблону {bound}",
+}
+
+
+def schema_error_message(error: Any) -> str:
+    """
+    Формирует сообщение на русском для ошибки валидации fastjsonschema
+    (JsonSchemaValueException): путь к полю и нарушенное правило.
+    Для неизвестных правил используется исходный текст ошибки.
+    """
+    field = error.name[len("data"):].lstrip(".") if error.name.startswith("data") else error.name
+    if error.rule == "required":
+        value = error.value if isinstance(error.value, dict) else {}
+        missing = next((key for key in error.rule_definition if key not in value), "")
+        field = f"{field}.{missing}" if field else missing
+        description = "отсутствует обязательное поле"
+    elif error.rule in _SCHEMA_RULE_MESSAGES:
+        description = _SCHEMA_RULE_MESSAGES[error.rule].format(bound=error.rule_definition)
+    else:
+        description = error.message
+    location = f"поле '{field}'" if field else "ответ"
+    return f"Ответ не соответствует схеме: {location} — {description}"
+
+
 def extract_thinking_response(text: str) -> tuple[str, str]:
     """
     Разделяет рассуждения и ответ в ответе Qwen3-4B-Thinking.
@@ -82,25 +185,116 @@ def extract_thinking_response(text: str) -> tuple[str, str]:
     # Если все не получается, возвращаем полный текст как рассуждения
     return text, ""
 
-def extract_json_from_text(text: str) -> Optional[str]:
+class JsonObjectScanner:
     """
-    Извлекает JSON из произвольного текста, возвращаемого LLM.
-    Поддерживаются два варианта:
-    1. Fenced-блоки (```json ... ```)
-    2. Brace-matching (поиск первой { и последней })
+    Инкрементальный поиск конца первого JSON-объекта {...} в тексте или потоке фрагментов.
+
+    Текст до первой "{" пропускается; дальше за один проход отслеживаются глубина
+    вложенности, строки и экранирование. Состояние сохраняется между вызовами feed,
+    поэтому сканер подходит для потоковой генерации LLM.
+    """
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.in_str = False
+        self.escape = False
+
+    def feed(self, chunk: str, pos: int = 0) -> int:
+        """
+        Обрабатывает chunk, начиная с позиции pos.
+
+        Returns:
+            Индекс в chunk сразу после закрывающей "}" объекта или -1, если объект ещё не закрыт.
+        """
+        depth, in_str, escape = self.depth, self.in_str, self.escape
+        if depth == 0:
+            pos = chunk.find("{", pos)
+            if pos == -1:
+                return -1
+        for i in range(pos, len(chunk)):
+            ch = chunk[i]
+            if in_str:
+                if escape:
+                    escape = False
+                elif ch == "\\":
+                    escape = True
+                elif ch == '"':
+                    in_str = False
+            elif ch == '"':
+                in_str = True
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                if depth == 0:
+                    self.depth, self.in_str, self.escape = depth, in_str, escape
+                    return i + 1
+        self.depth, self.in_str, self.escape = depth, in_str, escape
+        return -1
+
+def extract_json_object(text: str) -> Optional[str]:
+    """
+    Извлекает первый сбалансированный JSON-объект {...} из ответа LLM.
+
+    Если ответ начинается с '{' (обычный случай), объект разбирается с начала строки.
+    Иначе, если в тексте есть открывающий fenced-блок (```json), поиск начинается после него.
+    Сам объект ищется за один проход по строке (см. JsonObjectScanner),
+    без регулярных выражений с откатами.
+
+    Returns:
+        Подстрока с объектом или None, если сбалансированный объект не найден.
     """
     if not text:
         return None
-    
-    # 1. fenced block
-    fenced = re.findall(r"```(?:json)?\s*([\s\S]+?)\s*```", text, flags=re.MULTILINE)
-    if fenced:
-        return fenced[0].strip()
-    
-    # 2. brace matching
-    start = text.find("{")
-    end = text.rfind("}")
-    if start != -1 and end != -1 and end > start:
-        return text[start : end + 1].strip()
-    
-    return None
\ No newline at end of file
+
+    if text[0] == "{":
+        start = 0
+    else:
+        fence = _FENCE_RE.search(text)
+        start = text.find("{", fence.end() if fence else 0)
+        if start == -1:
+            return None
+
+    end = JsonObjectScanner().feed(text, start)
+    return text[start:end] if end != -1 else None
+
+def parse_json_object(text: str) -> Optional[Any]:
+    """
+    Разбирает первый корректный JSON-объект {...} из ответа LLM.
+
+    Кандидаты ищутся так же, как в extract_json_object. Если кандидат не
+    разбирается как JSON (например, фигурные скобки в прозе перед ответом),
+    поиск продолжается с позиции после него — каждый символ сканируется
+    не более одного раза.
+
+    Returns:
+        Разобранный объект или None, если корректного JSON-объекта в тексте нет.
+    """
+    if not text:
+        return None
+
+    if text[0] == "{":
+        start = 0
+    else:
+        fence = _FENCE_RE.search(text)
+        start = fence.end() if fence else 0
+
+    while True:
+        start = text.find("{", start)
+        if start == -1:
+            return None
+        end = JsonObjectScanner().feed(text, start)
+        if end == -1:
+            return None
+        try:
+            return loads_json(text[start:end])
+        except json.JSONDecodeError:
+            start = end
+
+def extract_json_from_text(text: str) -> Optional[str]:
+    """
+    Извлекает JSON из произвольного текста, возвращаемого LLM.
+    Поддерживаются fenced-блоки (```json ... ```) и JSON без обёртки —
+    см. extract_json_object.
+    """
+    return extract_json_object(text)
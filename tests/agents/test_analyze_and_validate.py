@@ -0,0 +1,122 @@
+# tests/agents/test_analyze_and_validate.py
+# coding: utf-8
+"""
+Тесты совмещённой операции analyze_and_validate (DataAnalysisAgent) без реальной LLM.
+"""
+import json
+from unittest.mock import Mock
+
+from src.agents.DataAnalysisAgent.operations.analyze_and_validate import Operation
+from src.agents.ReasonerAgent.operations.decide_next_stage import Operation as DecideNextStage
+from src.graph.nodes import reasoner as reasoner_module
+from src.graph.nodes.executor import _record_result, executor_node
+from src.graph.nodes.reasoner import reasoner_node
+from src.model.agent_result import AgentResult
+from src.model.context.context import GraphContext
+from src.model.context.models import Plan, SubQuestion
+from src.services.llm_service.model.response import LLMResponse
+
+FUSED = {
+    "summary": "Найдена одна книга Пушкина.",
+    "reasoning": ["V1: Да.", "V2: Да.", "V3: Нет.", "V4: Да."],
+    "validation": {"is_valid": True, "confidence": 0.9, "reason": "V1–V4", "explanation": "Список книг получен."},
+}
+PARAMS = {"subquestion_text": "Какие книги написал Пушкин?", "raw_output": [{"title": "Евгений Онегин"}]}
+
+
+class FakeLLM:
+    def __init__(self, payload):
+        self.raw = json.dumps(payload, ensure_ascii=False)
+        self.requests = []
+        self.prompts = []
+
+    def generate_with_request(self, request, **kwargs):
+        self.requests.append(request)
+        response = LLMResponse.from_raw(self.raw)
+        return response.answer, response
+
+    def generate(self, prompt):
+        self.prompts.append(prompt)
+        return "Резюме."
+
+
+class FakeAgent:
+    def __init__(self, llm):
+        self.llm = llm
+        self.config = {}
+
+
+def test_single_llm_call_returns_summary_and_verdict():
+    llm = FakeLLM(FUSED)
+    result = Operation().run(PARAMS, {}, FakeAgent(llm))
+    assert result.status == "ok"
+    assert result.output == {"metrics": {"row_count": 1, "columns": ["title"], "sample": [{"title": "Евгений Онегин"}]},
+                             "summary": FUSED["summary"]}
+    assert result.metadata["validation"]["is_valid"] is True
+    assert result.metadata["validation"]["reasoning"] == FUSED["reasoning"]
+    assert len(llm.requests) == 1 and llm.prompts == []
+
+
+def test_invalid_answer_falls_back_to_plain_analysis():
+    llm = FakeLLM({"summary": "Без вердикта."})
+    result = Operation().run(PARAMS, {}, FakeAgent(llm))
+    assert result.status == "ok"
+    assert result.output["summary"] == "Резюме."
+    assert "validation" not in result.metadata
+
+
+def test_executor_marks_validation_stage_from_fused_result():
+    ctx = GraphContext()
+    ctx.set_plan(Plan(subquestions=[SubQuestion(id="q1", text=PARAMS["subquestion_text"])]))
+    ctx.start_step("q1")
+    ctx.record_reasoner_decision("q1", {"needs_postprocessing": True, "needs_validation": True})
+    ctx.record_step_result("q1", PARAMS["raw_output"])
+    ctx.mark_stage_completed("q1", "data_fetch")
+    assert ctx.get_current_tool_call("q1")["operation"] == "analyze_and_validate"
+
+    result = Operation().run(PARAMS, {}, FakeAgent(FakeLLM(FUSED)))
+    _record_result(ctx, "q1", "processing", result)
+    assert ctx.get_current_stage("q1") == "completed"
+    assert ctx.get_execution_step("q1").validation_result["is_valid"] is True
+
+
+def test_llm_shaped_decision_routes_processing_to_fused_operation(monkeypatch):
+    # Решение в формате decide_next_stage: этапы заданы вложенными postprocessing/validation
+    decision = {
+        "reasoning": [f"R{i}: ..." for i in range(1, 8)],
+        "hypotheses": [{
+            "agent": "BooksLibraryAgent",
+            "operation": "list_books",
+            "params": {"author": "Пушкин"},
+            "confidence": 0.9,
+            "reason": "R3–R6",
+            "explanation": "Операция возвращает список книг автора.",
+        }],
+        "postprocessing": {"needed": True, "confidence": 0.9, "reason": "...", "explanation": "..."},
+        "validation": {"needed": True, "confidence": 0.9, "reason": "...", "explanation": "..."},
+        "final_decision": {"selected_hypothesis": 0, "explanation": "Выбрана единственная гипотеза."},
+    }
+    assert DecideNextStage()._validate_decision(decision) == (True, None)
+
+    agents = {name: Mock() for name in ("ReasonerAgent", "BooksLibraryAgent", "DataAnalysisAgent")}
+    agents["ReasonerAgent"].execute_operation.return_value = AgentResult.ok(stage="reasoning", output=decision)
+    agents["BooksLibraryAgent"].execute_operation.return_value = AgentResult.ok(
+        stage="data_fetch", output=PARAMS["raw_output"]
+    )
+    agents["DataAnalysisAgent"].execute_operation.return_value = Operation().run(PARAMS, {}, FakeAgent(FakeLLM(FUSED)))
+    registry = Mock()
+    registry.instantiate_agent.side_effect = lambda name, control=False: agents[name]
+    monkeypatch.setattr(reasoner_module, "build_tool_registry_snapshot", lambda _: {})
+
+    ctx = GraphContext()
+    ctx.set_plan(Plan(subquestions=[SubQuestion(id="q1", text=PARAMS["subquestion_text"])]))
+    ctx.start_step("q1")
+    state = ctx.to_dict()
+    for _ in range(2):  # data_fetch, затем processing
+        state = reasoner_node(state, agent_registry=registry)
+        state = executor_node(state, agent_registry=registry)
+
+    operation, params = agents["DataAnalysisAgent"].execute_operation.call_args.args
+    assert operation == "analyze_and_validate"
+    assert params["raw_output"] == PARAMS["raw_output"]
+    assert GraphContext.from_state_dict(state).get_current_stage("q1") == "completed"
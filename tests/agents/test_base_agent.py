@@ -0,0 +1,94 @@
+# tests/agents/test_base_agent.py
+# coding: utf-8
+"""
+Тесты выполнения операций BaseAgent (синхронно и асинхронно).
+"""
+import asyncio
+import threading
+
+import pytest
+
+from src.agents.SynthesizerAgent.core import SynthesizerAgent
+from src.agents.SynthesizerAgent.operations import synthesize
+from src.agents.base import BaseAgent, _load_operation_manifests
+from src.agents.operations_base import BaseOperation
+from src.model.agent_result import AgentResult
+
+
+class _SlowEcho(BaseOperation):
+    description = "Возвращает переданное значение после паузы"
+
+    def run(self, params, context, agent):
+        agent.barrier.wait(timeout=5)
+        return AgentResult.ok(stage="echo", output=params["value"])
+
+
+@pytest.fixture
+def agent():
+    agent = BaseAgent({
+        "name": "EchoAgent",
+        "title": "Эхо",
+        "description": "Тестовый агент",
+        "implementation": "tests.agents.test_base_agent:BaseAgent",
+    })
+    agent._operations = {"echo": _SlowEcho}
+    agent._initialized = True
+    return agent
+
+
+def test_execute_operation_async_runs_concurrently(agent):
+    # Барьер на 3 участника пройдёт только если все вызовы выполняются одновременно
+    agent.barrier = threading.Barrier(3)
+
+    async def fan_out():
+        return await asyncio.gather(
+            *(agent.execute_operation_async("echo", {"value": i}) for i in range(3))
+        )
+
+    results = asyncio.run(fan_out())
+    assert [r.output for r in results] == [0, 1, 2]
+    assert all(r.agent == "EchoAgent" and r.operation == "echo" for r in results)
+    assert all("elapsed_s" in r.metadata for r in results)
+
+
+def test_execute_operation_async_unknown_operation(agent):
+    with pytest.raises(KeyError):
+        asyncio.run(agent.execute_operation_async("missing"))
+
+
+class _Failing(BaseOperation):
+    description = "Всегда завершается исключением"
+
+    def run(self, params, context, agent):
+        raise RuntimeError("нет соединения")
+
+
+def test_failing_operation_returns_error_result(agent):
+    agent._operations["fail"] = _Failing
+    expected = "Операция 'fail' завершилась с ошибкой: нет соединения"
+    for result in (agent.execute_operation("fail"), asyncio.run(agent.execute_operation_async("fail"))):
+        assert result.status == "error"
+        assert result.error == expected
+        assert result.stage == "operation_execution"
+
+
+def test_discover_operations_is_cached():
+    descriptor = {"implementation": "src.agents.SynthesizerAgent.core:SynthesizerAgent"}
+    BaseAgent.invalidate_operations_cache()
+    first = BaseAgent.discover_operations(descriptor)
+    second = BaseAgent.discover_operations(descriptor)
+    assert "synthesize" in first and first == second
+    assert _load_operation_manifests.cache_info().hits == 1
+
+
+def test_operations_are_imported_once_as_package_modules():
+    descriptor = {
+        "name": "SynthesizerAgent",
+        "title": "Синтезатор",
+        "description": "Тестовый агент",
+        "implementation": "src.agents.SynthesizerAgent.core:SynthesizerAgent",
+    }
+    first, second = SynthesizerAgent(descriptor), SynthesizerAgent(descriptor)
+    first._load_operations_from_folder()
+    second._load_operations_from_folder()
+    assert first._operations["synthesize"] is second._operations["synthesize"] is synthesize.Operation
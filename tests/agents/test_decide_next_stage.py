@@ -0,0 +1,213 @@
+# tests/agents/test_decide_next_stage.py
+# coding: utf-8
+"""
+Тесты операции decide_next_stage (ReasonerAgent) без реальной LLM.
+"""
+import json
+
+import pytest
+
+from src.agents.ReasonerAgent.operations.decide_next_stage import Operation
+from src.agents.ReasonerAgent.schemas import ReasonerDecision
+from src.services.llm_service.model.response import LLMResponse
+from src.services.llm_service.response_cache import RESPONSE_CACHE
+
+
+def _decision(confidences=(0.9,)):
+    return {
+        "reasoning": [f"R{i}: ..." for i in range(1, 8)],
+        "hypotheses": [
+            {
+                "agent": "BooksLibraryAgent",
+                "operation": "list_books",
+                "params": {"author": "Пушкин"},
+                "confidence": c,
+                "reason": "R3–R6",
+                "explanation": "Операция возвращает список книг автора.",
+            }
+            for c in confidences
+        ],
+        "postprocessing": {"needed": False, "confidence": 0.9, "reason": "...", "explanation": "..."},
+        "validation": {"needed": True, "confidence": 0.9, "reason": "...", "explanation": "..."},
+        "final_decision": {"selected_hypothesis": 0, "explanation": "Выбрана единственная гипотеза."},
+    }
+
+
+class FakeLLM:
+    """LLM-заглушка: возвращает заранее заданный ответ и считает вызовы."""
+
+    def __init__(self, decision):
+        self.raw = json.dumps(decision, ensure_ascii=False)
+        self.calls = 0
+        self.last_request = None
+
+    def generate_with_request(self, request, **kwargs):
+        self.calls += 1
+        self.last_request = request
+        response = LLMResponse.from_raw(self.raw)
+        return response.answer, response
+
+
+class FakeAgent:
+    def __init__(self, llm, config=None):
+        self.llm = llm
+        self.config = config or {}
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    RESPONSE_CACHE.clear()
+    yield
+    RESPONSE_CACHE.clear()
+
+
+@pytest.fixture
+def params():
+    return {
+        "subquestion": {"id": "q1", "text": "Какие книги написал Пушкин?"},
+        "step_state": {"stage": "data_fetch"},
+        "tool_registry_snapshot": {"BooksLibraryAgent": {"operations": {"list_books": {"kind": "direct"}}}},
+    }
+
+
+def test_decide_next_stage_ok(params):
+    llm = FakeLLM(_decision())
+    result = Operation().run(params, {}, FakeAgent(llm))
+    assert result.status == "ok"
+    assert result.stage == "reasoning"
+    assert result.output["final_decision"]["selected_hypothesis"] == 0
+
+
+def test_full_prompt_kept_only_on_request(params):
+    result = Operation().run(params, {}, FakeAgent(FakeLLM(_decision())))
+    assert result.prompt is None and result.raw_response is None
+
+    RESPONSE_CACHE.clear()
+    result = Operation().run(params, {}, FakeAgent(FakeLLM(_decision()), {"LOG_FULL_PROMPT": True}))
+    assert "Какие книги написал Пушкин?" in result.prompt
+    assert result.raw_response
+
+
+def test_repeated_request_served_from_cache(params):
+    llm = FakeLLM(_decision())
+    agent = FakeAgent(llm)
+    first = Operation().run(params, {}, agent)
+    second = Operation().run(params, {}, agent)
+    assert first.status == second.status == "ok"
+    assert second.output == first.output
+    assert llm.calls == 1
+
+
+def test_cache_can_be_disabled(params):
+    llm = FakeLLM(_decision())
+    agent = FakeAgent(llm, {"LLM_CACHE_ENABLED": False})
+    Operation().run(params, {}, agent)
+    Operation().run(params, {}, agent)
+    assert llm.calls == 2
+
+
+def test_invalid_decision_is_not_cached(params):
+    broken = _decision()
+    broken["reasoning"] = broken["reasoning"][:3]
+    llm = FakeLLM(broken)
+    agent = FakeAgent(llm)
+    assert Operation().run(params, {}, agent).status == "error"
+    assert Operation().run(params, {}, agent).status == "error"
+    assert llm.calls == 2
+
+
+def test_request_carries_decision_schema(params):
+    llm = FakeLLM(_decision())
+    Operation().run(params, {}, FakeAgent(llm))
+    schema = llm.last_request.response_schema
+    assert set(schema["required"]) == {"reasoning", "postprocessing", "validation", "final_decision"}
+    # Корректное решение соответствует схеме
+    ReasonerDecision.model_validate(_decision())
+
+
+@pytest.mark.parametrize(
+    "confidences, expected",
+    [
+        ((0.6, 0.9, 0.9), 1),  # максимум, при равенстве — первая
+        ((0.5, 0.4), 0),       # порог 0.5 включительно
+        ((0.3, 0.49), -1),     # нет подходящих
+        ((), -1),
+    ],
+)
+def test_deterministic_selection(confidences, expected):
+    decision = Operation()._apply_deterministic_selection(_decision(confidences))
+    assert decision["final_decision"]["selected_hypothesis"] == expected
+
+
+_DELETE = object()
+
+
+def _break(path, value):
+    decision = _decision()
+    target = decision
+    for key in path[:-1]:
+        target = target[key]
+    if value is _DELETE:
+        del target[path[-1]]
+    else:
+        target[path[-1]] = value
+    return decision
+
+
+@pytest.mark.parametrize(
+    "path, value, message",
+    [
+        (("reasoning",), [f"R{i}: ..." for i in range(1, 7)], "поле 'reasoning' — должно содержать не менее 7 элементов"),
+        (("reasoning", 2), "R4: не тот номер", "поле 'reasoning[2]' — значение не соответствует шаблону ^R3:"),
+        (("hypotheses", 0, "confidence"), 1.5, "поле 'hypotheses[0].confidence' — значение больше 1"),
+        (("hypotheses", 0, "operation"), _DELETE, "поле 'hypotheses[0].operation' — отсутствует обязательное поле"),
+        (("postprocessing", "needed"), _DELETE, "поле 'postprocessing.needed' — отсутствует обязательное поле"),
+        (("validation",), _DELETE, "поле 'validation' — отсутствует обязательное поле"),
+        (("final_decision", "explanation"), "  кратко   ", "поле 'final_decision.explanation' — значение не соответствует шаблону"),
+    ],
+)
+def test_validate_decision_rejects_broken_structure(path, value, message):
+    is_valid, error = Operation()._validate_decision(_break(path, value))
+    assert is_valid is False
+    assert error.startswith(f"Ответ не соответствует схеме: {message}")
+
+
+def test_validate_decision_accepts_valid_structure():
+    assert Operation()._validate_decision(_decision()) == (True, None)
+
+
+def test_system_message_reused_between_requests(params):
+    first = Operation()._build_request(params, {})
+    params["subquestion"] = {"id": "q2", "text": "Сколько глав в книге?"}
+    second = Operation()._build_request(params, {})
+    assert first.messages[0] is second.messages[0]
+    assert first.messages[1].content != second.messages[1].content
+
+
+class FakeBatchLLM(FakeLLM):
+    """LLM-заглушка с пакетной генерацией."""
+
+    def __init__(self, decision):
+        super().__init__(decision)
+        self.batches = []
+
+    def generate_with_request_batch(self, requests, **kwargs):
+        self.batches.append(len(requests))
+        return [self.generate_with_request(request) for request in requests]
+
+
+def test_run_batch_sends_cache_misses_in_one_batch(params):
+    llm = FakeBatchLLM(_decision())
+    agent = FakeAgent(llm)
+    Operation().run(params, {}, agent)  # q1 попадает в кэш
+
+    params_list = [params] + [
+        {**params, "subquestion": {"id": f"q{i}", "text": f"Подвопрос {i}"}} for i in (2, 3)
+    ]
+    results = Operation().run_batch(params_list, {}, agent)
+
+    assert [r.status for r in results] == ["ok", "ok", "ok"]
+    assert [r.input_params["subquestion"]["id"] for r in results] == ["q1", "q2", "q3"]
+    assert llm.batches == [2]
+    assert llm.calls == 3
+
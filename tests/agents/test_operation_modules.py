@@ -0,0 +1,31 @@
+# tests/agents/test_operation_modules.py
+# coding: utf-8
+"""
+Проверка структуры модулей операций: каждый файл operations/<name>.py
+определяет ровно один класс Operation (повторное определение молча затеняет первое).
+Аналогично в модулях промптов и core.py агентов каждая функция и класс определены один раз.
+"""
+import ast
+from pathlib import Path
+
+import pytest
+
+AGENTS_DIR = Path(__file__).resolve().parents[2] / "src" / "agents"
+OPERATION_FILES = sorted(
+    p for p in AGENTS_DIR.glob("*/operations/*.py") if p.name != "__init__.py"
+)
+AGENT_MODULE_FILES = sorted([*AGENTS_DIR.glob("*/prompt*.py"), *AGENTS_DIR.glob("*/core.py")])
+
+
+@pytest.mark.parametrize("path", OPERATION_FILES, ids=lambda p: f"{p.parent.parent.name}/{p.stem}")
+def test_single_operation_class_per_module(path):
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    operations = [node for node in tree.body if isinstance(node, ast.ClassDef) and node.name == "Operation"]
+    assert len(operations) == 1
+
+
+@pytest.mark.parametrize("path", AGENT_MODULE_FILES, ids=lambda p: f"{p.parent.name}/{p.stem}")
+def test_no_shadowed_definitions_in_agent_module(path):
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    names = [node.name for node in tree.body if isinstance(node, (ast.FunctionDef, ast.ClassDef))]
+    assert len(names) == len(set(names))
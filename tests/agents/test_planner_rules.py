@@ -0,0 +1,93 @@
+# tests/agents/test_planner_rules.py
+# coding: utf-8
+"""
+Тесты программной валидации декомпозиции (src/agents/PlannerAgent/rules.py).
+"""
+from src.agents.PlannerAgent.rules import (
+    _has_cycles,
+    _has_cycles_sig,
+    format_issue,
+    validate_decomposition,
+)
+
+
+def _subq(sq_id, depends_on=None):
+    return {
+        "id": sq_id,
+        "text": f"Подвопрос {sq_id}",
+        "depends_on": depends_on or [],
+        "confidence": 0.9,
+        "reason": "P1–P5",
+        "explanation": "Обоснование",
+    }
+
+
+def _decomposition(subquestions):
+    return {
+        "reasoning": ["P1: ...", "P2: ...", "P3: ...", "P4: ...", "P5: ..."],
+        "planning": {"needed": True, "confidence": 0.9, "reason": "...", "explanation": "..."},
+        "subquestions": subquestions,
+        "final_decision": {"explanation": "..."},
+    }
+
+
+def test_has_cycles_detects_cycle():
+    subqs = [
+        {"id": "q1", "depends_on": ["q2"]},
+        {"id": "q2", "depends_on": ["q1"]},
+    ]
+    assert _has_cycles(subqs) is True
+
+
+def test_has_cycles_acyclic_and_invalid():
+    assert _has_cycles([{"id": "q1", "depends_on": []}, {"id": "q2", "depends_on": ["q1"]}]) is False
+    assert _has_cycles([{"id": "q1", "depends_on": "q2"}]) is False
+    assert _has_cycles("не список") is False
+    assert _has_cycles([]) is False
+
+
+def test_has_cycles_cached_for_same_graph():
+    _has_cycles_sig.cache_clear()
+    subqs = [{"id": "q1", "depends_on": []}, {"id": "q2", "depends_on": ["q1"]}]
+    _has_cycles(subqs)
+    # Тот же граф в другом порядке — попадание в кэш
+    _has_cycles(list(reversed(subqs)))
+    info = _has_cycles_sig.cache_info()
+    assert info.hits == 1
+    assert info.misses == 1
+
+
+def test_validate_decomposition_ok():
+    is_valid, issues = validate_decomposition(_decomposition([_subq("q1"), _subq("q2", ["q1"])]), {})
+    assert is_valid is True
+    assert issues == []
+
+
+def test_validate_decomposition_cycle_is_error():
+    is_valid, issues = validate_decomposition(_decomposition([_subq("q1", ["q2"]), _subq("q2", ["q1"])]), {})
+    assert is_valid is False
+    assert [i["rule_id"] for i in issues] == ["no_cycles"]
+    assert issues[0]["severity"] == "error"
+
+
+def test_subquestion_issue_is_formatted_on_demand():
+    broken = {"id": "q1", "text": "Какие книги написал Пушкин?", "depends_on": []}
+    is_valid, issues = validate_decomposition(_decomposition([broken]), {})
+    assert is_valid is False
+    issue = issues[0]
+    assert issue["rule_id"] == "subq_structure"
+    assert issue["context"] == {"subq_text": "Какие книги написал Пушкин?"}
+    assert format_issue(issue) == f"{issue['message']} (подвопрос: Какие книги написал Пушкин?)"
+
+
+def test_non_list_subquestions_is_reported():
+    decomposition = _decomposition({"q1": _subq("q1")})
+    is_valid, issues = validate_decomposition(decomposition, {})
+    assert is_valid is False
+    assert [i["rule_id"] for i in issues] == ["bad_subquestions"]
+
+
+def test_empty_subquestions_skips_subquestion_rules():
+    is_valid, issues = validate_decomposition(_decomposition([]), {})
+    assert is_valid is True
+    assert issues == []
@@ -0,0 +1,79 @@
+# tests/agents/test_reasoner_prompts.py
+# coding: utf-8
+"""
+Тесты построения промпта ReasonerAgent (src/agents/ReasonerAgent/prompts.py).
+"""
+from src.agents.ReasonerAgent.prompts import (
+    _build_static_preamble,
+    build_universal_reasoner_prompt,
+    project_tool_registry,
+    serialize_tool_registry,
+)
+
+REGISTRY = {"BooksLibraryAgent": {"operations": {"list_books": {"kind": "direct"}}}}
+
+
+def test_static_preamble_first_and_dynamic_tail_last():
+    system, user = build_universal_reasoner_prompt(
+        question="Какие книги написал Пушкин?",
+        step_outputs={"q0": ["Пушкин"]},
+        tool_registry_snapshot=REGISTRY,
+        step_state={"retry_count": 1, "stage": "data_fetch"},
+    )
+    assert system["role"] == "system"
+    assert system["content"].endswith('### 📚 Доступные инструменты\n{"BooksLibraryAgent":{"operations":{"list_books":{"kind":"direct"}}}}')
+    assert user["content"].startswith("### ❓ Подвопрос\nКакие книги написал Пушкин?")
+    assert '"retry_count": 1' in user["content"]
+    assert "data_fetch" not in user["content"]
+
+
+def test_static_preamble_is_reused_between_steps():
+    _build_static_preamble.cache_clear()
+    first, _ = build_universal_reasoner_prompt("Вопрос 1", tool_registry_snapshot=REGISTRY)
+    second, _ = build_universal_reasoner_prompt("Вопрос 2", tool_registry_snapshot=dict(REGISTRY))
+    assert first["content"] is second["content"]
+    assert _build_static_preamble.cache_info().hits == 1
+
+
+def test_preserialized_registry_matches_snapshot(monkeypatch):
+    from src.agents.ReasonerAgent import prompts
+
+    expected = build_universal_reasoner_prompt("Вопрос", tool_registry_snapshot=REGISTRY)
+    tools_json = serialize_tool_registry(REGISTRY)
+
+    # С готовой строкой реестр повторно не сериализуется
+    monkeypatch.setattr(prompts, "dumps_json", None)
+    assert build_universal_reasoner_prompt("Вопрос", tool_registry_json=tools_json) == expected
+
+
+def test_step_outputs_are_truncated_and_capped():
+    step_outputs = {f"q{i}": "x" * 2000 for i in range(1, 11)}
+    _, user = build_universal_reasoner_prompt("Вопрос", step_outputs=step_outputs, max_context_chars=2000)
+    content = user["content"]
+
+    assert "…[обрезано]…" in content
+    # В бюджет помещаются самые свежие шаги, остальные опущены
+    assert "… ещё 7 результат(ов) шагов опущено" in content
+    assert "q10: " in content and "q8: " in content
+    assert "q7: " not in content
+
+
+def test_registry_projection_drops_outputs_and_trims_description():
+    snapshot = {
+        "BooksLibraryAgent": {
+            "title": "Библиотека",
+            "description": "Агент " * 50,
+            "operations": {
+                "list_books": {
+                    "kind": "direct",
+                    "description": "Книги автора",
+                    "params": {"author": {"type": "string", "required": True}},
+                    "outputs": {"type": "array", "items": {"title": "string", "year": "integer"}},
+                },
+            },
+        },
+    }
+    tools_json = serialize_tool_registry(snapshot)
+    assert "outputs" not in tools_json and "Библиотека" not in tools_json
+    assert '"params":{"author":{"required":true,"type":"string"}}' in tools_json
+    assert len(project_tool_registry(snapshot)["BooksLibraryAgent"]["description"]) == 120
@@ -0,0 +1,36 @@
+# tests/agents/test_registry.py
+# coding: utf-8
+"""
+Тесты поиска агентов по операции в AgentRegistry (src/agents/registry.py).
+"""
+from src.agents.registry import AgentRegistry
+
+
+def _entry(name, operations):
+    return {
+        "name": name,
+        "title": name,
+        "description": "Тестовый агент",
+        "implementation": f"tests.agents.test_registry:{name}",
+        "operations": {op: {"kind": "direct", "description": op} for op in operations},
+    }
+
+
+def test_find_agents_by_operation_uses_index(monkeypatch):
+    registry = AgentRegistry(
+        tool_registry={
+            "A": _entry("A", ["list_books", "validate_author"]),
+            "B": _entry("B", ["list_books"]),
+        },
+        control_registry={"C": _entry("C", ["decide_next_stage"])},
+    )
+    calls = []
+    resolve = registry._resolve_operations
+    monkeypatch.setattr(registry, "_resolve_operations", lambda name, entry: calls.append(name) or resolve(name, entry))
+
+    assert [name for name, _ in registry.find_agents_by_operation("list_books")] == ["A", "B"]
+    assert registry.find_agents_by_operation("validate_author") == [("A", registry.tool_registry["A"])]
+    assert registry.find_agents_by_operation("missing") == []
+    assert [name for name, _ in registry.find_agents_by_operation("decide_next_stage", control=True)] == ["C"]
+    # Операции каждого агента разрешаются один раз — при построении индекса
+    assert calls == ["A", "B", "C"]
@@ -0,0 +1,25 @@
+# tests/agents/test_relay_step_result.py
+# coding: utf-8
+"""
+Тесты операции relay_step_result (StepResultRelayAgent).
+"""
+from src.agents.StepResultRelayAgent.operations.relay_step_result import Operation
+from src.model.context.context import GraphContext
+from src.model.context.models import Plan, SubQuestion
+
+
+def test_relay_returns_step_output_from_graph_state_without_copy():
+    ctx = GraphContext()
+    ctx.set_plan(Plan(subquestions=[SubQuestion(id="q1", text="Книги Пушкина")]))
+    ctx.record_step_result("q1", [{"title": "Евгений Онегин"}])
+    context = ctx.to_dict()
+
+    result = Operation().run({"source_step_id": "q1"}, context, agent=None)
+    assert result.status == "ok"
+    assert result.output is context["execution"]["steps"]["q1"]["raw_output"]
+
+
+def test_relay_reports_missing_step():
+    result = Operation().run({"source_step_id": "q9"}, {"step_outputs": {}}, agent=None)
+    assert result.status == "error"
+    assert result.stage == "data_fetch"
@@ -0,0 +1,167 @@
+# tests/agents/test_synthesize.py
+# coding: utf-8
+"""
+Тесты операции synthesize (SynthesizerAgent) без реальной LLM.
+"""
+import json
+
+import pytest
+
+from src.agents.SynthesizerAgent.operations.synthesize import Operation
+from src.agents.SynthesizerAgent.prompt import build_synthesis_prompt
+from src.services.llm_service.model.response import LLMResponse
+from src.services.llm_service.response_cache import RESPONSE_CACHE
+
+SYNTHESIS = {
+    "reasoning": ["S1: Да.", "S2: Да.", "S3: Нет.", "S4: Нет."],
+    "synthesis": {
+        "final_answer": "Пушкин написал «Евгения Онегина».",
+        "confidence": 0.9,
+        "reason": "S1–S4",
+        "explanation": "Ответ получен из результата шага q1.",
+    },
+}
+PARAMS = {
+    "question": "Какие книги написал Пушкин?",
+    "plan": {"subquestions": [{"id": "q1", "text": "Книги Пушкина"}]},
+    "step_outputs": {"q1": ["Евгений Онегин"]},
+}
+
+
+class FakeLLM:
+    def __init__(self, payload):
+        self.raw = json.dumps(payload, ensure_ascii=False)
+        self.requests = []
+
+    def generate_with_request(self, request, **kwargs):
+        self.requests.append(request)
+        response = LLMResponse.from_raw(self.raw)
+        return response.answer, response
+
+
+class FakeAgent:
+    def __init__(self, llm):
+        self.llm = llm
+        self.config = {}
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    RESPONSE_CACHE.clear()
+    yield
+    RESPONSE_CACHE.clear()
+
+
+def test_synthesize_returns_final_answer():
+    result = Operation().run(PARAMS, {}, FakeAgent(FakeLLM(SYNTHESIS)))
+    assert result.status == "ok"
+    assert result.output["final_answer"] == SYNTHESIS["synthesis"]["final_answer"]
+
+
+def test_static_instructions_precede_question_data():
+    llm = FakeLLM(SYNTHESIS)
+    Operation().run(PARAMS, {}, FakeAgent(llm))
+    system, user = llm.requests[0].messages
+    assert (system.role, user.role) == ("system", "user")
+    assert "Какие книги написал Пушкин?" not in system.content
+    assert user.content.startswith("### Исходный вопрос\nКакие книги написал Пушкин?")
+    assert user.content.endswith('### Результаты шагов\n{"q1":["Евгений Онегин"]}')
+
+
+def test_repeated_synthesis_is_served_from_cache():
+    llm = FakeLLM(SYNTHESIS)
+    first = Operation().run(PARAMS, {}, FakeAgent(llm))
+    second = Operation().run(PARAMS, {}, FakeAgent(llm))
+    assert first.output == second.output
+    assert len(llm.requests) == 1
+
+
+def test_run_batch_sends_questions_in_one_batch():
+    llm = FakeLLM(SYNTHESIS)
+    batches = []
+
+    def generate_with_request_batch(requests):
+        batches.append(requests)
+        return [llm.generate_with_request(request) for request in requests]
+
+    llm.generate_with_request_batch = generate_with_request_batch
+    params_list = [PARAMS, {**PARAMS, "question": "Какие книги написал Гоголь?"}]
+    results = Operation().run_batch(params_list, {}, FakeAgent(llm))
+
+    assert [r.status for r in results] == ["ok", "ok"]
+    assert len(batches) == 1 and len(batches[0]) == 2
+
+
+def test_synthesis_request_stops_after_json():
+    llm = FakeLLM(SYNTHESIS)
+    Operation().run(PARAMS, {}, FakeAgent(llm))
+    assert llm.requests[0].stop_after_json is True
+
+
+def test_validate_structure_rejects_wrong_prefix_and_missing_field():
+    op = Operation()
+    assert op._validate_structure(SYNTHESIS) == (True, None)
+
+    wrong_prefix = {**SYNTHESIS, "reasoning": ["S1: Да.", "S1: Да.", "S3: Нет.", "S4: Нет."]}
+    assert op._validate_structure(wrong_prefix) == (
+        False, "Ответ не соответствует схеме: поле 'reasoning[1]' — значение не соответствует шаблону ^S2:"
+    )
+
+    missing_answer = {**SYNTHESIS, "synthesis": {k: v for k, v in SYNTHESIS["synthesis"].items() if k != "final_answer"}}
+    assert op._validate_structure(missing_answer) == (
+        False, "Ответ не соответствует схеме: поле 'synthesis.final_answer' — отсутствует обязательное поле"
+    )
+
+
+def test_repeated_step_outputs_are_replaced_with_refs():
+    books = [{"title": "Евгений Онегин", "year": 1833}, {"title": "Капитанская дочка", "year": 1836}]
+    _, user = build_synthesis_prompt("Вопрос", {}, {"q1": books, "q2": list(books), "q3": True, "q4": True})
+    outputs = json.loads(user["content"].split("### Результаты шагов\n", 1)[1])
+    assert outputs == {"q1": books, "q2": {"$ref": "q1"}, "q3": True, "q4": True}
+
+
+def test_single_step_text_answer_skips_llm():
+    llm = FakeLLM(SYNTHESIS)
+    params = {
+        "question": "Кто написал «Евгения Онегина»?",
+        "plan": {"subquestions": [{"id": "q1", "text": "Кто написал «Евгения Онегина»?"}]},
+        "step_outputs": {"q1": "Александр Пушкин."},
+    }
+    result = Operation().run(params, {}, FakeAgent(llm))
+    assert result.status == "ok"
+    assert result.output["final_answer"] == "Александр Пушкин."
+    assert llm.requests == []
+
+    results = Operation().run_batch([params, PARAMS], {}, FakeAgent(llm))
+    assert [r.output["final_answer"] for r in results] == ["Александр Пушкин.", SYNTHESIS["synthesis"]["final_answer"]]
+    assert len(llm.requests) == 1
+
+
+def test_large_step_outputs_are_shortened():
+    rows = [{"id": i} for i in range(120)]
+    _, user = build_synthesis_prompt("Вопрос", {}, {"q1": rows, "q2": "а" * 10000})
+    outputs = json.loads(user["content"].split("### Результаты шагов\n", 1)[1])
+    assert outputs["q1"][:50] == rows[:50]
+    assert outputs["q1"][50] == "… ещё 70 элемент(ов) опущено, всего 120"
+    assert len(outputs["q2"]) < 4000
+
+
+def test_prompt_does_not_depend_on_step_completion_order():
+    plan = {"subquestions": [{"id": "q2", "text": "А"}, {"id": "q10", "text": "Б"}]}
+    first = build_synthesis_prompt("Вопрос", plan, {"q2": {"b": 1, "a": 2}, "q10": [3]})
+    second = build_synthesis_prompt("Вопрос", plan, {"q10": [3], "q2": {"a": 2, "b": 1}})
+    assert first == second
+    assert first[1]["content"].endswith('{"q2":{"a":2,"b":1},"q10":[3]}')
+
+
+def test_malformed_plan_goes_to_llm_without_failing_batch():
+    llm = FakeLLM(SYNTHESIS)
+    malformed = [
+        {**PARAMS, "plan": {"subquestions": ["Книги Пушкина"]}, "step_outputs": {"q1": "Евгений Онегин"}},
+        {**PARAMS, "question": None, "step_outputs": {"q1": "Евгений Онегин"}},
+    ]
+    results = Operation().run_batch([*malformed, PARAMS], {}, FakeAgent(llm))
+    # Без question синтез невозможен, но ошибка остаётся в своём элементе пакета
+    assert [r.status for r in results] == ["ok", "error", "ok"]
+    assert Operation()._direct_answer(malformed[0]) is None
+    assert Operation()._direct_answer(malformed[1]) is None
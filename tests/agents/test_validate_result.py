@@ -0,0 +1,134 @@
+# tests/agents/test_validate_result.py
+# coding: utf-8
+"""
+Тесты операции validate_result (ResultValidatorAgent) без реальной LLM.
+"""
+import json
+
+import pytest
+
+from src.agents.ResultValidatorAgent.operations.validate_result import Operation, validate_answer_structure
+from src.services.llm_service.model.response import LLMResponse
+from src.services.llm_service.response_cache import RESPONSE_CACHE
+
+VALIDATION = {
+    "reasoning": ["V1: Да.", "V2: Да.", "V3: Нет.", "V4: Да."],
+    "validation": {"is_valid": True, "confidence": 0.9, "reason": "V1–V4", "explanation": "Список книг получен."},
+}
+
+
+class FakeLLM:
+    def __init__(self, payload):
+        self.raw = json.dumps(payload, ensure_ascii=False)
+        self.calls = 0
+        self.requests = []
+
+    def generate_with_request(self, request, **kwargs):
+        self.calls += 1
+        self.requests.append(request)
+        response = LLMResponse.from_raw(self.raw)
+        return response.answer, response
+
+
+class FakeAgent:
+    def __init__(self, llm):
+        self.llm = llm
+        self.config = {}
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    RESPONSE_CACHE.clear()
+    yield
+    RESPONSE_CACHE.clear()
+
+
+def test_validate_result_calls_llm_for_non_empty_output():
+    llm = FakeLLM(VALIDATION)
+    params = {"subquestion_text": "Какие книги написал Пушкин?", "raw_output": ["Евгений Онегин"]}
+    result = Operation().run(params, {}, FakeAgent(llm))
+    assert result.status == "ok"
+    assert result.output["is_valid"] is True
+    assert llm.calls == 1
+
+
+def test_static_instructions_precede_step_data():
+    llm = FakeLLM(VALIDATION)
+    for question in ("Какие книги написал Пушкин?", "Какие книги написал Гоголь?"):
+        Operation().run({"subquestion_text": question, "raw_output": ["Книга"]}, {}, FakeAgent(llm))
+    first, second = (request.messages for request in llm.requests)
+    assert [m.role for m in first] == ["system", "user"]
+    # System-сообщение не зависит от шага — префикс промпта совпадает между вызовами
+    assert first[0].content == second[0].content
+    assert first[1].content.startswith("### Подвопрос\nКакие книги написал Пушкин?")
+
+
+@pytest.mark.parametrize("raw_output", [None, [], {}, "   "])
+def test_empty_output_rejected_without_llm(raw_output):
+    llm = FakeLLM(VALIDATION)
+    params = {"subquestion_text": "Какие книги написал Пушкин?", "raw_output": raw_output}
+    result = Operation().run(params, {}, FakeAgent(llm))
+    assert result.status == "ok"
+    assert result.stage == "result_validation"
+    assert result.output["is_valid"] is False
+    assert len(result.output["reasoning"]) == 4
+    assert llm.calls == 0
+
+
+def test_request_carries_response_schema_unless_disabled():
+    llm = FakeLLM(VALIDATION)
+    params = {"subquestion_text": "Какие книги написал Пушкин?", "raw_output": ["Евгений Онегин"]}
+    Operation().run(params, {}, FakeAgent(llm))
+    schema = llm.requests[-1].response_schema
+    assert schema["required"] == ["reasoning", "validation"]
+    assert schema["properties"]["reasoning"]["minItems"] == 4
+
+    agent = FakeAgent(llm)
+    agent.config = {"LLM_STRUCTURED_OUTPUT": False}
+    RESPONSE_CACHE.clear()
+    Operation().run(params, {}, agent)
+    assert llm.requests[-1].response_schema is None
+
+
+def test_run_batch_sends_pending_requests_in_one_batch():
+    llm = FakeLLM(VALIDATION)
+    batches = []
+
+    def generate_with_request_batch(requests):
+        batches.append(requests)
+        return [llm.generate_with_request(request) for request in requests]
+
+    llm.generate_with_request_batch = generate_with_request_batch
+    params_list = [
+        {"subquestion_text": "Какие книги написал Пушкин?", "raw_output": ["Евгений Онегин"]},
+        {"subquestion_text": "Какие книги написал Гоголь?", "raw_output": []},
+        {"subquestion_text": "Какие книги написал Лермонтов?", "raw_output": ["Мцыри"]},
+    ]
+    results = Operation().run_batch(params_list, {}, FakeAgent(llm))
+
+    assert [r.output["is_valid"] for r in results] == [True, False, True]
+    # Пустой результат отклонён без LLM, остальные ушли одним пакетом
+    assert len(batches) == 1 and len(batches[0]) == 2
+
+
+def test_negative_verdict_is_returned_as_ok_result():
+    rejected = {**VALIDATION, "validation": {**VALIDATION["validation"], "is_valid": False}}
+    params = {"subquestion_text": "Какие книги написал Пушкин?", "raw_output": ["Мцыри"]}
+    result = Operation().run(params, {}, FakeAgent(FakeLLM(rejected)))
+    # Вердикт записывается в validation_result, по нему reasoner_node повторяет шаг
+    assert result.status == "ok"
+    assert result.output["is_valid"] is False
+
+
+def test_validate_structure_rejects_wrong_prefix_and_confidence():
+    assert validate_answer_structure(VALIDATION) == (True, None)
+
+    wrong_prefix = {**VALIDATION, "reasoning": ["V1: Да.", "V3: Да.", "V3: Нет.", "V4: Да."]}
+    assert validate_answer_structure(wrong_prefix) == (
+        False, "Ответ не соответствует схеме: поле 'reasoning[1]' — значение не соответствует шаблону ^V2:"
+    )
+
+    wrong_confidence = {**VALIDATION, "validation": {**VALIDATION["validation"], "confidence": 1.5}}
+    assert validate_answer_structure(wrong_confidence) == (
+        False, "Ответ не соответствует схеме: поле 'validation.confidence' — значение больше 1"
+    )
@@ -0,0 +1,131 @@
+# tests/graph/nodes/test_executor_concurrency.py
+"""
+Unit-тесты для executor_node: одновременная загрузка данных и пакетная валидация соседних шагов.
+"""
+
+import asyncio
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from src.graph.nodes.executor import executor_node
+from src.model.agent_result import AgentResult
+from src.model.context.context import GraphContext
+from src.model.context.models import Plan, SubQuestion
+
+
+def _decision(author):
+    return {
+        "hypotheses": [{
+            "agent": "BooksLibraryAgent",
+            "operation": "list_books",
+            "params": {"author": author},
+            "confidence": 0.9,
+            "reason": "R1",
+            "explanation": "Пояснение",
+        }],
+        "final_decision": {"selected_hypothesis": 0, "explanation": "Итог"},
+    }
+
+
+class _BarrierAgent:
+    """Агент, чьи вызовы проходят барьер только при одновременном выполнении."""
+
+    def __init__(self, parties):
+        self.barrier = threading.Barrier(parties)
+
+    def execute_operation(self, operation, params, context=None):
+        self.barrier.wait(5)
+        if params["author"] == "Ошибка":
+            raise RuntimeError("нет соединения с БД")
+        return AgentResult.ok(stage="data_fetch", output=[f"Книга {params['author']}"])
+
+
+@pytest.fixture
+def ctx():
+    ctx = GraphContext()
+    ctx.set_plan(Plan(subquestions=[
+        SubQuestion(id="q1", text="Книги Пушкина"),
+        SubQuestion(id="q2", text="Книги Лермонтова"),
+        SubQuestion(id="q3", text="Книги Гоголя"),
+        SubQuestion(id="q4", text="Общие годы", depends_on=["q1", "q2"]),
+    ]))
+    ctx.record_reasoner_decision("q1", _decision("Пушкин"))
+    ctx.record_reasoner_decision("q2", _decision("Лермонтов"))
+    ctx.start_step("q1")
+    return ctx
+
+
+def test_ready_siblings_are_fetched_concurrently(ctx):
+    registry = Mock()
+    # q3 без решения Reasoner не загружается; q4 ждёт зависимостей
+    registry.instantiate_agent.return_value = _BarrierAgent(parties=2)
+
+    new_ctx = GraphContext.from_state_dict(executor_node(ctx.to_dict(), agent_registry=registry))
+
+    assert new_ctx.get_step_result("q1") == ["Книга Пушкин"]
+    assert new_ctx.get_step_result("q2") == ["Книга Лермонтов"]
+    assert new_ctx.is_stage_completed("q2", "data_fetch")
+    assert new_ctx.get_execution_step("q3") is None
+
+
+def test_concurrent_fetch_inside_running_event_loop(ctx):
+    # graph.invoke из async-эндпоинта выполняет узел в потоке с запущенным event loop
+    registry = Mock()
+    registry.instantiate_agent.return_value = _BarrierAgent(parties=2)
+
+    async def invoke():
+        return executor_node(ctx.to_dict(), agent_registry=registry)
+
+    new_ctx = GraphContext.from_state_dict(asyncio.run(invoke()))
+
+    assert new_ctx.get_step_result("q1") == ["Книга Пушкин"]
+    assert new_ctx.get_step_result("q2") == ["Книга Лермонтов"]
+
+
+def test_failed_sibling_fetch_is_recorded_as_error(ctx):
+    ctx.record_reasoner_decision("q2", _decision("Ошибка"))
+    registry = Mock()
+    registry.instantiate_agent.return_value = _BarrierAgent(parties=2)
+
+    new_ctx = GraphContext.from_state_dict(executor_node(ctx.to_dict(), agent_registry=registry))
+
+    assert new_ctx.get_step_result("q1") == ["Книга Пушкин"]
+    assert not new_ctx.is_stage_completed("q2", "data_fetch")
+    assert "нет соединения с БД" in new_ctx.get_execution_step("q2").agent_calls[-1]["error"]
+
+
+def test_single_step_uses_sync_call(ctx):
+    ctx.get_execution_step("q2").decision = None
+    ctx.get_execution_step("q2").hypothesis = None
+    agent = Mock()
+    agent.execute_operation.return_value = AgentResult.ok(stage="data_fetch", output=["Книга"])
+    registry = Mock()
+    registry.instantiate_agent.return_value = agent
+
+    new_ctx = GraphContext.from_state_dict(executor_node(ctx.to_dict(), agent_registry=registry))
+
+    agent.execute_operation.assert_called_once()
+    assert new_ctx.get_step_result("q1") == ["Книга"]
+
+
+def test_sibling_validations_are_batched(ctx):
+    for sid in ("q1", "q2"):
+        ctx.record_step_result(sid, [f"Книга {sid}"])
+        ctx.mark_stage_completed(sid, "data_fetch")
+    agent = Mock()
+    agent.execute_operation_batch.return_value = [
+        AgentResult.ok(stage="result_validation", output={"is_valid": True}) for _ in range(2)
+    ]
+    registry = Mock()
+    registry.instantiate_agent.return_value = agent
+
+    new_ctx = GraphContext.from_state_dict(executor_node(ctx.to_dict(), agent_registry=registry))
+
+    operation, params_list = agent.execute_operation_batch.call_args.args
+    assert operation == "validate_result"
+    assert [p["raw_output"] for p in params_list] == [["Книга q1"], ["Книга q2"]]
+    agent.execute_operation.assert_not_called()
+    assert new_ctx.get_current_stage("q1") == "completed"
+    assert new_ctx.get_current_stage("q2") == "completed"
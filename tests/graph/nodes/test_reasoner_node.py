@@ -0,0 +1,83 @@
+# tests/graph/nodes/test_reasoner_node.py
+"""
+Unit-тесты для reasoner_node: пакетное решение для готовых соседних шагов.
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+from src.graph.nodes import reasoner as reasoner_module
+from src.graph.nodes.reasoner import reasoner_node
+from src.model.agent_result import AgentResult
+from src.model.context.context import GraphContext
+from src.model.context.models import Plan, SubQuestion
+
+
+def _decision(step_id):
+    return {
+        "hypotheses": [{
+            "agent": "BooksLibraryAgent",
+            "operation": "list_books",
+            "params": {"step": step_id},
+            "confidence": 0.9,
+            "reason": "R1",
+            "explanation": "Пояснение",
+        }],
+        "final_decision": {"selected_hypothesis": 0, "explanation": "Итог"},
+    }
+
+
+@pytest.fixture
+def ctx():
+    ctx = GraphContext()
+    ctx.set_plan(Plan(subquestions=[
+        SubQuestion(id="q1", text="Книги Пушкина"),
+        SubQuestion(id="q2", text="Книги Лермонтова"),
+        SubQuestion(id="q3", text="Общие годы", depends_on=["q1", "q2"]),
+    ]))
+    ctx.start_step("q1")
+    return ctx
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(reasoner_module, "build_tool_registry_snapshot", lambda _: {})
+    reasoner_agent = Mock()
+    reasoner_agent.execute_operation_batch.side_effect = lambda op, params_list: [
+        AgentResult.ok(stage="reasoning", output=_decision(p["subquestion"]["id"])) for p in params_list
+    ]
+    reasoner_agent.execute_operation.side_effect = lambda op, params: AgentResult.ok(
+        stage="reasoning", output=_decision(params["subquestion"]["id"])
+    )
+    registry = Mock()
+    registry.instantiate_agent.return_value = reasoner_agent
+    return registry
+
+
+def test_ready_siblings_are_decided_in_one_batch(ctx, registry):
+    state = reasoner_node(ctx.to_dict(), agent_registry=registry)
+
+    reasoner_agent = registry.instantiate_agent.return_value
+    reasoner_agent.execute_operation_batch.assert_called_once()
+    _, params_list = reasoner_agent.execute_operation_batch.call_args.args
+    # q3 ещё не готов: его зависимости не выполнены
+    assert [p["subquestion"]["id"] for p in params_list] == ["q1", "q2"]
+
+    new_ctx = GraphContext.from_state_dict(state)
+    assert new_ctx.get_execution_step("q2").decision == _decision("q2")
+
+    # Для соседнего шага решение уже есть — повторного вызова LLM нет
+    new_ctx.start_step("q2")
+    reasoner_node(new_ctx.to_dict(), agent_registry=registry)
+    reasoner_agent.execute_operation.assert_not_called()
+    assert reasoner_agent.execute_operation_batch.call_count == 1
+
+
+def test_batch_size_one_keeps_single_call(ctx, registry, monkeypatch):
+    monkeypatch.setattr(reasoner_module, "REASONER_BATCH_SIZE", 1)
+    reasoner_node(ctx.to_dict(), agent_registry=registry)
+
+    reasoner_agent = registry.instantiate_agent.return_value
+    reasoner_agent.execute_operation_batch.assert_not_called()
+    reasoner_agent.execute_operation.assert_called_once()
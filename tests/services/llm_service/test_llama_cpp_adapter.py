@@ -0,0 +1,52 @@
+# tests/services/llm_service/test_llama_cpp_adapter.py
+# coding: utf-8
+"""
+Тесты LlamaCppAdapter.generate_with_request без llama_cpp (модель подменяется).
+"""
+import threading
+
+import pytest
+
+from src.services.llm_service.adapters.llama_cpp_adapter import LlamaCppAdapter
+from src.services.llm_service.model.request import LLMMessage, LLMRequest
+
+SCHEMA = {"type": "object", "required": ["answer"]}
+
+
+class FakeModel:
+    def __init__(self, text):
+        self.text = text
+        self.calls = []
+
+    def __call__(self, prompt, **kwargs):
+        self.calls.append(kwargs)
+        return {"choices": [{"text": self.text}], "usage": {"prompt_tokens": 1, "completion_tokens": 1}}
+
+
+def _adapter(model_path, text):
+    # Без __init__: он загружает GGUF-модель через llama_cpp
+    adapter = LlamaCppAdapter.__new__(LlamaCppAdapter)
+    adapter.model = FakeModel(text)
+    adapter.is_qwen_model = "qwen" in model_path.lower()
+    adapter._grammars = {}
+    adapter._generate_lock = threading.Lock()
+    adapter._get_grammar = lambda schema: "grammar"
+    return adapter
+
+
+def _request():
+    return LLMRequest(messages=[LLMMessage(role="user", content="Вопрос")], response_schema=SCHEMA)
+
+
+@pytest.mark.parametrize("model_path, uses_grammar", [("models/llama-3.gguf", True), ("models/Qwen3-4B.gguf", False)])
+def test_grammar_is_not_applied_to_qwen(model_path, uses_grammar):
+    adapter = _adapter(model_path, '{"answer": "Пушкин"}')
+    adapter.generate_with_request(_request())
+    assert ("grammar" in adapter.model.calls[0]) is uses_grammar
+
+
+def test_qwen_thinking_block_is_kept_with_response_schema():
+    adapter = _adapter("models/Qwen3-4B.gguf", 'thinking Ищу автора. thinking_end {"answer": "Пушкин"}')
+    answer, response = adapter.generate_with_request(_request())
+    assert response.thinking == "Ищу автора."
+    assert answer == "Пушкин"
@@ -0,0 +1,39 @@
+# tests/services/llm_service/test_response_cache.py
+# coding: utf-8
+"""Тесты кэша ответов LLM (src/services/llm_service/response_cache.py)."""
+
+from src.services.llm_service.model.request import LLMMessage, LLMRequest
+from src.services.llm_service.model.response import LLMResponse
+from src.services.llm_service.response_cache import LLMResponseCache
+
+
+def _request(content: str, temperature: float = 0.0) -> LLMRequest:
+    return LLMRequest(messages=[LLMMessage(role="user", content=content)], temperature=temperature)
+
+
+def test_key_depends_on_request_and_namespace():
+    key = LLMResponseCache.make_key(_request("вопрос"), namespace="default")
+    assert key == LLMResponseCache.make_key(_request("вопрос"), namespace="default")
+    assert key != LLMResponseCache.make_key(_request("вопрос"), namespace="thinking")
+    assert key != LLMResponseCache.make_key(_request("вопрос", temperature=0.3), namespace="default")
+    assert key != LLMResponseCache.make_key(_request("другой вопрос"), namespace="default")
+
+
+def test_get_returns_independent_copy():
+    cache = LLMResponseCache()
+    cache.put("k", LLMResponse(raw_text="{}", json_answer={"a": 1}))
+    first = cache.get("k")
+    first.json_answer["a"] = 2
+    assert cache.get("k").json_answer == {"a": 1}
+    assert cache.get("missing") is None
+
+
+def test_lru_eviction():
+    cache = LLMResponseCache(maxsize=2)
+    cache.put("a", LLMResponse(raw_text="a"))
+    cache.put("b", LLMResponse(raw_text="b"))
+    cache.get("a")  # "a" становится самым свежим
+    cache.put("c", LLMResponse(raw_text="c"))
+    assert cache.get("b") is None
+    assert cache.get("a").raw_text == "a"
+    assert len(cache) == 2
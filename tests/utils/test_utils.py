@@ -0,0 +1,83 @@
+# tests/utils/test_utils.py
+# coding: utf-8
+"""
+Тесты общих утилит (src/utils/utils.py).
+"""
+import json
+from datetime import date
+
+import pytest
+
+from src.utils import utils
+from src.utils.utils import JsonObjectScanner, dumps_json, dumps_json_or_str, extract_json_object, loads_json, parse_json_object
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def json_backend(request, monkeypatch):
+    """Прогоняет тест и с orjson, и с fallback на stdlib json."""
+    if request.param == "stdlib":
+        monkeypatch.setattr(utils, "orjson", None)
+    elif utils.orjson is None:
+        pytest.skip("orjson не установлен")
+    return request.param
+
+
+def test_dumps_json_output_is_backend_independent(json_backend):
+    data = {"автор": "Пушкин", "книги": [1, 2], "год": date(1833, 1, 1)}
+    default = lambda o: o.isoformat()
+    assert dumps_json(data, default=default) == '{"автор":"Пушкин","книги":[1,2],"год":"1833-01-01"}'
+    assert dumps_json(data, indent=True, default=default) == json.dumps(
+        data, ensure_ascii=False, indent=2, default=default
+    )
+
+
+def test_dumps_json_unserializable_raises_type_error(json_backend):
+    with pytest.raises(TypeError):
+        dumps_json({"x": object()})
+
+
+def test_loads_json_errors_are_json_decode_errors(json_backend):
+    assert loads_json('{"a": [1]}') == {"a": [1]}
+    with pytest.raises(json.JSONDecodeError):
+        loads_json("не JSON")
+
+
+def test_extract_json_object_fenced_and_bare():
+    fenced = 'Ответ:\n```json\n{"a": {"b": 1}}\n```\nконец {лишнее}'
+    assert extract_json_object(fenced) == '{"a": {"b": 1}}'
+    assert extract_json_object('текст {"a": 1} и ещё {"b": 2}') == '{"a": 1}'
+
+
+def test_extract_json_object_braces_inside_strings():
+    raw = '{"text": "скобки } и { \\" кавычка", "n": 1} хвост'
+    extracted = extract_json_object(raw)
+    assert json.loads(extracted) == {"text": 'скобки } и { " кавычка', "n": 1}
+
+
+def test_extract_json_object_unbalanced_or_missing():
+    assert extract_json_object('{"a": 1') is None
+    assert extract_json_object("без json") is None
+    assert extract_json_object("") is None
+
+
+def test_json_object_scanner_detects_end_across_chunks():
+    chunks = ['Ответ: {"a": "}', '{\\', '"', '", "b": {', '"c": 1}', '} хвост {"d": 2}']
+    scanner = JsonObjectScanner()
+    ends = [scanner.feed(chunk) for chunk in chunks]
+    assert ends == [-1, -1, -1, -1, -1, 1]
+    text = "".join(chunks)
+    obj = text[text.index("{"): len(text) - len(chunks[-1]) + ends[-1]]
+    assert json.loads(obj) == {"a": '}{"', "b": {"c": 1}}
+
+
+def test_dumps_json_or_str_falls_back_to_str(json_backend):
+    assert dumps_json_or_str({"a": [1]}, indent=True) == '{\n  "a": [\n    1\n  ]\n}'
+    unserializable = {"a": object()}
+    assert dumps_json_or_str(unserializable) == str(unserializable)
+
+
+def test_parse_json_object_skips_invalid_candidates():
+    assert parse_json_object('План: {шаг 1} затем {"a": {"b": 1}} хвост') == {"a": {"b": 1}}
+    assert parse_json_object('```json\n{"a": 1}\n```') == {"a": 1}
+    assert parse_json_object("{не JSON}") is None
+    assert parse_json_object('{"a": 1') is None